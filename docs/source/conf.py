@@ -178,6 +178,11 @@ extlinks = {
         None,
     ),
     "matplotlib_axes": ("https://matplotlib.org/stable/api/axes_api.html#matplotlib.axes.Axes%s", None),
+    "pandas_read_csv": ("https://pandas.pydata.org/docs/reference/api/pandas.read_csv.html%s", None),
+    "pyarrow_read_table": (
+        "https://arrow.apache.org/docs/python/generated/pyarrow.parquet.read_table.html%s",
+        None,
+    ),
 }
 
 
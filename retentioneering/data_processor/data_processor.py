@@ -4,11 +4,13 @@ import typing
 import uuid
 from typing import Any, Type
 
+import pandas as pd
+
 from retentioneering.data_processor.registry import register_dataprocessor
 from retentioneering.params_model import ParamsModel
 
 if typing.TYPE_CHECKING:
-    from retentioneering.eventstream.types import EventstreamType
+    from retentioneering.eventstream.types import EventstreamSchemaType, EventstreamType
 
 
 class DataProcessor:
@@ -30,9 +32,41 @@ class DataProcessor:
         DataProcessor.__init__(self, params=params)
         return self
 
+    @property
+    def is_user_local(self) -> bool:
+        """
+        Whether the result for each user path depends on the events of this path only.
+        Such a processor can be applied to user-disjoint parts of an eventstream one by one.
+        """
+        return False
+
+    @property
+    def is_fusable(self) -> bool:
+        """
+        Whether the data processor only changes or deletes the existing events, without creating new ones.
+        Such a processor implements :py:meth:`_apply_to_events`, so a chain of them can be applied
+        to the same dataframe, and the result is joined to the eventstream once.
+        """
+        return False
+
+    @property
+    def changes_event_types(self) -> bool:
+        """
+        Whether a fusable data processor changes ``event_type`` values, and therefore the order of the events.
+        """
+        return False
+
     def apply(self, eventstream: EventstreamType) -> EventstreamType:
         raise NotImplementedError
 
+    def _apply_to_events(self, events: pd.DataFrame, schema: EventstreamSchemaType) -> pd.DataFrame:
+        """
+        Apply a fusable data processor to ``events`` in the format of ``eventstream.to_dataframe()``.
+        The events missing in the result are deleted. ``events`` may share memory with an eventstream,
+        so the changed columns are replaced instead of being modified in place.
+        """
+        raise NotImplementedError
+
     def export(self) -> dict[str, Any]:
         data: dict[str, Any] = {}
         widgets: dict[str, Any] = self.params.get_widgets()
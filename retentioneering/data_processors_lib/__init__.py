@@ -9,5 +9,6 @@ from .label_cropped_paths import LabelCroppedPaths, LabelCroppedPathsParams
 from .label_lost_users import LabelLostUsers, LabelLostUsersParams
 from .label_new_users import LabelNewUsers, LabelNewUsersParams
 from .rename import RenameParams, RenameProcessor
+from .sample_users import SampleUsers, SampleUsersParams
 from .split_sessions import SplitSessions, SplitSessionsParams
 from .truncate_paths import TruncatePaths, TruncatePathsParams
@@ -38,6 +38,10 @@ class AddStartEndEvents(DataProcessor):
 
     params: AddStartEndEventsParams
 
+    @property
+    def is_user_local(self) -> bool:
+        return True
+
     @track(tracking_info={"event_name": "init"}, scope="add_start_end_events", allowed_params=[])  # type: ignore
     def __init__(self, params: AddStartEndEventsParams) -> None:
         super().__init__(params=params)
@@ -50,7 +54,7 @@ class AddStartEndEvents(DataProcessor):
     def apply(self, eventstream: EventstreamType) -> EventstreamType:
         from retentioneering.eventstream.eventstream import Eventstream
 
-        events: DataFrame = eventstream.to_dataframe(copy=True)
+        events: DataFrame = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
         user_col = eventstream.schema.user_id
         type_col = eventstream.schema.event_type
         event_col = eventstream.schema.event_name
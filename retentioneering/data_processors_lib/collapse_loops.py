@@ -96,8 +96,13 @@ class CollapseLoops(DataProcessor):
     """
 
     params: CollapseLoopsParams
+
     NUMERIC_DTYPES = ["integer", "floating", "boolean", "mixed-integer-float"]
 
+    @property
+    def is_user_local(self) -> bool:
+        return True
+
     @track(  # type: ignore
         tracking_info={"event_name": "init"},
         scope="collapse_loops",
@@ -124,7 +129,7 @@ class CollapseLoops(DataProcessor):
         time_agg = self.params.time_agg
         full_agg: dict[str, Any] = {}
 
-        df = eventstream.to_dataframe(copy=True)
+        df = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
         if len(custom_cols) > 0:
             df_custom_cols = df[custom_cols]
             default_agg: dict[str, Callable] = {}
@@ -150,8 +155,9 @@ class CollapseLoops(DataProcessor):
 
         df["ref"] = df[eventstream.schema.event_id]
 
-        df["grp"] = df[event_col] != df.groupby(user_col)[event_col].shift(1)
-        df["cumgroup"] = df.groupby(user_col)["grp"].cumsum()
+        user_layout = eventstream._get_user_layout()
+        df["grp"] = df[event_col] != user_layout.shift(df[event_col], 1)
+        df["cumgroup"] = user_layout.cumsum(df["grp"])
         df["count"] = df.groupby([user_col, "cumgroup"]).cumcount() + 1
         df["collapsed"] = df.groupby([user_col, "cumgroup", event_col])["count"].transform(max)
         df["collapsed"] = df["collapsed"].apply(lambda x: False if x == 1 else True)
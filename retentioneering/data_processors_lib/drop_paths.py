@@ -60,6 +60,10 @@ class DropPaths(DataProcessor):
 
     params: DropPathsParams
 
+    @property
+    def is_user_local(self) -> bool:
+        return True
+
     @track(  # type: ignore
         tracking_info={"event_name": "init"},
         scope="drop_paths",
@@ -91,7 +95,7 @@ class DropPaths(DataProcessor):
         if not min_steps and not min_time:
             raise ValueError("Either min_steps or min_time must be specified!")
 
-        events = eventstream.to_dataframe(copy=True)
+        events = eventstream.to_dataframe(columns=[user_col, time_col])
 
         if min_time and time_unit:
             userpath = (
@@ -106,6 +110,7 @@ class DropPaths(DataProcessor):
             mask_ = userpath["length"] < min_steps
 
         users_to_delete = userpath[mask_].index
+        events = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
         events = events[events[user_col].isin(users_to_delete)]
         events["ref"] = events.loc[:, eventstream.schema.event_id]
 
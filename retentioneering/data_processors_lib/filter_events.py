@@ -57,6 +57,10 @@ class FilterEvents(DataProcessor):
     def __init__(self, params: FilterEventsParams):
         super().__init__(params=params)
 
+    @property
+    def is_fusable(self) -> bool:
+        return True
+
     @track(  # type: ignore
         tracking_info={"event_name": "apply"},
         scope="filter_events",
@@ -82,3 +86,7 @@ class FilterEvents(DataProcessor):
             eventstream._soft_delete(events=eventstream.to_dataframe())
 
         return eventstream
+
+    def _apply_to_events(self, events: pd.DataFrame, schema: EventstreamSchemaType) -> pd.DataFrame:
+        func: Callable[[DataFrame, EventstreamSchemaType], Series] = self.params.func  # type: ignore
+        return events[func(events, schema)]
@@ -1,5 +1,6 @@
 from typing import Any, Callable, Optional
 
+import numpy as np
 import pandas as pd
 
 from retentioneering.backend.tracker import track
@@ -74,6 +75,14 @@ class GroupEvents(DataProcessor):
     def __init__(self, params: GroupEventsParams) -> None:
         super().__init__(params=params)
 
+    @property
+    def is_fusable(self) -> bool:
+        return True
+
+    @property
+    def changes_event_types(self) -> bool:
+        return self.params.event_type is not None
+
     @track(  # type: ignore
         tracking_info={"event_name": "apply"},
         scope="group_events",
@@ -102,3 +111,12 @@ class GroupEvents(DataProcessor):
             raw_data=matched_events,
             relations=[{"raw_col": "ref", "eventstream": eventstream}],
         )
+
+    def _apply_to_events(self, events: pd.DataFrame, schema: EventstreamSchemaType) -> pd.DataFrame:
+        event_type = self.params.event_type
+        mask = np.asarray(self.params.func(events, schema), dtype=bool)
+
+        changed_cols = {schema.event_name: events[schema.event_name].where(~mask, self.params.event_name)}
+        if event_type is not None:
+            changed_cols[schema.event_type] = events[schema.event_type].where(~mask, event_type)
+        return events.assign(**changed_cols)
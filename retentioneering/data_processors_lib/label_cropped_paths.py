@@ -94,7 +94,7 @@ class LabelCroppedPaths(DataProcessor):
     def apply(self, eventstream: EventstreamType) -> EventstreamType:
         from retentioneering.eventstream.eventstream import Eventstream
 
-        events: DataFrame = eventstream.to_dataframe(copy=True)
+        events: DataFrame = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
         user_col = eventstream.schema.user_id
         time_col = eventstream.schema.event_timestamp
         type_col = eventstream.schema.event_type
@@ -72,6 +72,11 @@ class LabelLostUsers(DataProcessor):
 
     params: LabelLostUsersParams
 
+    @property
+    def is_user_local(self) -> bool:
+        # the timeout is counted from the last event of the whole eventstream
+        return bool(self.params.lost_users_list) and not self.params.timeout
+
     @track(  # type: ignore
         tracking_info={"event_name": "init"},
         scope="label_lost_users",
@@ -106,7 +111,7 @@ class LabelLostUsers(DataProcessor):
         if not timeout and not lost_users_list:
             raise ValueError("Either timeout or lost_users_list must be specified!")
 
-        df = eventstream.to_dataframe(copy=True)
+        df = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
 
         if timeout and timeout_unit:
             data_lost = df.groupby(user_col, as_index=False).last()
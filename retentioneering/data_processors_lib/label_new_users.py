@@ -55,6 +55,10 @@ class LabelNewUsers(DataProcessor):
 
     params: LabelNewUsersParams
 
+    @property
+    def is_user_local(self) -> bool:
+        return True
+
     @track(  # type: ignore
         tracking_info={"event_name": "init"},
         scope="label_new_users",
@@ -71,7 +75,7 @@ class LabelNewUsers(DataProcessor):
     def apply(self, eventstream: EventstreamType) -> EventstreamType:
         from retentioneering.eventstream.eventstream import Eventstream
 
-        events: DataFrame = eventstream.to_dataframe(copy=True)
+        events: DataFrame = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
         user_col = eventstream.schema.user_id
         type_col = eventstream.schema.event_type
         event_col = eventstream.schema.event_name
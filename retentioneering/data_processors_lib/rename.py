@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from typing import List
 
+import pandas as pd
 from pydantic.dataclasses import dataclass
 
 from retentioneering.data_processor import DataProcessor
-from retentioneering.eventstream.types import EventstreamType
+from retentioneering.eventstream.types import EventstreamSchemaType, EventstreamType
 from retentioneering.params_model import ParamsModel
 from retentioneering.widget.widgets import RenameRulesWidget
 
@@ -34,29 +35,37 @@ class RenameParams(ParamsModel):
 class RenameProcessor(DataProcessor):
     params: RenameParams
 
+    @property
+    def is_user_local(self) -> bool:
+        return True
+
+    @property
+    def is_fusable(self) -> bool:
+        return True
+
     def __init__(self, params: RenameParams):
         super().__init__(params=params)
 
     def apply(self, eventstream: EventstreamType) -> EventstreamType:
         from retentioneering.eventstream.eventstream import Eventstream
 
-        events = eventstream.to_dataframe(copy=True)
-        event_col = eventstream.schema.event_name
+        events = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
+        events = self._apply_to_events(events, eventstream.schema)
+        events["ref"] = events[eventstream.schema.event_id]
+
+        eventstream = Eventstream(
+            raw_data_schema=eventstream.schema.to_raw_data_schema(),
+            raw_data=events,
+            relations=[{"raw_col": "ref", "eventstream": eventstream}],
+        )
+        return eventstream
 
+    def _apply_to_events(self, events: pd.DataFrame, schema: EventstreamSchemaType) -> pd.DataFrame:
         rename_rules: dict[str, str] = dict()
         for rule in self.params.rules:
             to_ = rule.group_name
             for from_ in rule.child_events:
                 rename_rules[from_] = to_
 
-        affected_names = list(rename_rules.keys())
-        affected_events = events[events[event_col].isin(affected_names)]
-        affected_events = events.replace(rename_rules)
-        affected_events["ref"] = events[eventstream.schema.event_id]
-
-        eventstream = Eventstream(
-            raw_data_schema=eventstream.schema.to_raw_data_schema(),
-            raw_data=affected_events,
-            relations=[{"raw_col": "ref", "eventstream": eventstream}],
-        )
-        return eventstream
+        # the renamed column replaces the shared one, so eventstream data is not modified
+        return events.assign(**{schema.event_name: events[schema.event_name].replace(rename_rules)})
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from retentioneering.backend.tracker import track
+from retentioneering.data_processor import DataProcessor
+from retentioneering.eventstream.types import EventstreamType
+from retentioneering.eventstream.user_sample import get_user_sample_mask
+from retentioneering.params_model import ParamsModel
+
+
+class SampleUsersParams(ParamsModel):
+    """
+    A class with parameters for :py:class:`.SampleUsers` class.
+    """
+
+    user_sample_share: float
+    user_sample_seed: Optional[int]
+
+
+class SampleUsers(DataProcessor):
+    """
+    Keep the paths of a deterministic sample of users, removing the paths of all the other users.
+
+    A user is kept if the hash of its ``user_id`` falls into the first ``user_sample_share``
+    of the hash range. The choice doesn't depend on the other users, so the same users are kept
+    in any ``eventstream`` they appear in, e.g. in the data of different days or in the reruns.
+
+    Parameters
+    ----------
+    user_sample_share : float
+        Share of users to keep. The share of the kept users is approximate.
+    user_sample_seed : int, optional
+        A seed value that is used as a key of the ``user_id`` hash. Different seeds give different samples.
+
+    Returns
+    -------
+    Eventstream
+        ``Eventstream`` with events that should be deleted from input ``eventstream`` marked ``_deleted=True``.
+
+    Raises
+    ------
+    ValueError
+        If ``user_sample_share`` is not in the ``[0, 1]`` range.
+
+    Notes
+    -----
+    See :doc:`Data processors user guide</user_guides/dataprocessors>` for the details.
+    """
+
+    params: SampleUsersParams
+
+    @property
+    def is_user_local(self) -> bool:
+        return True
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "init"},
+        scope="sample_users",
+        allowed_params=[],
+    )
+    def __init__(self, params: SampleUsersParams):
+        super().__init__(params=params)
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "apply"},
+        scope="sample_users",
+        allowed_params=[],
+    )
+    def apply(self, eventstream: EventstreamType) -> EventstreamType:
+        from retentioneering.eventstream.eventstream import Eventstream
+
+        user_col = eventstream.schema.user_id
+
+        events = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
+        mask = get_user_sample_mask(events[user_col], self.params.user_sample_share, self.params.user_sample_seed)
+        events = events[~mask]
+        events["ref"] = events.loc[:, eventstream.schema.event_id]
+
+        eventstream = Eventstream(
+            raw_data_schema=eventstream.schema.to_raw_data_schema(),
+            raw_data=events,
+            relations=[{"raw_col": "ref", "eventstream": eventstream}],
+        )
+
+        if not events.empty:
+            eventstream._soft_delete(eventstream.to_dataframe())
+
+        return eventstream
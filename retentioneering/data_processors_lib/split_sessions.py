@@ -106,6 +106,11 @@ class SplitSessions(DataProcessor):
 
     params: SplitSessionsParams
 
+    @property
+    def is_user_local(self) -> bool:
+        # the truncated sessions are marked by the edges of the whole eventstream
+        return not self.params.mark_truncated
+
     @track(  # type: ignore
         tracking_info={"event_name": "init"},
         scope="split_sessions",
@@ -130,11 +135,12 @@ class SplitSessions(DataProcessor):
         timeout, timeout_unit = self.params.timeout
         mark_truncated = self.params.mark_truncated
 
-        df = eventstream.to_dataframe(copy=True)
+        df = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
         df["ref"] = df[eventstream.schema.event_id]
+        user_layout = eventstream._get_user_layout()
 
-        df["prev_timedelta"] = df[time_col] - df.groupby(user_col)[time_col].shift(1)
-        df["next_timedelta"] = df.groupby(user_col)[time_col].shift(-1) - df[time_col]
+        df["prev_timedelta"] = df[time_col] - user_layout.shift(df[time_col], 1)
+        df["next_timedelta"] = user_layout.shift(df[time_col], -1) - df[time_col]
         df["prev_timedelta"] /= np.timedelta64(1, timeout_unit)  # type: ignore
         df["next_timedelta"] /= np.timedelta64(1, timeout_unit)  # type: ignore
 
@@ -142,7 +148,7 @@ class SplitSessions(DataProcessor):
         session_ends_mask = (df["next_timedelta"] > timeout) | (df["next_timedelta"].isnull())
 
         df["is_session_start"] = session_starts_mask
-        df[session_col] = df.groupby(user_col)["is_session_start"].transform(np.cumsum)
+        df[session_col] = user_layout.cumsum(df["is_session_start"])
         df[session_col] = df[user_col].astype(str) + "_" + df[session_col].astype(str)
 
         session_starts = df[session_starts_mask].copy()
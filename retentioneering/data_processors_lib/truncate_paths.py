@@ -66,6 +66,10 @@ class TruncatePaths(DataProcessor):
 
     params: TruncatePathsParams
 
+    @property
+    def is_user_local(self) -> bool:
+        return True
+
     @track(  # type: ignore
         tracking_info={"event_name": "init"},
         scope="truncate_paths",
@@ -93,7 +97,7 @@ class TruncatePaths(DataProcessor):
         shift_before = self.params.shift_before
         shift_after = self.params.shift_after
 
-        df = eventstream.to_dataframe(copy=True)
+        df = eventstream.to_dataframe(columns=eventstream.schema.get_cols())
         params_data: list[Any] = []
 
         if not drop_after and not drop_before:
@@ -19,12 +19,12 @@ def load_simple_shop(as_dataframe: bool = False) -> pd.DataFrame | Eventstream:
         - If ``False`` the dataset is returned as eventstream
         - If ``True`` the dataset is returned as pandas.DataFrame
     """
-    df = pd.read_csv(module_path + "/data/simple-onlineshop.csv")
+    path = module_path + "/data/simple-onlineshop.csv"
     if as_dataframe:
-        return df
+        return pd.read_csv(path)
     else:
-        stream = Eventstream(
-            raw_data=df,
+        stream = Eventstream.from_csv(
+            path,
             raw_data_schema=RawDataSchema(event_name="event", event_timestamp="timestamp", user_id="user_id"),
             schema=EventstreamSchema(),
         )
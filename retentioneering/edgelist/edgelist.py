@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from typing import Iterable
+
+import numpy as np
 import pandas as pd
 
 from retentioneering.eventstream.types import EventstreamType
@@ -40,16 +43,14 @@ class Edgelist:
         return f"next_{self.eventstream.schema.event_name}"
 
     def calculate_edgelist(self, weight_cols: list[str], norm_type: NormType | None = None) -> pd.DataFrame:
-        if norm_type not in (None, "full", "node"):
-            raise ValueError(f"unknown normalization type: {norm_type}")
-
+        self._validate_norm_type(norm_type)
         edge_from, edge_to = self.eventstream.schema.event_name, self.next_event_col
-        df = self.eventstream.to_dataframe()
+        df, events = self._get_edgelist_data(self.eventstream, weight_cols)
         calculated_edgelist: pd.DataFrame = pd.DataFrame()
         for weight_col in weight_cols:
             self.weight_col = weight_col
             edgelist = self._calculate_edgelist_for_selected_weight(
-                df=df, norm_type=norm_type, edge_from=edge_from, edge_to=edge_to
+                df=df, events=events, norm_type=norm_type, edge_from=edge_from, edge_to=edge_to
             )
             if calculated_edgelist.empty:
                 calculated_edgelist = edgelist
@@ -59,6 +60,70 @@ class Edgelist:
         self.edgelist_df = calculated_edgelist
         return calculated_edgelist
 
+    def _calculate_partitions_edgelist(
+        self, eventstreams: Iterable[EventstreamType], weight_cols: list[str], norm_type: NormType | None = None
+    ) -> pd.DataFrame:
+        """
+        Calculate the edgelist of user-disjoint eventstreams, e.g. the partitions of a ``PartitionedEventstream``.
+        Each eventstream is loaded once. Since no transition, user or session is shared by two eventstreams,
+        their transition counts and normalization denominators are summed.
+        """
+        self._validate_norm_type(norm_type)
+        edge_from, edge_to = self.eventstream.schema.event_name, self.next_event_col
+        partials: dict[str, tuple[pd.Series, pd.Series | int | None]] = {}
+        for eventstream in eventstreams:
+            df, events = self._get_edgelist_data(eventstream, weight_cols)
+            for weight_col in weight_cols:
+                self.weight_col = weight_col
+                abs_values, denominator = self._calculate_partial_edgelist(
+                    df=df, events=events, norm_type=norm_type, edge_from=edge_from, edge_to=edge_to
+                )
+                if weight_col in partials:
+                    merged_abs_values, merged_denominator = partials[weight_col]
+                    abs_values = merged_abs_values.add(abs_values, fill_value=0)
+                    if isinstance(denominator, pd.Series):
+                        denominator = merged_denominator.add(denominator, fill_value=0)  # type: ignore
+                    elif denominator is not None:
+                        denominator += merged_denominator  # type: ignore
+                partials[weight_col] = abs_values, denominator
+            del df
+
+        calculated_edgelist: pd.DataFrame = pd.DataFrame()
+        for weight_col in weight_cols:
+            self.weight_col = weight_col
+            abs_values, denominator = partials[weight_col]
+            edgelist = self._normalize_edgelist(abs_values=abs_values, denominator=denominator, norm_type=norm_type)
+            if norm_type is None:
+                # summed counts are float if some transitions are missing in some eventstreams
+                edgelist[weight_col] = edgelist[weight_col].astype(int)
+            if calculated_edgelist.empty:
+                calculated_edgelist = edgelist
+            else:
+                calculated_edgelist = self._merge_edgelist(calculated_edgelist, edge_from, edge_to, edgelist)
+
+        self.edgelist_df = calculated_edgelist
+        return calculated_edgelist
+
+    @staticmethod
+    def _validate_norm_type(norm_type: NormType | None) -> None:
+        if norm_type not in (None, "full", "node"):
+            raise ValueError(f"unknown normalization type: {norm_type}")
+
+    def _get_edgelist_data(self, eventstream: EventstreamType, weight_cols: list[str]) -> tuple[pd.DataFrame, pd.Index]:
+        """
+        Return the events with the event names replaced by their codes and the event names of the codes.
+        The transitions are grouped by the codes, so the event names are not compared as strings.
+        """
+        schema = eventstream.schema
+        columns = [schema.event_id, schema.user_id, schema.event_name]
+        columns += [col for col in weight_cols if col not in columns]
+        df = eventstream.to_dataframe(columns=columns, decode=False)
+        # the codes of an encoded column are taken as they are
+        codes, events = pd.factorize(df[schema.event_name])
+        df[schema.event_name] = codes
+        df[self.next_event_col] = eventstream._get_user_layout().shift(codes, -1)
+        return df, pd.Index(np.asarray(events))
+
     def _merge_edgelist(
         self, calculated_edgelist: pd.DataFrame, edge_from: str, edge_to: str, edgelist: pd.DataFrame
     ) -> pd.DataFrame:
@@ -76,30 +141,54 @@ class Edgelist:
         return calculated_edgelist
 
     def _calculate_edgelist_for_selected_weight(
-        self, df: pd.DataFrame, norm_type: NormType, edge_from: str, edge_to: str
+        self, df: pd.DataFrame, events: pd.Index, norm_type: NormType, edge_from: str, edge_to: str
     ) -> pd.DataFrame:
-        possible_transitions = (
-            df.assign(**{edge_to: lambda _df: _df.groupby(self.eventstream.schema.user_id)[edge_from].shift(-1)})
-            .dropna(subset=[edge_to])
-            .groupby([edge_from, edge_to])
-            .size()
-            .index
-        )
-        bigrams = df.assign(**{edge_to: lambda _df: _df.groupby(self.group_col)[edge_from].shift(-1)}).dropna(
-            subset=[edge_to]
+        abs_values, denominator = self._calculate_partial_edgelist(
+            df=df, events=events, norm_type=norm_type, edge_from=edge_from, edge_to=edge_to
         )
+        return self._normalize_edgelist(abs_values=abs_values, denominator=denominator, norm_type=norm_type)
+
+    def _calculate_partial_edgelist(
+        self, df: pd.DataFrame, events: pd.Index, norm_type: NormType, edge_from: str, edge_to: str
+    ) -> tuple[pd.Series, pd.Series | int | None]:
+        # the next events of the users are calculated in _get_edgelist_data
+        user_bigrams = df.dropna(subset=[edge_to])
+        possible_transitions = user_bigrams.groupby([edge_from, edge_to]).size().index
+        if self.group_col == self.eventstream.schema.user_id:
+            bigrams = user_bigrams
+        else:
+            bigrams = df.assign(**{edge_to: lambda _df: _df.groupby(self.group_col)[edge_from].shift(-1)}).dropna(
+                subset=[edge_to]
+            )
         abs_values = bigrams.groupby([edge_from, edge_to])[self.weight_col].nunique()
         if self.weight_col != self.eventstream.schema.event_id:
             abs_values = abs_values.reindex(possible_transitions)
-        edgelist = abs_values
+        denominator: pd.Series | int | None = None
         # denumerator_full = total number of transitions/users/sessions
         if norm_type == "full":
-            denumerator_full = bigrams[self.weight_col].nunique()
-            edgelist = abs_values / denumerator_full
+            denominator = bigrams[self.weight_col].nunique()
         # denumerator_node = total number of transitions/users/sessions that started with edge_from event
         if norm_type == "node":
-            denumerator_node = bigrams.groupby([edge_from])[self.weight_col].nunique()
-            edgelist = abs_values / denumerator_node
+            denominator = bigrams.groupby([edge_from])[self.weight_col].nunique()
+            denominator = self._label_edges(denominator, events)
+        return self._label_edges(abs_values, events), denominator
+
+    @staticmethod
+    def _label_edges(values: pd.Series, events: pd.Index) -> pd.Series:
+        # the event names are taken for the unique transitions only and are sorted as if they were grouped
+        index = values.index
+        levels = [index.get_level_values(level).astype(int) for level in range(index.nlevels)]
+        labeled = pd.MultiIndex.from_arrays([events.take(codes) for codes in levels], names=index.names)
+        if not isinstance(index, pd.MultiIndex):
+            labeled = labeled.get_level_values(0)
+        return values.set_axis(labeled).sort_index()
+
+    def _normalize_edgelist(
+        self, abs_values: pd.Series, denominator: pd.Series | int | None, norm_type: NormType
+    ) -> pd.DataFrame:
+        edgelist = abs_values
+        if norm_type in ("full", "node"):
+            edgelist = abs_values / denominator
         if self.weight_col not in [self.eventstream.schema.event_id, self.eventstream.schema.user_id]:
             edgelist = edgelist.fillna(0)
 
@@ -4,4 +4,7 @@
 # * You can obtain License text at https://github.com/retentioneering/retentioneering-tools/blob/master/LICENSE.md
 
 from .eventstream import Eventstream
+from .partitioned_eventstream import PartitionedEventstream
 from .schema import EventstreamSchema, RawDataSchema
+from .shared_frame import SharedFrame
+from .user_layout import UserLayout
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+EVENT_ID_DTYPE = "int64"
+RELATION_COL_DTYPE = "Int64"
+
+# every lineage owns a contiguous block of 2**40 ids, so ids stay unique across
+# unrelated eventstreams of the same process and can be appended to each other
+LINEAGE_ID_BITS = 40
+_next_lineage = 0
+_lineage_lock = threading.Lock()
+
+# random high bits make exported uuids unique across sessions
+_EVENT_UUID_NAMESPACE = uuid.uuid4().int & ~((1 << 64) - 1)
+
+
+class EventIdAllocator:
+    """
+    Monotonic allocator of ``int64`` event identifiers shared by an eventstream lineage.
+
+    A source eventstream creates a new allocator. Its copies and the eventstreams
+    derived from it by data processors share the same allocator,
+    so all the events of a lineage get unique identifiers.
+    """
+
+    lineage: int
+    __next_id: int
+    __lock: threading.Lock
+
+    def __init__(self) -> None:
+        global _next_lineage
+        with _lineage_lock:
+            self.lineage = _next_lineage
+            _next_lineage += 1
+        self.__next_id = self.lineage << LINEAGE_ID_BITS
+        self.__lock = threading.Lock()
+
+    def allocate(self, size: int) -> np.ndarray:
+        with self.__lock:
+            start = self.__next_id
+            self.__next_id += size
+        return np.arange(start, start + size, dtype=EVENT_ID_DTYPE)
+
+    @property
+    def next_id(self) -> int:
+        return self.__next_id
+
+    @property
+    def next_offset(self) -> int:
+        """
+        Offset of the next identifier in the block of the lineage. It doesn't depend on the lineage number,
+        so it can be saved and compared across sessions.
+        """
+        return self.__next_id - (self.lineage << LINEAGE_ID_BITS)
+
+    def advance(self, offset: int) -> None:
+        """
+        Skip the identifiers with smaller offsets in the lineage, e.g. the ones allocated in another session.
+        """
+        with self.__lock:
+            self.__next_id = max(self.__next_id, (self.lineage << LINEAGE_ID_BITS) + offset)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"lineage": self.lineage, "next_id": self.__next_id}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        global _next_lineage
+        self.lineage = state["lineage"]
+        self.__next_id = state["next_id"]
+        self.__lock = threading.Lock()
+        # lineages created afterwards must not reuse the restored one
+        with _lineage_lock:
+            _next_lineage = max(_next_lineage, self.lineage + 1)
+
+    @classmethod
+    def restore(cls, lineage: int, next_id: int) -> EventIdAllocator:
+        """
+        Restore an allocator of a saved eventstream lineage.
+        """
+        allocator = cls.__new__(cls)
+        allocator.__setstate__({"lineage": lineage, "next_id": next_id})
+        return allocator
+
+
+def to_relation_col(col: pd.Series | float) -> pd.Series | float:
+    if not isinstance(col, pd.Series):
+        return col
+    return col.astype(RELATION_COL_DTYPE)
+
+
+def event_ids_to_uuid(event_ids: pd.Series) -> pd.Series:
+    """
+    Convert ``int64`` event identifiers to ``uuid.UUID`` objects, e.g. for data export.
+    The same identifier is always converted to the same ``uuid`` within one session.
+
+    Parameters
+    ----------
+    event_ids : pd.Series
+        A column with event identifiers.
+
+    Returns
+    -------
+    pd.Series
+    """
+    values = [uuid.UUID(int=_EVENT_UUID_NAMESPACE | int(event_id)) for event_id in event_ids]
+    return pd.Series(values, index=event_ids.index, name=event_ids.name, dtype=object)
@@ -1,23 +1,41 @@
 # flake8: noqa
 from __future__ import annotations
 
-import uuid
+import hashlib
+import json
 import warnings
-from collections.abc import Collection
-from typing import Any, Callable, List, Literal, MutableMapping, Optional, Tuple
+import weakref
+from collections.abc import Collection, Iterable, Iterator
+from dataclasses import asdict
+from typing import Any, Callable, List, Literal, MutableMapping, Optional, Tuple, cast
 
 import numpy as np
 import pandas as pd
 
 from retentioneering.backend.tracker import track
 from retentioneering.constants import DATETIME_UNITS
+from retentioneering.eventstream.event_id import (
+    EVENT_ID_DTYPE,
+    LINEAGE_ID_BITS,
+    EventIdAllocator,
+    to_relation_col,
+)
 from retentioneering.eventstream.schema import EventstreamSchema, RawDataSchema
+from retentioneering.eventstream.shared_frame import SharedFrame
 from retentioneering.eventstream.types import (
     EventstreamType,
+    RawColsPolicy,
     RawDataCustomColSchema,
     RawDataSchemaType,
     Relation,
 )
+from retentioneering.eventstream.user_layout import UserLayout
+from retentioneering.eventstream.user_sample import (
+    get_user_partitions,
+    get_user_sample,
+    get_user_sample_mask,
+    validate_user_sample_share,
+)
 from retentioneering.preprocessing_graph import PreprocessingGraph
 from retentioneering.tooling import (
     Clusters,
@@ -56,6 +74,7 @@ from .helpers import (
     LabelLostUsersHelperMixin,
     LabelNewUsersHelperMixin,
     RenameHelperMixin,
+    SampleUsersHelperMixin,
     SplitSessionsHelperMixin,
     TruncatePathsHelperMixin,
 )
@@ -92,6 +111,38 @@ DEFAULT_INDEX_ORDER: IndexOrder = [
 
 RAW_COL_PREFIX = "raw_"
 DELETE_COL_NAME = "_deleted"
+# parsing string timestamps without a format falls back to per-value inference
+TIMESTAMP_INFERENCE_WARNING_ROWS = 100_000
+PARQUET_METADATA_KEY = b"retentioneering"
+CSV_CHUNKSIZE = 1_000_000
+
+
+def _to_weak_relation(relation: Relation) -> Relation:
+    eventstream = relation["eventstream"]
+    if not isinstance(eventstream, weakref.ProxyTypes):
+        eventstream = weakref.proxy(eventstream)
+    return {"raw_col": relation["raw_col"], "eventstream": eventstream}
+
+
+def _import_pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as err:
+        raise ImportError("pyarrow package is required to save and load eventstream parquet files") from err
+    return pa, pq
+
+
+def _get_related_eventstream(relation: Relation) -> Optional[EventstreamType]:
+    """
+    Return the related eventstream or ``None`` if it has already been garbage collected.
+    """
+    eventstream = relation["eventstream"]
+    try:
+        eventstream.relations
+    except ReferenceError:
+        return None
+    return eventstream
 
 
 # @TODO: проработать резервирование колонок
@@ -111,6 +162,7 @@ class Eventstream(
     LabelCroppedPathsHelperMixin,
     TruncatePathsHelperMixin,
     RenameHelperMixin,
+    SampleUsersHelperMixin,
     EventstreamType,
 ):
     """
@@ -141,13 +193,33 @@ class Eventstream(
     index_order : list of str, default DEFAULT_INDEX_ORDER
         Sorting order for ``event_type`` column.
     relations : list, optional
+        Parent eventstreams and the ``raw_data`` columns referencing their ``event_id``.
+        Only weak references to the parent eventstreams are kept,
+        so they are released as soon as nothing else uses them.
     user_sample_size : int of float, optional
-        Number (``int``) or share (``float``) of all users' trajectories that will be randomly chosen
-        and left in final sample (all other trajectories will be removed) .
-        See :numpy_random_choice:`numpy documentation<>`.
+        Number (``int``) or share (``float``) of all users' trajectories that will be chosen
+        and left in final sample (all other trajectories will be removed).
+        The users with the lowest hashes of ``user_id`` are chosen, so the same ``raw_data``
+        always gives the same sample.
     user_sample_seed : int, optional
-        A seed value that is used to generate user samples.
-        See :numpy_random_seed:`numpy documentation<>`.
+        A seed value that is used as a key of the ``user_id`` hash. Different seeds give different samples.
+    encode_cols : bool, default True
+        If ``True`` - ``event_name``, ``event_type`` and ``user_id`` columns are stored
+        as integer codes plus a shared vocabulary (pandas ``category`` dtype).
+        ``to_dataframe()`` decodes them back to the original labels.
+    raw_cols : {"all", "reference", "none"} or list of str, optional
+        Which original ``raw_data`` columns are kept in the ``eventstream`` with ``raw_`` prefix:
+
+        - ``all`` - all the columns are copied.
+        - list of column names - only the listed columns are copied.
+        - ``reference`` - all the columns are kept without copying, so they share memory with ``raw_data``
+          and must not be modified in place. If the events aren't sorted by timestamp,
+          they are copied by the sorting as the schema columns are.
+        - ``none`` - no raw columns are kept and ``raw_data`` is not copied,
+          only the schema columns are taken from it.
+
+        If ``None``, the policy is inherited from the related eventstreams:
+        ``none`` if any of them uses it, ``all`` otherwise.
 
     Notes
     -----
@@ -159,8 +231,15 @@ class Eventstream(
     schema: EventstreamSchema
     index_order: IndexOrder
     relations: List[Relation]
+    encode_cols: bool
+    raw_cols: RawColsPolicy
+    _event_id_allocator: EventIdAllocator
+    _instances: weakref.WeakSet[Eventstream] = weakref.WeakSet()
     _preprocessing_graph: PreprocessingGraph | None = None
     __clusters: Clusters | None = None
+    __not_deleted_events: pd.DataFrame | None = None
+    __user_layout: UserLayout | None = None
+    _version: int = 0
 
     __raw_data_schema: RawDataSchemaType
     __events: pd.DataFrame | pd.Series[Any]
@@ -186,6 +265,8 @@ class Eventstream(
             "relations",
             "user_sample_size",
             "user_sample_seed",
+            "encode_cols",
+            "raw_cols",
         ],
     )
     def __init__(
@@ -201,8 +282,11 @@ class Eventstream(
         relations: Optional[List[Relation]] = None,
         user_sample_size: Optional[int | float] = None,
         user_sample_seed: Optional[int] = None,
+        encode_cols: bool = True,
+        raw_cols: Optional[RawColsPolicy] = None,
     ) -> None:
         self.schema = schema if schema else EventstreamSchema()
+        self.encode_cols = encode_cols
 
         if not raw_data_schema:
             raw_data_schema = RawDataSchema()
@@ -221,11 +305,15 @@ class Eventstream(
         if not relations:
             self.relations = []
         else:
-            self.relations = relations
+            self.relations = [_to_weak_relation(relation) for relation in relations]
+        self._event_id_allocator = self.__get_event_id_allocator()
+        self.raw_cols = raw_cols if raw_cols is not None else self.__get_raw_cols_policy()
         self.__events = self.__prepare_events(raw_data) if prepare else raw_data
         self.__events = self.__required_cleanup(events=self.__events)
+        self.__events = self.__encode_events(events=self.__events)
         self.index_events()
         self._preprocessing_graph = None
+        Eventstream._instances.add(self)
 
     @track(  # type: ignore
         tracking_info={"event_name": "copy"},
@@ -241,14 +329,18 @@ class Eventstream(
         Eventstream
 
         """
-        return Eventstream(
+        copied = Eventstream(
             raw_data_schema=self.__raw_data_schema.copy(),
             raw_data=self.__events.copy(),
             schema=self.schema.copy(),
             prepare=False,
             index_order=self.index_order.copy(),
             relations=self.relations.copy(),
+            encode_cols=self.encode_cols,
+            raw_cols=self.raw_cols,
         )
+        copied._event_id_allocator = self._event_id_allocator
+        return copied
 
     @track(  # type: ignore
         tracking_info={"event_name": "append_eventstream"},
@@ -275,8 +367,9 @@ class Eventstream(
         if not self.schema.is_equal(eventstream.schema):
             raise ValueError("invalid schema: joined eventstream")
 
-        curr_events = self.to_dataframe(raw_cols=True, show_deleted=True)
-        new_events = eventstream.to_dataframe(raw_cols=True, show_deleted=True)
+        keep_raw_cols = self.raw_cols != "none"
+        curr_events = self.to_dataframe(raw_cols=keep_raw_cols, show_deleted=True)
+        new_events = eventstream.to_dataframe(raw_cols=keep_raw_cols, show_deleted=True)
 
         merged_events = pd.merge(
             curr_events,
@@ -305,8 +398,8 @@ class Eventstream(
         right_events = pd.concat([right_events, both_events_deleted_left, both_events_not_deleted])
         left_events = pd.concat([left_events, both_events_deleted_right])
 
-        left_raw_cols = self._get_raw_cols()
-        right_raw_cols = eventstream._get_raw_cols()
+        left_raw_cols = self._get_raw_cols() if keep_raw_cols else []
+        right_raw_cols = eventstream._get_raw_cols() if keep_raw_cols else []
         cols = self.schema.get_cols()
 
         result_left_part = pd.DataFrame()
@@ -336,15 +429,91 @@ class Eventstream(
             result_right_part[DELETE_COL_NAME] = get_merged_col(df=right_events, colname=DELETE_COL_NAME, suffix="_y")
 
         self.__events = pd.concat([result_left_part, result_both_part, result_right_part])
+        self.__events[self.schema.event_id] = self.__events[self.schema.event_id].astype(EVENT_ID_DTYPE)
+        self.__events = self.__encode_events(events=self.__events)
         self.index_events()
 
-    def _join_eventstream(self, eventstream: Eventstream) -> None:  # type: ignore
+    @track(  # type: ignore
+        tracking_info={"event_name": "union"},
+        scope="eventstream",
+        allowed_params=[],
+    )
+    def union(self, eventstreams: List[Eventstream]) -> None:  # type: ignore
+        """
+        Append several ``eventstreams`` with the same schema at once.
+
+        The result is the same as appending the ``eventstreams`` one by one with :py:meth:`append_eventstream`:
+        if an event is present in several ``eventstreams``, its last not deleted copy is kept,
+        or its first copy if all of them are deleted. But the events are deduplicated by ``event_id``
+        with a single hash table, and the sorted events of all the ``eventstreams`` are merged
+        without sorting them again.
+
+        Parameters
+        ----------
+        eventstreams : list of Eventstream
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If ``EventstreamSchemas`` of the ``eventstreams`` are not equal.
+        """
+        if not all(self.schema.is_equal(eventstream.schema) for eventstream in eventstreams):
+            raise ValueError("invalid schema: joined eventstream")
+
+        parts = []
+        for eventstream in [self, *eventstreams]:
+            events = eventstream.__events
+            excluded_cols = [self.schema.event_index, *eventstream._get_relation_cols()]
+            if self.raw_cols == "none":
+                excluded_cols += eventstream._get_raw_cols()
+            columns = [col for col in events.columns if col not in excluded_cols]
+            parts.append(self.__project_events(events, columns, copy=False))
+
+        is_kept = self.__get_union_mask(parts)
+        positions = np.flatnonzero(is_kept)
+        sort_keys = [self.__get_sort_keys(part) for part in parts]
+        if all(part_sort_keys is not None for part_sort_keys in sort_keys):
+            bounds = np.cumsum([0, *[len(part) for part in parts]])
+            run_sizes = [int(is_kept[start:end].sum()) for start, end in zip(bounds[:-1], bounds[1:])]
+            timestamps = np.concatenate([part_sort_keys[0] for part_sort_keys in sort_keys])  # type: ignore
+            priorities = np.concatenate([part_sort_keys[1] for part_sort_keys in sort_keys])  # type: ignore
+            # the events of each eventstream are sorted, so they are merged instead of sorting all the events again
+            positions = positions[
+                self.__merge_sorted_runs(timestamps[positions], priorities[positions], run_sizes=run_sizes)
+            ]
+
+        events = self.__concat_events(parts)
+        del parts
+        self.__events = self.__encode_events(events=events.take(positions))
+        self.relations = []
+        self.index_events()
+
+    def __get_union_mask(self, parts: List[pd.DataFrame]) -> np.ndarray:
+        event_ids = np.concatenate([part[self.schema.event_id].to_numpy() for part in parts])
+        is_deleted = np.concatenate([part[DELETE_COL_NAME].to_numpy(dtype=bool) for part in parts])
+        not_deleted_ids = pd.Series(event_ids[~is_deleted])
+        deleted_ids = pd.Series(event_ids[is_deleted])
+
+        is_kept = np.empty(len(event_ids), dtype=bool)
+        is_kept[~is_deleted] = ~not_deleted_ids.duplicated(keep="last").to_numpy()
+        is_kept[is_deleted] = ~(deleted_ids.duplicated(keep="first") | deleted_ids.isin(not_deleted_ids)).to_numpy()
+        return is_kept
+
+    def _join_eventstream(self, eventstream: Eventstream, index: bool = True) -> None:  # type: ignore
+        """
+        Replace the events referenced by the joined ``eventstream`` and add its new events.
+        If ``index=False``, the caller must call :py:meth:`index_events` afterwards.
+        """
         if not self.schema.is_equal(eventstream.schema):
             raise ValueError("invalid schema: joined eventstream")
 
         relation_i = find_index(
             input_list=eventstream.relations,
-            cond=lambda rel: rel["eventstream"] == self,
+            cond=lambda rel: _get_related_eventstream(rel) == self,
         )
 
         if relation_i == -1:
@@ -352,65 +521,65 @@ class Eventstream(
 
         relation_col_name = f"ref_{relation_i}"
 
-        curr_events = self.to_dataframe(raw_cols=True, show_deleted=True)
-        joined_events = eventstream.to_dataframe(raw_cols=True, show_deleted=True)
-        not_related_events = joined_events[joined_events[relation_col_name].isna()]
-        not_related_events_ids = not_related_events[self.schema.event_id]
+        keep_raw_cols = self.raw_cols != "none"
+        curr_events = self.to_dataframe(raw_cols=keep_raw_cols, show_deleted=True, decode=False)
+        joined_events = eventstream.to_dataframe(raw_cols=keep_raw_cols, show_deleted=True, decode=False)
         user_id_type = curr_events.dtypes[self.schema.user_id]
 
-        merged_events = pd.merge(
-            curr_events,
-            joined_events,
-            left_on=self.schema.event_id,
-            right_on=relation_col_name,
-            how="outer",
-            indicator=True,
+        # find positions of the parent events referenced by the joined events
+        relation_col = joined_events[relation_col_name]
+        is_related = relation_col.notna().to_numpy()
+        parent_positions = np.full(len(joined_events), -1, dtype=np.int64)
+        parent_positions[is_related] = pd.Index(curr_events[self.schema.event_id]).get_indexer(
+            relation_col[is_related].astype(EVENT_ID_DTYPE)
         )
+        is_replacing = parent_positions >= 0
+        is_replaced = np.zeros(len(curr_events), dtype=bool)
+        is_replaced[parent_positions[is_replacing]] = True
 
-        left_id_colname = f"{self.schema.event_id}_y"
-
-        left_events = merged_events[(merged_events["_merge"] == "left_only")]
-        both_events = merged_events[(merged_events["_merge"] == "both")]
-        right_events = merged_events[(merged_events[left_id_colname].isin(not_related_events_ids))]
-
-        left_raw_cols = self._get_raw_cols()
-        right_raw_cols = eventstream._get_raw_cols()
+        left_raw_cols = self._get_raw_cols() if keep_raw_cols else []
+        right_raw_cols = eventstream._get_raw_cols() if keep_raw_cols else []
         cols = self._get_both_cols(eventstream)
 
-        result_left_part = pd.DataFrame()
-        result_right_part = pd.DataFrame()
-        result_both_part = pd.DataFrame()
+        # parent events that are not referenced keep their own values
+        left_part = curr_events.loc[~is_replaced, [col for col in cols + left_raw_cols if col in curr_events]]
+        left_part[DELETE_COL_NAME] = curr_events.loc[~is_replaced, DELETE_COL_NAME]
 
+        # referenced parent events are replaced with the joined events, keeping parent event_id and raw columns
+        replacing_events = joined_events[is_replacing]
+        replaced_events = curr_events.take(parent_positions[is_replacing])
+        # the columns are assigned as aligned series, so their dtypes are kept, e.g. date strings of raw columns
+        replaced_events.index = replacing_events.index
+        both_part = pd.DataFrame(index=replacing_events.index)
         for col in cols:
-            result_left_part[col] = get_merged_col(df=left_events, colname=col, suffix="_x")
-            result_right_part[col] = get_merged_col(df=right_events, colname=col, suffix="_y")
-            result_both_part[col] = get_merged_col(df=both_events, colname=col, suffix="_y")
-
+            both_part[col] = replacing_events[col] if col in replacing_events else replaced_events[col]  # type: ignore
         for col in left_raw_cols:
-            result_both_part[col] = get_merged_col(df=both_events, colname=col, suffix="_x")
-            result_left_part[col] = get_merged_col(df=left_events, colname=col, suffix="_x")
-
-        for col in right_raw_cols:
-            result_right_part[col] = get_merged_col(df=right_events, colname=col, suffix="_y")
-
-        result_left_part[DELETE_COL_NAME] = get_merged_col(df=left_events, colname=DELETE_COL_NAME, suffix="_x")
-
-        right_delete_col = f"{DELETE_COL_NAME}_y"
-        result_right_part[DELETE_COL_NAME] = right_events[right_delete_col]
-        result_both_part[DELETE_COL_NAME] = both_events[right_delete_col]
-
-        result_both_part[self.schema.event_id] = get_merged_col(
-            df=both_events, colname=self.schema.event_id, suffix="_x"
+            both_part[col] = replaced_events[col]
+        both_part[DELETE_COL_NAME] = replacing_events[DELETE_COL_NAME]
+        both_part[self.schema.event_id] = replaced_events[self.schema.event_id]
+
+        # not related joined events are added as is
+        right_part = joined_events.loc[
+            ~is_related, [col for col in cols + right_raw_cols if col in joined_events] + [DELETE_COL_NAME]
+        ]
+
+        # keep parent order for the parent events, so index_events only has to merge in the new ones
+        parent_order = np.argsort(
+            np.concatenate([np.flatnonzero(~is_replaced), parent_positions[is_replacing]]), kind="stable"
         )
-        with warnings.catch_warnings():
-            # disable warning for pydantic schema Callable type
-            warnings.simplefilter(action="ignore", category=FutureWarning)
-            self.__events = pd.concat([result_left_part, result_right_part, result_both_part])
+        parent_part = self.__concat_events([left_part, both_part]).take(parent_order)
+        self.__events = self.__concat_events([parent_part, right_part])
 
-        self.__events[self.schema.user_id] = self.__events[self.schema.user_id].astype(user_id_type)
+        if not isinstance(user_id_type, pd.CategoricalDtype):
+            self.__events[self.schema.user_id] = self.__events[self.schema.user_id].astype(user_id_type)
+        self.__events[self.schema.event_id] = self.__events[self.schema.event_id].astype(EVENT_ID_DTYPE)
 
+        self.__events = self.__encode_events(events=self.__events)
         self.schema.custom_cols = self._get_both_custom_cols(eventstream)
-        self.index_events()
+        if index:
+            self.index_events()
+        else:
+            self.__reset_caches()
 
     def _get_both_custom_cols(self, eventstream: Eventstream) -> list[str]:
         self_custom_cols = set(self.schema.custom_cols)
@@ -424,7 +593,14 @@ class Eventstream(
         all_cols = self_cols.union(eventstream_cols)
         return list(all_cols)
 
-    def to_dataframe(self, raw_cols: bool = False, show_deleted: bool = False, copy: bool = False) -> pd.DataFrame:
+    def to_dataframe(
+        self,
+        raw_cols: bool = False,
+        show_deleted: bool = False,
+        copy: bool = False,
+        decode: bool = True,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
         """
         Convert ``eventstream`` to ``pd.Dataframe``
 
@@ -437,21 +613,34 @@ class Eventstream(
         copy : bool, default False
             If ``True`` - copy data from current ``eventstream``.
             See details in the :pandas_copy:`pandas documentation<>`.
+        decode : bool, default True
+            If ``True`` - encoded columns are converted back to their original labels.
+            If ``False`` - encoded columns are returned with pandas ``category`` dtype.
+        columns : list of str, optional
+            Names of the columns to return. If ``copy=False``, the columns share memory
+            with ``eventstream`` and must not be modified in place.
+            If ``None`` - all schema, relation and requested raw columns are returned.
 
         Returns
         -------
         pd.DataFrame
 
         """
-        cols = self.schema.get_cols() + self._get_relation_cols()
+        events = self.__events if show_deleted else self.__get_not_deleted_events()
+
+        if columns is not None:
+            view = self.__project_events(events=events, columns=columns, copy=copy)
+        else:
+            cols = self.schema.get_cols() + self._get_relation_cols()
 
-        if raw_cols:
-            cols += self._get_raw_cols()
-        if show_deleted:
-            cols.append(DELETE_COL_NAME)
+            if raw_cols:
+                cols += self._get_raw_cols()
+            if show_deleted:
+                cols.append(DELETE_COL_NAME)
 
-        events = self.__events if show_deleted else self.__get_not_deleted_events()
-        view = pd.DataFrame(events, columns=cols, copy=copy)
+            view = pd.DataFrame(events, columns=cols, copy=copy)
+        if decode:
+            view = self.__decode_events(events=view)
         return view
 
     @track(  # type: ignore
@@ -468,16 +657,111 @@ class Eventstream(
         None
 
         """
-        order_temp_col_name = "order"
         indexed = self.__events
 
-        indexed[order_temp_col_name] = indexed[self.schema.event_type].apply(lambda e: self.__get_event_priority(e))
-        indexed = indexed.sort_values([self.schema.event_timestamp, order_temp_col_name])  # type: ignore
-        indexed = indexed.drop([order_temp_col_name], axis=1)
-        # indexed[id_col_col_name] = range(1, len(indexed) + 1)
+        if (sort_keys := self.__get_sort_keys(indexed)) is not None:
+            positions = self.__get_sorted_positions(*sort_keys)
+            if not np.array_equal(positions, np.arange(len(indexed))):
+                indexed = indexed.take(positions)
+        else:
+            order_temp_col_name = "order"
+            indexed[order_temp_col_name] = self.__get_event_priorities(indexed[self.schema.event_type])
+            indexed = indexed.sort_values([self.schema.event_timestamp, order_temp_col_name])  # type: ignore
+            indexed = indexed.drop([order_temp_col_name], axis=1)
+
         indexed.reset_index(inplace=True, drop=True)
         indexed[self.schema.event_index] = indexed.index
         self.__events = indexed
+        self.__reset_caches()
+
+    @staticmethod
+    def __get_sorted_positions(timestamps: np.ndarray, priorities: np.ndarray) -> np.ndarray:
+        """
+        Return positions that stably sort events by timestamp and priority.
+
+        Events are usually already sorted except for the rows appended to the end,
+        so the longest sorted prefix is kept as is and only the rest is sorted
+        and merged into it.
+        """
+        size = len(timestamps)
+        timestamps_diff = np.diff(timestamps)
+        is_ordered = (timestamps_diff > 0) | ((timestamps_diff == 0) & (np.diff(priorities) >= 0))
+        unordered = np.flatnonzero(~is_ordered)
+        if len(unordered) == 0:
+            return np.arange(size)
+
+        prefix_size = unordered[0] + 1
+        suffix_timestamps, suffix_priorities = timestamps[prefix_size:], priorities[prefix_size:]
+        suffix_order = np.lexsort((suffix_priorities, suffix_timestamps))
+
+        merged = Eventstream.__merge_sorted_positions(
+            left_timestamps=timestamps[:prefix_size],
+            left_priorities=priorities[:prefix_size],
+            right_timestamps=suffix_timestamps[suffix_order],
+            right_priorities=suffix_priorities[suffix_order],
+        )
+        return np.concatenate([np.arange(prefix_size), suffix_order + prefix_size])[merged]
+
+    @staticmethod
+    def __merge_sorted_positions(
+        left_timestamps: np.ndarray,
+        left_priorities: np.ndarray,
+        right_timestamps: np.ndarray,
+        right_priorities: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Return positions that merge two sorted runs of events placed one after another.
+        Left run events go first if the keys are equal.
+        """
+        left_size, right_size = len(left_timestamps), len(right_timestamps)
+        size = left_size + right_size
+        if left_size == 0 or right_size == 0:
+            return np.arange(size)
+
+        # for the right events having a timestamp equal to a left one, the position is found
+        # by the composite key (first left position of the timestamp, priority)
+        lower = np.searchsorted(left_timestamps, right_timestamps, side="left")
+        upper = np.searchsorted(left_timestamps, right_timestamps, side="right")
+        key_base = int(max(left_priorities.max(), right_priorities.max())) + 1
+        timestamp_starts = np.searchsorted(left_timestamps, left_timestamps, side="left")
+        left_keys = timestamp_starts * key_base + left_priorities
+        right_keys = lower * key_base + right_priorities
+        insert_positions = np.where(
+            upper > lower,
+            np.searchsorted(left_keys, right_keys, side="right"),
+            lower,
+        )
+
+        right_slots = insert_positions + np.arange(right_size)
+        positions = np.empty(size, dtype=np.int64)
+        is_right_slot = np.zeros(size, dtype=bool)
+        is_right_slot[right_slots] = True
+        positions[right_slots] = np.arange(left_size, size)
+        positions[~is_right_slot] = np.arange(left_size)
+        return positions
+
+    @staticmethod
+    def __merge_sorted_runs(timestamps: np.ndarray, priorities: np.ndarray, run_sizes: List[int]) -> np.ndarray:
+        """
+        Return positions that merge sorted runs of events placed one after another.
+        Runs are merged pairwise, so each event is moved ``log(runs)`` times.
+        """
+        bounds = np.cumsum([0, *run_sizes])
+        runs = [np.arange(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+        while len(runs) > 1:
+            merged_runs = []
+            for left, right in zip(runs[::2], runs[1::2]):
+                merged = Eventstream.__merge_sorted_positions(
+                    left_timestamps=timestamps[left],
+                    left_priorities=priorities[left],
+                    right_timestamps=timestamps[right],
+                    right_priorities=priorities[right],
+                )
+                merged_runs.append(np.concatenate([left, right])[merged])
+            if len(runs) % 2:
+                merged_runs.append(runs[-1])
+            runs = merged_runs
+        return runs[0] if runs else np.arange(0)
 
     def _get_raw_cols(self) -> list[str]:
         cols: list[str] | pd.Index = self.__events.columns
@@ -487,6 +771,11 @@ class Eventstream(
                 raw_cols.append(col)  # type: ignore
         return raw_cols
 
+    def _get_encoded_cols(self) -> list[str]:
+        if not self.encode_cols:
+            return []
+        return [self.schema.event_name, self.schema.event_type, self.schema.user_id]
+
     def _get_relation_cols(self) -> list[str]:
         cols = self.__events.columns
         relation_cols: list[str] = []
@@ -520,44 +809,761 @@ class Eventstream(
         self.__raw_data_schema.custom_cols.extend([{"custom_col": name, "raw_data_col": name}])
         self.schema.custom_cols.extend([name])
         self.__events[name] = data
+        self.__reset_caches()
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "compact"},
+        scope="eventstream",
+        allowed_params=[],
+    )
+    def compact(self) -> None:
+        """
+        Physically remove soft-deleted events and relation columns from ``eventstream``.
+        References to the related eventstreams are released, so they can be garbage collected.
+        ``event_index`` is recalculated.
+
+        Returns
+        -------
+        None
+        """
+        events = self.__get_not_deleted_events()
+        self.__events = events.drop(columns=self._get_relation_cols())
+        self.relations = []
+        self.index_events()
+
+    def _split_by_users(self, n_partitions: int, user_sample_seed: Optional[int] = None) -> Iterator[Eventstream]:
+        """
+        Split not deleted events into ``n_partitions`` user-disjoint eventstreams by the hash of ``user_id``.
+        The events keep their ``event_id`` and the partitions share the ``event_id`` lineage with this
+        ``eventstream``, so the events created in them never get the same identifiers. Relations are not kept.
+        """
+        events = self.__get_not_related_events()
+        partitions = get_user_partitions(events[self.schema.user_id], n_partitions, user_sample_seed)
+        for partition in range(n_partitions):
+            yield self.__copy_events(events[partitions == partition].reset_index(drop=True))
+
+    def _get_user_partition(self, n_partitions: int, partition: int) -> Eventstream:
+        """
+        Return the ``partition``-th of the eventstreams made by :py:meth:`_split_by_users`
+        without splitting the other partitions.
+        """
+        events = self.__get_not_related_events()
+        is_partition = get_user_partitions(events[self.schema.user_id], n_partitions) == partition
+        return self.__copy_events(events[is_partition].reset_index(drop=True))
+
+    def __get_not_related_events(self) -> pd.DataFrame | pd.Series[Any]:
+        events = self.__get_not_deleted_events()
+        # dropping no columns would still copy the events
+        if relation_cols := self._get_relation_cols():
+            events = events.drop(columns=relation_cols)
+        return events
+
+    def __copy_events(self, events: pd.DataFrame | pd.Series[Any]) -> Eventstream:
+        eventstream = Eventstream(
+            raw_data_schema=self.__raw_data_schema.copy(),
+            raw_data=events,
+            schema=self.schema.copy(),
+            prepare=False,
+            index_order=self.index_order.copy(),
+            encode_cols=self.encode_cols,
+            raw_cols=self.raw_cols,
+        )
+        eventstream._event_id_allocator = self._event_id_allocator
+        return eventstream
+
+    def _merge_user_partitions(self, partitions: List[SharedFrame]) -> None:
+        """
+        Replace the events with the ``partitions`` made by :py:meth:`_get_user_partition`
+        and placed in shared memory. The partitions are processed separately, so the events created
+        in them may get the same ``event_id``. They get new identifiers from the lineage of this ``eventstream``.
+        The partitions don't have the soft-deleted events of this ``eventstream``, so they are kept as well.
+        """
+        lineage, next_id = self._event_id_allocator.lineage, self._event_id_allocator.next_id
+        events = self.__events
+        deleted = events[DELETE_COL_NAME].to_numpy(dtype=bool)
+        parts = [events.loc[deleted, [col for col in events.columns if col not in self._get_relation_cols()]]]
+        custom_cols = self.schema.custom_cols
+        for partition in partitions:
+            eventstream = Eventstream._attach_shared_memory(partition)
+            events = eventstream.__events
+            event_ids = events[self.schema.event_id].to_numpy()
+            is_created = ((event_ids >> LINEAGE_ID_BITS) == lineage) & (event_ids >= next_id)
+            if is_created.any():
+                event_ids = event_ids.copy()
+                event_ids[is_created] = self._event_id_allocator.allocate(int(is_created.sum()))
+                events[self.schema.event_id] = event_ids
+            custom_cols = eventstream.schema.custom_cols
+            parts.append(events)
+
+        run_sizes = [len(part) for part in parts]
+        events = self.__concat_events(parts)
+        del parts
+        # each partition is sorted, so the partitions are merged instead of sorting all the events again
+        if (sort_keys := self.__get_sort_keys(events)) is not None:
+            events = events.take(self.__merge_sorted_runs(*sort_keys, run_sizes=run_sizes))
+        self.__events = events
+        self.schema.custom_cols = custom_cols.copy()
+        self.relations = []
+        self.index_events()
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "to_shared_memory"},
+        scope="eventstream",
+        allowed_params=["path"],
+    )
+    def to_shared_memory(self, path: Optional[str] = None) -> SharedFrame:
+        """
+        Place ``eventstream`` in shared memory, so the other processes can attach to it
+        with :py:meth:`from_shared_memory` without copying the events.
+
+        The events are written to a memory-mapped file. Encoded columns are stored as integer codes,
+        timestamps as ``int64`` values and soft-deleted events as a boolean mask,
+        so the attached ``eventstream`` reads them as read-only views of the file.
+        The other columns, e.g. string raw columns, are copied while attaching.
+        Relation columns and the related eventstreams are not placed.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the file. If ``None`` - a new file is created in ``/dev/shm`` if it is available,
+            and in the temporary directory otherwise.
+
+        Returns
+        -------
+        SharedFrame
+            A handle of the placed events. It is cheap to pickle, so it can be sent to the worker processes.
+            Call ``unlink()`` or use it as a context manager to release the memory.
+        """
+        relation_cols = self._get_relation_cols()
+        columns = [col for col in self.__events.columns if col not in relation_cols]
+        events = self.__project_events(self.__events, columns, copy=False)
+        metadata = {
+            "schema": asdict(self.schema),
+            # the raw data appended with extend is prepared with the original raw_data_schema
+            "raw_data_schema": asdict(cast(RawDataSchema, self.__raw_data_schema)),
+            "index_order": self.index_order,
+            "encode_cols": self.encode_cols,
+            "raw_cols": self.raw_cols,
+            "event_id_allocator": self._event_id_allocator.__getstate__(),
+        }
+        return SharedFrame.from_dataframe(events, path=path, metadata=metadata)
+
+    @classmethod
+    def from_shared_memory(cls, shared: SharedFrame) -> Eventstream:
+        """
+        Attach to ``eventstream`` placed in shared memory with :py:meth:`to_shared_memory`.
+
+        Parameters
+        ----------
+        shared : SharedFrame
+            A handle returned by :py:meth:`to_shared_memory`.
+
+        Returns
+        -------
+        Eventstream
+            The events are read-only views of the shared memory, so attaching takes milliseconds.
+            Data processors and tools create their results as usual.
+            The events get new ``event_id`` values, so they are not mixed up with the events of this process.
+        """
+        eventstream = cls._attach_shared_memory(shared)
+        eventstream.__restore_event_ids(shared.metadata["event_id_allocator"])
+        return eventstream
+
+    @classmethod
+    def _attach_shared_memory(cls, shared: SharedFrame) -> Eventstream:
+        """
+        Attach to ``eventstream`` placed in shared memory keeping its ``event_id`` lineage,
+        e.g. to exchange the user partitions of the same ``eventstream`` with the worker processes.
+        """
+        metadata = shared.metadata
+        schema = EventstreamSchema(**metadata["schema"])
+        events = shared.to_dataframe()
+        eventstream = cls(
+            raw_data=events.iloc[:0],
+            raw_data_schema=RawDataSchema(**metadata["raw_data_schema"]),
+            schema=schema,
+            prepare=False,
+            index_order=metadata["index_order"],
+            encode_cols=metadata["encode_cols"],
+            raw_cols=metadata["raw_cols"],
+        )
+        # the events have been cleaned up and indexed before they were placed, so they are not scanned again
+        eventstream.__events = events
+        eventstream.__reset_caches()
+        eventstream._event_id_allocator = EventIdAllocator.restore(**metadata["event_id_allocator"])
+        return eventstream
+
+    def __restore_event_ids(self, allocator_state: dict[str, int]) -> None:
+        # the saved lineage may be used by another eventstream of this process, so the events take a new one
+        lineage, next_id = allocator_state["lineage"], allocator_state["next_id"]
+        self.__move_event_ids(lineage, next_id - (lineage << LINEAGE_ID_BITS), EventIdAllocator())
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "to_mmap"},
+        scope="eventstream",
+        allowed_params=[],
+    )
+    def to_mmap(self, path: str) -> None:
+        """
+        Save ``eventstream`` to a file that can be opened with :py:meth:`open_mmap`.
+
+        The file has the same layout as the one written by :py:meth:`to_shared_memory`.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+
+        Returns
+        -------
+        None
+        """
+        self.to_shared_memory(path=path)
+
+    @classmethod
+    def open_mmap(cls, path: str) -> Eventstream:
+        """
+        Open ``eventstream`` saved with :py:meth:`to_mmap` without reading the file to memory.
+
+        Encoded columns, timestamps and numeric columns are read-only views of the memory-mapped file.
+        If several processes open the same file, e.g. several notebook kernels on one server,
+        they share the same pages of the OS page cache instead of keeping their own copies.
+        The other columns, e.g. string raw columns, are still copied to each process,
+        so the ``eventstream`` can be saved with ``raw_cols="none"`` to avoid it.
+
+        Tools (``step_matrix``, ``funnel``, ``cohorts``, ``describe``, ``transition_graph``, etc.)
+        and data processors work with the opened ``eventstream`` as usual. The results of the data processors
+        are kept in memory.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+
+        Returns
+        -------
+        Eventstream
+            The events get new ``event_id`` values as in :py:meth:`from_shared_memory`.
+        """
+        return cls.from_shared_memory(SharedFrame.open(path))
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "to_parquet"},
+        scope="eventstream",
+        allowed_params=[],
+    )
+    def to_parquet(self, path: str) -> None:
+        """
+        Save ``eventstream`` to a parquet file.
+
+        Schema, custom, raw and relation columns, soft-deleted events and ``event_index``
+        are saved, so :py:meth:`read_parquet` restores the ``eventstream`` without preparing
+        and sorting the events again. Encoded columns are saved as dictionary-encoded parquet columns.
+        Raw columns with values of mixed types are saved as strings.
+        The related eventstreams themselves are not saved.
+
+        Parameters
+        ----------
+        path : str
+            Path to the parquet file.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        ``pyarrow`` package is required.
+        """
+        pa, pq = _import_pyarrow()
+        events = self.to_dataframe(raw_cols=True, show_deleted=True, decode=False)
+        for col in self._get_raw_cols():
+            if events[col].dtype == object and pd.api.types.infer_dtype(events[col], skipna=True).startswith("mixed"):
+                # raw values of the derived events may have another type, parquet column needs a single one
+                events[col] = events[col].where(events[col].isna(), events[col].astype(str))
+        table = pa.Table.from_pandas(events, preserve_index=False)
+        metadata = {
+            "schema": asdict(self.schema),
+            "index_order": self.index_order,
+            "encode_cols": self.encode_cols,
+            "raw_cols": self.raw_cols,
+            "event_id_allocator": self._event_id_allocator.__getstate__(),
+        }
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), PARQUET_METADATA_KEY: json.dumps(metadata)}
+        )
+        pq.write_table(table, path)
+
+    @classmethod
+    def read_parquet(
+        cls,
+        path: str | List[str],
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Any]] = None,
+        relations: Optional[List[Relation]] = None,
+    ) -> Eventstream:
+        """
+        Load ``eventstream`` saved with :py:meth:`to_parquet`.
+
+        Parameters
+        ----------
+        path : str or list of str
+            Path to the parquet file. A list of files saved from the eventstreams with the same schema
+            and disjoint events, e.g. the partitions of :py:class:`.PartitionedEventstream`,
+            is loaded as a single ``eventstream``.
+        columns : list of str, optional
+            Custom and raw columns to load. The schema columns are always loaded.
+            If ``None`` - all the saved columns are loaded.
+        filters : list, optional
+            Row filters pushed down to the parquet reader, e.g.
+            ``[("timestamp", ">=", pd.Timestamp("2023-01-01")), ("user_id", "in", users)]``.
+            See :pyarrow_read_table:`pyarrow documentation<>` for the filters syntax.
+        relations : list, optional
+            Related eventstreams for the saved relation columns in the same order.
+            If ``None`` - the relation columns are loaded without the related eventstreams.
+
+        Returns
+        -------
+        Eventstream
+            The events get new ``event_id`` values keeping their order, so they are not mixed up
+            with the events of the eventstreams created in this session. The files saved from different
+            eventstreams get disjoint ranges of the values.
+
+        Raises
+        ------
+        ValueError
+            If a file doesn't contain an eventstream, or the files have different schemas
+            apart from custom columns, ``index_order``, ``encode_cols`` or ``raw_cols``.
+
+        Notes
+        -----
+        ``pyarrow`` package is required.
+        """
+        pa, pq = _import_pyarrow()
+        paths = [path] if isinstance(path, str) else path
+        file_names: List[str] = []
+        files_names = []
+        files_metadata = []
+        for file_path in paths:
+            file_schema = pq.read_schema(file_path)
+            file_metadata = file_schema.metadata or {}
+            if PARQUET_METADATA_KEY not in file_metadata:
+                raise ValueError(f"invalid parquet file. {file_path} does not contain an eventstream!")
+            files_metadata.append(json.loads(file_metadata[PARQUET_METADATA_KEY]))
+            files_names.append(file_schema.names)
+            file_names += [col for col in file_schema.names if col not in file_names]
+
+        metadata = files_metadata[0]
+        schema = EventstreamSchema(**metadata["schema"])
+        for file_path, file_metadata in zip(paths[1:], files_metadata[1:]):
+            cls.__validate_parquet_metadata(metadata, file_metadata, file_path)
+            file_custom_cols = file_metadata["schema"]["custom_cols"]
+            schema.custom_cols += [col for col in file_custom_cols if col not in schema.custom_cols]
+
+        relation_cols = [col for col in file_names if col.startswith("ref_")]
+        if relations is not None and len(relations) != len(relation_cols):
+            raise ValueError(f"{len(relation_cols)} relations are expected, got {len(relations)}")
+
+        if columns is not None:
+            if missing_cols := [col for col in columns if col not in file_names]:
+                raise ValueError(f"invalid columns. Columns {missing_cols} do not exist!")
+            schema.custom_cols = [col for col in schema.custom_cols if col in columns]
+            required_cols = schema.get_cols() + relation_cols + [DELETE_COL_NAME]
+            columns = required_cols + [col for col in columns if col not in required_cols]
+
+        tables = []
+        for file_path, names in zip(paths, files_names):
+            # the columns missing in some of the files are filled with nulls while concatenating
+            file_columns = columns if columns is None else [col for col in columns if col in names]
+            tables.append(pq.read_table(file_path, columns=file_columns, filters=filters))
+        files_rows = [table.num_rows for table in tables]
+        if len(tables) == 1:
+            table = tables[0]
+        elif int(pa.__version__.split(".")[0]) >= 14:
+            table = pa.concat_tables(tables, promote_options="default")
+        else:
+            table = pa.concat_tables(tables, promote=True)
+        events = table.to_pandas()
+        del tables, table
+
+        # the saved lineages may be used by other eventstreams of this process, so the events take a new one
+        allocator = EventIdAllocator()
+        shifts = cls.__get_event_id_shifts(
+            [file_metadata["event_id_allocator"] for file_metadata in files_metadata], allocator
+        )
+        events[schema.event_id] = events[schema.event_id].to_numpy() + np.repeat(shifts, files_rows)
+        eventstream = cls(
+            raw_data=events,
+            raw_data_schema=schema.to_raw_data_schema(),
+            schema=schema,
+            prepare=False,
+            index_order=metadata["index_order"],
+            relations=relations,
+            encode_cols=metadata["encode_cols"],
+            raw_cols=metadata["raw_cols"],
+        )
+        eventstream._event_id_allocator = allocator
+        return eventstream
+
+    @staticmethod
+    def __validate_parquet_metadata(metadata: dict[str, Any], file_metadata: dict[str, Any], file_path: str) -> None:
+        for key in ["index_order", "encode_cols", "raw_cols"]:
+            if file_metadata[key] != metadata[key]:
+                raise ValueError(f"invalid parquet files. {file_path} has another {key}!")
+        # the files may have different custom columns, e.g. a partition without sessions
+        saved_schema: dict[str, Any] = {**file_metadata["schema"], "custom_cols": []}
+        if saved_schema != {**metadata["schema"], "custom_cols": []}:
+            raise ValueError(f"invalid parquet files. {file_path} has another schema!")
+
+    @staticmethod
+    def __get_event_id_shifts(allocator_states: List[dict[str, int]], allocator: EventIdAllocator) -> List[int]:
+        """
+        Return the shifts moving ``event_id`` of each file to the lineage of ``allocator``.
+        The files saved from the same lineage, e.g. the partitions of an eventstream, keep the offsets
+        of their identifiers. The other lineages get the following offsets, so the events created
+        in different lineages never get the same identifiers.
+        """
+        next_offsets: dict[int, int] = {}
+        for state in allocator_states:
+            lineage = state["lineage"]
+            next_offsets[lineage] = max(next_offsets.get(lineage, 0), state["next_id"] - (lineage << LINEAGE_ID_BITS))
+
+        bases: dict[int, int] = {}
+        for lineage, next_offset in next_offsets.items():
+            bases[lineage] = allocator.next_offset
+            allocator.advance(allocator.next_offset + next_offset)
+
+        return [
+            ((allocator.lineage - state["lineage"]) << LINEAGE_ID_BITS) + bases[state["lineage"]]
+            for state in allocator_states
+        ]
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str,
+        raw_data_schema: RawDataSchema
+        | RawDataSchemaType
+        | dict[str, str | list[RawDataCustomColSchema]]
+        | None = None,
+        schema: EventstreamSchema | None = None,
+        chunksize: int = CSV_CHUNKSIZE,
+        dtype: Optional[dict[str, Any]] = None,
+        index_order: Optional[IndexOrder] = None,
+        encode_cols: bool = True,
+        raw_cols: Optional[RawColsPolicy] = None,
+        user_sample_share: Optional[float] = None,
+        user_sample_seed: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Eventstream:
+        """
+        Create ``eventstream`` from a csv file reading it chunk by chunk.
+
+        Each chunk is prepared, encoded and sorted as soon as it is read, and the sorted chunks
+        are merged at the end. So only one raw chunk is kept in memory at a time.
+        If ``raw_cols`` doesn't keep all the columns, the other columns are not parsed at all.
+
+        Parameters
+        ----------
+        path : str
+            Path to the csv file.
+        raw_data_schema : RawDataSchema, optional
+            See :py:class:`.Eventstream`.
+        schema : EventstreamSchema, optional
+            See :py:class:`.Eventstream`.
+        chunksize : int, default 1000000
+            Number of rows in a chunk.
+        dtype : dict, optional
+            Types of the csv columns. See :pandas_read_csv:`pandas documentation<>`.
+        index_order : list of str, optional
+            See :py:class:`.Eventstream`.
+        encode_cols : bool, default True
+            See :py:class:`.Eventstream`.
+        raw_cols : {"all", "reference", "none"} or list of str, optional
+            See :py:class:`.Eventstream`.
+        user_sample_share : float, optional
+            Share of users whose trajectories are kept. Each chunk is sampled as soon as it is read,
+            and a user is kept if the hash of its ``user_id`` falls into the first ``user_sample_share``
+            of the hash range. So the same users are chosen in any file and with any ``chunksize``,
+            while the share of the chosen users is approximate.
+        user_sample_seed : int, optional
+            A seed value that is used as a key of the ``user_id`` hash.
+        **kwargs
+            Other ``pd.read_csv`` parameters.
+
+        Returns
+        -------
+        Eventstream
+        """
+        if isinstance(raw_data_schema, dict):
+            raw_data_schema = RawDataSchema(**raw_data_schema)  # type: ignore
+        usecols = cls.__get_csv_usecols(raw_data_schema=raw_data_schema, raw_cols=raw_cols)
+        if user_sample_share is not None:
+            validate_user_sample_share(user_sample_share)
+            user_col = raw_data_schema.user_id if raw_data_schema is not None else RawDataSchema.user_id
+
+        with pd.read_csv(path, chunksize=chunksize, dtype=dtype, usecols=usecols, **kwargs) as reader:
+            chunks: Iterator[pd.DataFrame] = iter(reader)
+            if user_sample_share is not None:
+                chunks = (
+                    chunk.loc[get_user_sample_mask(chunk[user_col], user_sample_share, user_sample_seed)]
+                    for chunk in chunks
+                )
+            first_chunk = next(chunks, None)
+            if first_chunk is None:
+                first_chunk = pd.read_csv(path, nrows=0, dtype=dtype, usecols=usecols, **kwargs)
+            eventstream = cls(
+                raw_data=first_chunk,
+                raw_data_schema=raw_data_schema,
+                schema=schema,
+                index_order=index_order,
+                encode_cols=encode_cols,
+                raw_cols=raw_cols,
+            )
+            del first_chunk
+            eventstream.__append_raw_chunks(chunks)
+        return eventstream
+
+    @staticmethod
+    def __get_csv_usecols(
+        raw_data_schema: Optional[RawDataSchemaType], raw_cols: Optional[RawColsPolicy]
+    ) -> Optional[Callable[[str], bool]]:
+        if raw_cols is None or raw_cols in ("all", "reference"):
+            return None
+        if raw_data_schema is None:
+            # event_type column is used by default if it exists
+            raw_data_schema = RawDataSchema(event_type="event_type")
+
+        used_cols = {raw_data_schema.event_name, raw_data_schema.event_timestamp, raw_data_schema.user_id}
+        used_cols.update(custom_col["raw_data_col"] for custom_col in raw_data_schema.custom_cols)
+        if raw_data_schema.event_type is not None:
+            used_cols.add(raw_data_schema.event_type)
+        if raw_cols != "none":
+            used_cols.update(raw_cols)
+        return lambda col: col in used_cols
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "extend"},
+        scope="eventstream",
+        allowed_params=[],
+    )
+    def extend(self, raw_data: pd.DataFrame | pd.Series[Any]) -> None:
+        """
+        Add the events of ``raw_data`` to ``eventstream``.
+
+        ``raw_data`` is prepared with the same ``raw_data_schema`` as the data the ``eventstream`` has been
+        created from, and the new events get new ``event_id``. The new events are sorted and merged into
+        the already sorted events in linear time, so it's much faster than creating a new ``eventstream``
+        or calling :py:meth:`append_eventstream`. If all the new events are later than the existing ones,
+        e.g. the next day of events is added, the existing events keep their ``event_index``.
+
+        Parameters
+        ----------
+        raw_data : pd.DataFrame or pd.Series
+            New raw clickstream data with the same columns as the data the ``eventstream`` has been created from.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the kept raw columns of ``raw_data`` differ from the raw columns of ``eventstream``.
+        """
+        self.__append_raw_chunks([raw_data])
+
+    def __append_raw_chunks(self, chunks: Iterable[pd.DataFrame]) -> None:
+        parts = [self.__events]
+        expected_cols = set(self.__events.columns) - {self.schema.event_index}
+        for chunk in chunks:
+            events = self.__prepare_events(chunk)
+            if mismatched_cols := expected_cols.symmetric_difference(events.columns):
+                raise ValueError(f"invalid raw data. Columns {sorted(mismatched_cols)} don't match the eventstream!")
+            events = self.__required_cleanup(events=events)
+            events = self.__encode_events(events=events)
+            if (sort_keys := self.__get_sort_keys(events)) is not None:
+                events = events.take(self.__get_sorted_positions(*sort_keys))
+            parts.append(events)
+        if len(parts) == 1:
+            return
+
+        run_sizes = [len(part) for part in parts]
+        events = self.__concat_events(parts)
+        del parts
+        # the sorted chunks are merged, so index_events only has to check the order
+        if (sort_keys := self.__get_sort_keys(events)) is not None:
+            events = events.take(self.__merge_sorted_runs(*sort_keys, run_sizes=run_sizes))
+        self.__events = events
+        self.index_events()
+
+    def __get_sort_keys(self, events: pd.DataFrame | pd.Series[Any]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        timestamps = events[self.schema.event_timestamp]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            return None
+        return timestamps.values.view("int64"), self.__get_event_priorities(events[self.schema.event_type])
+
+    @classmethod
+    def memory_report(cls) -> pd.DataFrame:
+        """
+        Show memory used by all the live ``eventstreams``.
+
+        Returns
+        -------
+        pd.DataFrame
+            A dataframe with a row for each live ``eventstream`` and the following columns:
+
+            - ``eventstream`` - id of the eventstream object.
+            - ``events`` - number of stored events including the soft-deleted ones.
+            - ``deleted_events`` - number of the soft-deleted events.
+            - ``bytes`` - memory kept reachable by the eventstream.
+            - ``related_eventstreams`` - number of live related eventstreams.
+            - ``related_bytes`` - memory of the live related eventstreams. Since only weak references
+              to them are kept, it is released as soon as nothing else uses them.
+        """
+        report = []
+        for eventstream in list(cls._instances):
+            related = eventstream.__get_related_eventstreams(eventstream.relations)
+            report.append(
+                {
+                    "eventstream": hex(id(eventstream)),
+                    "events": len(eventstream.__events),
+                    "deleted_events": int(eventstream.__events[DELETE_COL_NAME].to_numpy(dtype=bool).sum()),
+                    "bytes": eventstream._get_memory_usage(),
+                    "related_eventstreams": len(related),
+                    "related_bytes": sum(related_eventstream._get_memory_usage() for related_eventstream in related),
+                }
+            )
+        columns = ["eventstream", "events", "deleted_events", "bytes", "related_eventstreams", "related_bytes"]
+        return pd.DataFrame(report, columns=columns)
+
+    def _get_memory_usage(self) -> int:
+        return int(self.__events.memory_usage(index=True, deep=True).sum())
+
+    def _get_events_count(self) -> int:
+        return len(self.__get_not_deleted_events())
+
+    def _get_deleted_share(self) -> float:
+        if len(self.__events) == 0:
+            return 0.0
+        return float(self.__events[DELETE_COL_NAME].to_numpy(dtype=bool).mean())
+
+    def _get_relation_depth(self) -> int:
+        depth = 0
+        visited: set[int] = set()
+        related = self.__get_related_eventstreams(self.relations)
+        while related := [eventstream for eventstream in related if id(eventstream) not in visited]:
+            depth += 1
+            visited.update(id(eventstream) for eventstream in related)
+            related = self.__get_related_eventstreams(
+                [relation for eventstream in related for relation in eventstream.relations]
+            )
+        return depth
+
+    def _get_content_hash(self) -> str:
+        """
+        Return a hash of the events that is the same in any session for the same data.
+        ``event_id`` values are hashed as offsets in the block of the lineage, relation columns are skipped.
+        """
+        digest = hashlib.sha256(json.dumps([asdict(self.schema), self.index_order, self.raw_cols]).encode())
+        relation_cols = self._get_relation_cols()
+        for col in self.__events.columns:
+            if col in relation_cols:
+                continue
+            values = self.__events[col]
+            if col == self.schema.event_id:
+                values = values - (self._event_id_allocator.lineage << LINEAGE_ID_BITS)
+            digest.update(str(col).encode())
+            digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _rebase_event_ids(self, eventstream: EventstreamType) -> None:
+        """
+        Move the events to the lineage of ``eventstream`` keeping the offsets of their ``event_id`` in the lineage,
+        e.g. to reuse an eventstream saved in another session. The events of the source eventstreams get the same
+        offsets in both sessions, so they get the same identifiers as the events of ``eventstream``.
+        """
+        allocator = self._event_id_allocator
+        self.__move_event_ids(allocator.lineage, allocator.next_offset, eventstream._event_id_allocator)
+
+    def __move_event_ids(self, lineage: int, next_offset: int, allocator: EventIdAllocator) -> None:
+        """
+        Move the events from ``lineage`` to the lineage of ``allocator`` keeping the offsets of their ``event_id``.
+        """
+        shift = (allocator.lineage - lineage) << LINEAGE_ID_BITS
+        self.__events[self.schema.event_id] = self.__events[self.schema.event_id].to_numpy() + shift
+        allocator.advance(next_offset)
+        self._event_id_allocator = allocator
+        self.__reset_caches()
+
+    def __reset_caches(self) -> None:
+        """
+        Drop the values computed from the events and bump ``_version`` so the results of the preprocessing graph
+        computed from the previous events are not reused.
+        """
+        self.__not_deleted_events = None
+        self.__user_layout = None
+        self._version += 1
+
+    @staticmethod
+    def __get_related_eventstreams(relations: List[Relation]) -> List[EventstreamType]:
+        related = [_get_related_eventstream(relation) for relation in relations]
+        return [eventstream for eventstream in related if eventstream is not None]
 
     def _soft_delete(self, events: pd.DataFrame) -> None:
         """
         Delete events either by event_id or by the last relation.
         """
-        deleted_events = events.copy()
-        deleted_events[DELETE_COL_NAME] = True
-        merged = pd.merge(
-            left=self.__events,
-            right=deleted_events,
-            left_on=self.schema.event_id,
-            right_on=self.schema.event_id,
-            indicator=True,
-            how="left",
-        )
+        event_ids = events[self.schema.event_id].to_numpy()
+        deleted = self.__get_events_mask(events=events)
+
         if relation_cols := self._get_relation_cols():
             last_relation_col = relation_cols[-1]
-            self.__events[DELETE_COL_NAME] = self.__events[DELETE_COL_NAME] | merged[f"{DELETE_COL_NAME}_y"] == True
-            merged = pd.merge(
-                left=self.__events,
-                right=deleted_events,
-                left_on=last_relation_col,
-                right_on=self.schema.event_id,
-                indicator=True,
-                how="left",
-            )
-
-        self.__events[DELETE_COL_NAME] = self.__events[DELETE_COL_NAME] | merged[f"{DELETE_COL_NAME}_y"] == True
+            deleted |= self.__events[last_relation_col].isin(event_ids).to_numpy(dtype=bool, na_value=False)
+
+        self.__events[DELETE_COL_NAME] = self.__events[DELETE_COL_NAME].to_numpy(dtype=bool) | deleted
+        self.__reset_caches()
+
+    def __get_events_mask(self, events: pd.DataFrame) -> np.ndarray:
+        event_ids = events[self.schema.event_id].to_numpy()
+        all_event_ids = self.__events[self.schema.event_id].to_numpy()
+        mask = np.zeros(len(all_event_ids), dtype=bool)
+
+        # events taken from this eventstream are addressed by their event_index positions
+        if self.schema.event_index in events.columns:
+            positions = events[self.schema.event_index].to_numpy()
+            if (
+                pd.api.types.is_integer_dtype(positions)
+                and ((positions >= 0) & (positions < len(all_event_ids))).all()
+                and np.array_equal(all_event_ids[positions], event_ids)
+            ):
+                mask[positions] = True
+                return mask
+
+        return np.isin(all_event_ids, event_ids)
+
+    def _get_user_layout(self) -> UserLayout:
+        """
+        Return the user-major layout of the not deleted events, aligned with ``to_dataframe()`` rows.
+        It is built on the first call and is kept until the events are changed.
+        """
+        if self.__user_layout is None:
+            self.__user_layout = UserLayout(self.__get_not_deleted_events()[self.schema.user_id])
+        return self.__user_layout
 
     def __get_not_deleted_events(self) -> pd.DataFrame | pd.Series[Any]:
-        events = self.__events
-        return events[events[DELETE_COL_NAME] == False]
+        if self.__not_deleted_events is None:
+            events = self.__events
+            deleted = events[DELETE_COL_NAME].to_numpy(dtype=bool)
+            self.__not_deleted_events = events[~deleted] if deleted.any() else events
+        return self.__not_deleted_events
 
     def __required_cleanup(self, events: pd.DataFrame | pd.Series[Any]) -> pd.DataFrame | pd.Series[Any]:
         income_size = len(events)
-        events.dropna(  # type: ignore
-            subset=[self.schema.event_name, self.schema.event_timestamp, self.schema.user_id], inplace=True
-        )
+        required_cols = [self.schema.event_name, self.schema.event_timestamp, self.schema.user_id]
+        # dropna copies all the columns even if nothing is dropped
+        if any(events[col].isna().any() for col in required_cols):
+            events.dropna(subset=required_cols, inplace=True)  # type: ignore
         size_after_cleanup = len(events)
         if (removed_rows := income_size - size_after_cleanup) > 0:
             warnings.warn(
@@ -566,23 +1572,55 @@ class Eventstream(
             )
         return events
 
+    def __encode_events(self, events: pd.DataFrame | pd.Series[Any]) -> pd.DataFrame | pd.Series[Any]:
+        for col in self._get_encoded_cols():
+            if col in events.columns and not isinstance(events[col].dtype, pd.CategoricalDtype):
+                events[col] = events[col].astype("category")
+        return events
+
+    def __concat_events(self, parts: list[pd.DataFrame]) -> pd.DataFrame:
+        # align vocabularies of the encoded columns, so they remain encoded after concatenation
+        for col in self._get_encoded_cols():
+            dtypes = [part[col].dtype for part in parts if col in part]
+            if len(dtypes) < 2 or not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+                continue
+            categories = dtypes[0].categories
+            for dtype in dtypes[1:]:
+                categories = categories.union(dtype.categories)
+            for part in parts:
+                if col in part:
+                    part[col] = part[col].cat.set_categories(categories)
+
+        with warnings.catch_warnings():
+            # disable warning for pydantic schema Callable type
+            warnings.simplefilter(action="ignore", category=FutureWarning)
+            return pd.concat(parts, ignore_index=True)
+
+    @staticmethod
+    def __project_events(events: pd.DataFrame | pd.Series[Any], columns: List[str], copy: bool) -> pd.DataFrame:
+        if missing_cols := [col for col in columns if col not in events.columns]:
+            raise ValueError(f"invalid columns. Columns {missing_cols} do not exist!")
+        if not columns:
+            return pd.DataFrame(index=events.index)
+        # concatenating the column series without copying keeps them unconsolidated views of the store
+        return pd.concat([events[col] for col in columns], axis=1, copy=copy)
+
+    def __decode_events(self, events: pd.DataFrame) -> pd.DataFrame:
+        for col in self._get_encoded_cols():
+            if col in events.columns and isinstance(events[col].dtype, pd.CategoricalDtype):
+                events[col] = np.asarray(events[col])
+        return events
+
     def __prepare_events(self, raw_data: pd.DataFrame | pd.Series[Any]) -> pd.DataFrame | pd.Series[Any]:
-        events = raw_data.copy()
-        # add "raw_" prefix for raw cols
-        events.rename(lambda col: f"raw_{col}", axis="columns", inplace=True)
+        events = self.__get_raw_cols_from_raw_data(raw_data)
 
         events[DELETE_COL_NAME] = False
-        events[self.schema.event_id] = [uuid.uuid4() for x in range(len(events))]
+        events[self.schema.event_id] = self._event_id_allocator.allocate(len(events))
         events[self.schema.event_name] = self.__get_col_from_raw_data(
             raw_data=raw_data,
             colname=self.__raw_data_schema.event_name,
         )
-        events[self.schema.event_timestamp] = pd.to_datetime(
-            self.__get_col_from_raw_data(
-                raw_data=raw_data,
-                colname=self.__raw_data_schema.event_timestamp,
-            ),
-        )
+        events[self.schema.event_timestamp] = self.__get_timestamps(raw_data=raw_data)
         events[self.schema.user_id] = self.__get_col_from_raw_data(
             raw_data=raw_data,
             colname=self.__raw_data_schema.user_id,
@@ -617,10 +1655,73 @@ class Eventstream(
             rel_col_name = f"ref_{i}"
             relation = self.relations[i]
             col = raw_data[relation["raw_col"]] if relation["raw_col"] is not None else np.nan
-            events[rel_col_name] = col
+            events[rel_col_name] = to_relation_col(col)
 
         return events
 
+    def __get_timestamps(self, raw_data: pd.DataFrame | pd.Series[Any]) -> pd.Series:
+        raw_data_schema = self.__raw_data_schema
+        timestamps = self.__get_col_from_raw_data(raw_data=raw_data, colname=raw_data_schema.event_timestamp)
+        timestamp_format = raw_data_schema.timestamp_format
+        timestamp_unit = raw_data_schema.timestamp_unit
+        timestamp_tz = raw_data_schema.timestamp_tz
+
+        if pd.api.types.is_datetime64_dtype(timestamps):
+            # already parsed, e.g. the data of a parent eventstream
+            return timestamps
+
+        is_inferred = (
+            timestamp_format is None
+            and timestamp_unit is None
+            and (pd.api.types.is_object_dtype(timestamps) or pd.api.types.is_string_dtype(timestamps))
+        )
+        if is_inferred and len(timestamps) > TIMESTAMP_INFERENCE_WARNING_ROWS:  # type: ignore
+            warnings.warn(
+                "Timestamp format is inferred for each of %s rows. "
+                "Set timestamp_format in raw_data_schema to parse the timestamps faster" % len(timestamps)  # type: ignore
+            )
+
+        timestamps = pd.to_datetime(
+            timestamps,
+            format=timestamp_format,
+            unit=timestamp_unit,
+            utc=raw_data_schema.timestamp_utc,
+        )
+        if timestamp_tz is not None and isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+            timestamps = timestamps.dt.tz_convert(timestamp_tz).dt.tz_localize(None)
+        return timestamps
+
+    def __get_raw_cols_from_raw_data(self, raw_data: pd.DataFrame | pd.Series[Any]) -> pd.DataFrame:
+        if self.raw_cols == "none":
+            # raw data is only referenced to take the schema columns from it
+            return pd.DataFrame(index=raw_data.index)
+        if self.raw_cols == "all":
+            events = raw_data.copy()
+        elif self.raw_cols == "reference":
+            # a shallow copy gets its own columns, but its values are the ones of raw_data
+            events = raw_data.copy(deep=False)
+        else:
+            for colname in self.raw_cols:
+                self.__get_col_from_raw_data(raw_data=raw_data, colname=colname)
+            events = raw_data[list(self.raw_cols)].copy()
+        # add "raw_" prefix for raw cols
+        events.rename(lambda col: f"{RAW_COL_PREFIX}{col}", axis="columns", inplace=True)
+        return events
+
+    def __get_raw_cols_policy(self) -> RawColsPolicy:
+        for eventstream in self.__get_related_eventstreams(self.relations):
+            if getattr(eventstream, "raw_cols", "all") == "none":
+                return "none"
+        return "all"
+
+    def __get_event_id_allocator(self) -> EventIdAllocator:
+        # derived eventstreams allocate ids from the lineage of their parent
+        for eventstream in self.__get_related_eventstreams(self.relations):
+            allocator = getattr(eventstream, "_event_id_allocator", None)
+            if allocator is not None:
+                return allocator
+        return EventIdAllocator()
+
     def __get_col_from_raw_data(
         self, raw_data: pd.DataFrame | pd.Series[Any], colname: str, create: bool = False
     ) -> pd.Series | float:
@@ -637,6 +1738,18 @@ class Eventstream(
             return self.index_order.index(event_type)
         return len(self.index_order)
 
+    def __get_event_priorities(self, event_types: pd.Series) -> np.ndarray:
+        if isinstance(event_types.dtype, pd.CategoricalDtype):
+            codes, categories = event_types.cat.codes.values, event_types.cat.categories
+        else:
+            codes, categories = pd.factorize(event_types)
+        # the last item of the lookup table is used for missing event types (code -1)
+        lookup = np.array(
+            [self.__get_event_priority(event_type) for event_type in categories] + [self.__get_event_priority(None)],
+            dtype=np.int64,
+        )
+        return lookup[codes]
+
     def __sample_user_paths(
         self,
         raw_data: pd.DataFrame | pd.Series[Any],
@@ -649,19 +1762,16 @@ class Eventstream(
         if user_sample_size < 0:
             raise ValueError("User sample size/share cannot be negative!")
         if type(user_sample_size) is float:
-            if user_sample_size > 1:
-                raise ValueError("User sample share cannot exceed 1!")
+            validate_user_sample_share(user_sample_size)
         user_col_name = raw_data_schema.user_id
-        unique_users = raw_data[user_col_name].unique()
+        user_ids = raw_data[user_col_name]
         if type(user_sample_size) is int:
             sample_size = user_sample_size
         elif type(user_sample_size) is float:
-            sample_size = int(user_sample_size * len(unique_users))
+            sample_size = int(user_sample_size * user_ids.nunique())
         else:
             return raw_data
-        if user_sample_seed is not None:
-            np.random.seed(user_sample_seed)
-        sample_users = np.random.choice(unique_users, sample_size, replace=False)
+        sample_users = get_user_sample(user_ids, sample_size, user_sample_seed)
         raw_data_sampled = raw_data.loc[raw_data[user_col_name].isin(sample_users), :]  # type: ignore
         return raw_data_sampled
 
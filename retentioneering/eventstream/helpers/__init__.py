@@ -9,5 +9,6 @@ from .label_cropped_paths_helper import LabelCroppedPathsHelperMixin
 from .label_lost_users_helper import LabelLostUsersHelperMixin
 from .label_new_users_helper import LabelNewUsersHelperMixin
 from .rename_helper import RenameHelperMixin
+from .sample_users_helper import SampleUsersHelperMixin
 from .split_sessions_helper import SplitSessionsHelperMixin
 from .truncate_paths_helper import TruncatePathsHelperMixin
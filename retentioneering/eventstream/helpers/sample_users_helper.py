@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from retentioneering.backend.tracker import track
+
+from ..types import EventstreamType
+
+
+class SampleUsersHelperMixin:
+    @track(  # type: ignore
+        tracking_info={"event_name": "helper"},
+        scope="sample_users",
+        event_value="combine",
+        allowed_params=[
+            "user_sample_share",
+            "user_sample_seed",
+        ],
+    )
+    def sample_users(self, user_sample_share: float, user_sample_seed: int | None = None) -> EventstreamType:
+        """
+        A method of ``Eventstream`` class that keeps the paths of a deterministic sample of users.
+
+        Parameters
+        ----------
+        See parameters description
+            :py:class:`.SampleUsers`
+
+        Returns
+        -------
+        Eventstream
+             Input ``eventstream`` with the paths of the sampled users only.
+
+
+        """
+
+        # avoid circular import
+        from retentioneering.data_processors_lib import SampleUsers, SampleUsersParams
+        from retentioneering.preprocessing_graph import PreprocessingGraph
+        from retentioneering.preprocessing_graph.nodes import EventsNode
+
+        p = PreprocessingGraph(source_stream=self)  # type: ignore
+
+        node = EventsNode(
+            processor=SampleUsers(
+                params=SampleUsersParams(
+                    user_sample_share=user_sample_share, user_sample_seed=user_sample_seed
+                )  # type: ignore
+            )
+        )
+        p.add_node(node=node, parents=[p.root])
+        result = p.combine(node)
+        del p
+        return result
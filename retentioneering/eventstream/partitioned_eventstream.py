@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Collection
+from dataclasses import asdict
+from typing import Any, Iterator, List, Literal, Optional, Sequence, Tuple, cast
+
+import pandas as pd
+
+from retentioneering.backend.tracker import track
+from retentioneering.data_processor import DataProcessor
+from retentioneering.edgelist import Edgelist
+from retentioneering.eventstream.eventstream import CSV_CHUNKSIZE, Eventstream
+from retentioneering.eventstream.schema import EventstreamSchema, RawDataSchema
+from retentioneering.eventstream.types import (
+    IndexOrder,
+    RawColsPolicy,
+    RawDataCustomColSchema,
+    RawDataSchemaType,
+)
+from retentioneering.eventstream.user_sample import get_user_partitions
+from retentioneering.preprocessing_graph import EventsNode, PreprocessingGraph
+from retentioneering.tooling import Funnel, StepMatrix
+from retentioneering.tooling.typing.transition_graph import NormType
+
+DEFAULT_N_PARTITIONS = 16
+PARTITIONS_METADATA_FILE = "partitions.json"
+PARTITION_FILE_TEMPLATE = "partition-{:05d}.parquet"
+SPILL_FILE_TEMPLATE = "partition-{:05d}.spill.csv"
+
+
+class PartitionedEventstream:
+    """
+    Eventstream stored on disk as user-disjoint partitions.
+
+    Users are assigned to the partitions by the hash of ``user_id``, so all the events of a user
+    are kept in the same partition. Each partition is a sorted eventstream saved to a parquet file
+    with :py:meth:`.Eventstream.to_parquet`. Only one partition is loaded to memory at a time:
+    user-local data processors are applied partition by partition, and ``Funnel``, ``StepMatrix``
+    and edgelist values are merged from the partial values of the partitions.
+
+    Parameters
+    ----------
+    path : str
+        Path to a directory created with :py:meth:`from_eventstream`, :py:meth:`from_csv` or :py:meth:`apply`.
+
+    Notes
+    -----
+    ``pyarrow`` package is required.
+    """
+
+    path: str
+    schema: EventstreamSchema
+    n_partitions: int
+    user_sample_seed: Optional[int]
+
+    def __init__(self, path: str) -> None:
+        metadata_path = os.path.join(path, PARTITIONS_METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            raise ValueError(f"invalid path. {path} does not contain a partitioned eventstream!")
+        with open(metadata_path) as metadata_file:
+            metadata = json.load(metadata_file)
+
+        self.path = path
+        self.schema = EventstreamSchema(**metadata["schema"])
+        self.n_partitions = metadata["n_partitions"]
+        self.user_sample_seed = metadata["user_sample_seed"]
+
+    @classmethod
+    @track(  # type: ignore
+        tracking_info={"event_name": "from_eventstream"},
+        scope="partitioned_eventstream",
+        allowed_params=["n_partitions"],
+    )
+    def from_eventstream(
+        cls,
+        eventstream: Eventstream,
+        path: str,
+        n_partitions: int = DEFAULT_N_PARTITIONS,
+        user_sample_seed: Optional[int] = None,
+    ) -> PartitionedEventstream:
+        """
+        Save ``eventstream`` as ``n_partitions`` user-disjoint partitions.
+
+        Parameters
+        ----------
+        eventstream : Eventstream
+            Source eventstream. Its soft-deleted events and relations are not saved.
+        path : str
+            Path to a directory for the partitions. It is created if it doesn't exist.
+        n_partitions : int, default 16
+            Number of partitions.
+        user_sample_seed : int, optional
+            A seed value that is used as a key of the ``user_id`` hash.
+
+        Returns
+        -------
+        PartitionedEventstream
+        """
+        os.makedirs(path, exist_ok=True)
+        for partition, partition_eventstream in enumerate(eventstream._split_by_users(n_partitions, user_sample_seed)):
+            partition_eventstream.to_parquet(cls.__get_partition_path(path, partition))
+        cls.__write_metadata(path, eventstream.schema, n_partitions, user_sample_seed)
+        return cls(path)
+
+    @classmethod
+    @track(  # type: ignore
+        tracking_info={"event_name": "from_csv"},
+        scope="partitioned_eventstream",
+        allowed_params=["n_partitions", "chunksize"],
+    )
+    def from_csv(
+        cls,
+        csv_path: str,
+        path: str,
+        n_partitions: int = DEFAULT_N_PARTITIONS,
+        raw_data_schema: RawDataSchema
+        | RawDataSchemaType
+        | dict[str, str | list[RawDataCustomColSchema]]
+        | None = None,
+        schema: EventstreamSchema | None = None,
+        chunksize: int = CSV_CHUNKSIZE,
+        dtype: Optional[dict[str, Any]] = None,
+        index_order: Optional[IndexOrder] = None,
+        encode_cols: bool = True,
+        raw_cols: Optional[RawColsPolicy] = None,
+        user_sample_seed: Optional[int] = None,
+        **kwargs: Any,
+    ) -> PartitionedEventstream:
+        """
+        Create a partitioned eventstream from a csv file that doesn't fit in memory.
+
+        The csv file is read chunk by chunk, and the rows of each chunk are appended to
+        the temporary csv files of their partitions. Then each partition is loaded with
+        :py:meth:`.Eventstream.from_csv`, saved to parquet and its temporary file is removed.
+        So at most one chunk or one partition is kept in memory at a time.
+
+        Parameters
+        ----------
+        csv_path : str
+            Path to the csv file.
+        path : str
+            Path to a directory for the partitions. It is created if it doesn't exist.
+        n_partitions : int, default 16
+            Number of partitions.
+        raw_data_schema : RawDataSchema, optional
+            See :py:class:`.Eventstream`.
+        schema : EventstreamSchema, optional
+            See :py:class:`.Eventstream`.
+        chunksize : int, default 1000000
+            Number of rows in a chunk.
+        dtype : dict, optional
+            Types of the csv columns. See :pandas_read_csv:`pandas documentation<>`.
+        index_order : list of str, optional
+            See :py:class:`.Eventstream`.
+        encode_cols : bool, default True
+            See :py:class:`.Eventstream`.
+        raw_cols : {"all", "reference", "none"} or list of str, optional
+            See :py:class:`.Eventstream`.
+        user_sample_seed : int, optional
+            A seed value that is used as a key of the ``user_id`` hash.
+        **kwargs
+            Other ``pd.read_csv`` parameters. They are used for the source csv file only.
+
+        Returns
+        -------
+        PartitionedEventstream
+        """
+        if isinstance(raw_data_schema, dict):
+            raw_data_schema = RawDataSchema(**raw_data_schema)  # type: ignore
+        user_col = raw_data_schema.user_id if raw_data_schema is not None else RawDataSchema.user_id
+
+        os.makedirs(path, exist_ok=True)
+        spill_paths = [os.path.join(path, SPILL_FILE_TEMPLATE.format(partition)) for partition in range(n_partitions)]
+        header = pd.read_csv(csv_path, nrows=0, dtype=dtype, **kwargs)
+        for spill_path in spill_paths:
+            header.to_csv(spill_path, index=False)
+
+        with pd.read_csv(csv_path, chunksize=chunksize, dtype=dtype, **kwargs) as reader:
+            for chunk in reader:
+                partitions = get_user_partitions(chunk[user_col], n_partitions, user_sample_seed)
+                for partition, partition_chunk in chunk.groupby(partitions):
+                    partition_chunk.to_csv(spill_paths[partition], mode="a", header=False, index=False)
+
+        eventstream_schema = None
+        for partition, spill_path in enumerate(spill_paths):
+            eventstream = Eventstream.from_csv(
+                spill_path,
+                raw_data_schema=raw_data_schema,
+                schema=schema.copy() if schema is not None else None,
+                chunksize=chunksize,
+                dtype=dtype,
+                index_order=index_order,
+                encode_cols=encode_cols,
+                raw_cols=raw_cols,
+            )
+            eventstream.to_parquet(cls.__get_partition_path(path, partition))
+            eventstream_schema = eventstream.schema
+            del eventstream
+            os.remove(spill_path)
+
+        cls.__write_metadata(path, eventstream_schema, n_partitions, user_sample_seed)  # type: ignore
+        return cls(path)
+
+    def partitions(
+        self, columns: Optional[List[str]] = None, filters: Optional[List[Any]] = None
+    ) -> Iterator[Eventstream]:
+        """
+        Load the partitions one by one.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            Custom and raw columns to load. See :py:meth:`.Eventstream.read_parquet`.
+        filters : list, optional
+            Row filters pushed down to the parquet reader. See :py:meth:`.Eventstream.read_parquet`.
+
+        Returns
+        -------
+        Iterator[Eventstream]
+        """
+        for partition in range(self.n_partitions):
+            yield Eventstream.read_parquet(
+                self.__get_partition_path(self.path, partition), columns=columns, filters=filters
+            )
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "apply"},
+        scope="partitioned_eventstream",
+        allowed_params=[],
+    )
+    def apply(self, processor: DataProcessor, path: str) -> PartitionedEventstream:
+        """
+        Apply a user-local data processor partition by partition.
+
+        Parameters
+        ----------
+        processor : DataProcessor
+            A data processor with :py:attr:`.DataProcessor.is_user_local` trait,
+            e.g. ``SplitSessions``, ``CollapseLoops``, ``DropPaths`` or ``AddStartEndEvents``.
+        path : str
+            Path to a directory for the partitions of the result. It is created if it doesn't exist.
+
+        Returns
+        -------
+        PartitionedEventstream
+            The partitioned result with the same users in the same partitions.
+
+        Raises
+        ------
+        ValueError
+            If the processor is not user-local or the result path is the source one.
+        """
+        if not processor.is_user_local:
+            processor_name = processor.__class__.__name__
+            raise ValueError(f"{processor_name} is not user-local, so it cannot be applied by partitions!")
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            raise ValueError("The result of a data processor cannot replace the source partitions!")
+
+        os.makedirs(path, exist_ok=True)
+        schema = self.schema
+        for partition, eventstream in enumerate(self.partitions()):
+            graph = PreprocessingGraph(source_stream=eventstream)
+            node = EventsNode(processor)
+            graph.add_node(node=node, parents=[graph.root])
+            result = graph.combine(node)
+            result.to_parquet(self.__get_partition_path(path, partition))
+            # the source partitions are eventstreams, so are the results
+            schema = cast(EventstreamSchema, result.schema)
+            del graph, node, result, eventstream
+
+        self.__write_metadata(path, schema, self.n_partitions, self.user_sample_seed)
+        return PartitionedEventstream(path)
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "to_eventstream"},
+        scope="partitioned_eventstream",
+        allowed_params=[],
+    )
+    def to_eventstream(self) -> Eventstream:
+        """
+        Load all the partitions to a single in-memory ``eventstream``.
+
+        Returns
+        -------
+        Eventstream
+        """
+        paths = [self.__get_partition_path(self.path, partition) for partition in range(self.n_partitions)]
+        return Eventstream.read_parquet(paths)
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "helper"},
+        scope="funnel",
+        event_value="partitions",
+        allowed_params=[
+            "stages",
+            "stage_names",
+            "funnel_type",
+            "segments",
+            "segment_names",
+            "show_plot",
+        ],
+    )
+    def funnel(
+        self,
+        stages: list[str],
+        stage_names: list[str] | None = None,
+        funnel_type: Literal["open", "closed", "hybrid"] = "closed",
+        segments: Collection[Collection[int]] | None = None,
+        segment_names: list[str] | None = None,
+        show_plot: bool = True,
+    ) -> Funnel:
+        """
+        Calculate the funnel partition by partition and sum the numbers of users at each stage.
+
+        Parameters
+        ----------
+        See parameters' description
+            :py:meth:`.Eventstream.funnel`
+
+        Returns
+        -------
+        Funnel
+            A ``Funnel`` class instance fitted to the given parameters.
+        """
+        funnel = Funnel(eventstream=self)  # type: ignore
+        funnel._fit_partitions(
+            self.partitions(columns=[]),
+            stages=stages,
+            stage_names=stage_names,
+            funnel_type=funnel_type,
+            segments=segments,
+            segment_names=segment_names,
+        )
+        if show_plot:
+            figure = funnel.plot()
+            figure.show()
+        return funnel
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "helper"},
+        scope="step_matrix",
+        event_value="partitions",
+        allowed_params=[
+            "max_steps",
+            "weight_col",
+            "precision",
+            "targets",
+            "accumulated",
+            "sorting",
+            "threshold",
+            "groups",
+            "show_plot",
+        ],
+    )
+    def step_matrix(
+        self,
+        max_steps: int = 20,
+        weight_col: str | None = None,
+        precision: int = 2,
+        targets: list[str] | str | None = None,
+        accumulated: Literal["both", "only"] | None = None,
+        sorting: list | None = None,
+        threshold: float = 0,
+        groups: Tuple[list, list] | None = None,
+        show_plot: bool = True,
+    ) -> StepMatrix:
+        """
+        Calculate the step matrix partition by partition and average the partial matrices
+        weighted by the number of paths. ``centered`` step matrix is not supported.
+
+        Parameters
+        ----------
+        See parameters' description
+            :py:meth:`.Eventstream.step_matrix`
+
+        Returns
+        -------
+        StepMatrix
+            A ``StepMatrix`` class instance fitted to the given parameters.
+        """
+        step_matrix = StepMatrix(eventstream=self)  # type: ignore
+        step_matrix._fit_partitions(
+            self.partitions(columns=self.__get_custom_cols([weight_col])),
+            max_steps=max_steps,
+            weight_col=weight_col,
+            precision=precision,
+            targets=targets,
+            accumulated=accumulated,
+            sorting=sorting,
+            threshold=threshold,
+            groups=groups,
+        )
+        if show_plot:
+            step_matrix.plot()
+        return step_matrix
+
+    @track(  # type: ignore
+        tracking_info={"event_name": "helper"},
+        scope="edgelist",
+        event_value="partitions",
+        allowed_params=[
+            "weight_cols",
+            "norm_type",
+        ],
+    )
+    def edgelist(self, weight_cols: list[str] | None = None, norm_type: NormType = None) -> pd.DataFrame:
+        """
+        Calculate the transitions edgelist partition by partition and sum the partial transition counts.
+
+        Parameters
+        ----------
+        weight_cols : list of str, optional
+            Columns to weight the transitions with, e.g. ``event_id``, ``user_id`` or ``session_id``.
+            If ``None`` - ``event_id`` is used.
+        norm_type : {"full", "node", None}, default None
+            Type of the weights normalization. See :py:meth:`.Eventstream.transition_matrix`.
+
+        Returns
+        -------
+        pd.DataFrame
+            A dataframe with the transitions and their weights.
+        """
+        weight_cols = weight_cols or [self.schema.event_id]
+        edgelist = Edgelist(eventstream=self)  # type: ignore
+        return edgelist._calculate_partitions_edgelist(
+            self.partitions(columns=self.__get_custom_cols(weight_cols)), weight_cols=weight_cols, norm_type=norm_type
+        )
+
+    def __get_custom_cols(self, cols: Sequence[Optional[str]]) -> List[str]:
+        return [col for col in self.schema.custom_cols if col in cols]
+
+    @staticmethod
+    def __get_partition_path(path: str, partition: int) -> str:
+        return os.path.join(path, PARTITION_FILE_TEMPLATE.format(partition))
+
+    @staticmethod
+    def __write_metadata(
+        path: str, schema: EventstreamSchema, n_partitions: int, user_sample_seed: Optional[int]
+    ) -> None:
+        metadata = {
+            "schema": asdict(schema),
+            "n_partitions": n_partitions,
+            "user_sample_seed": user_sample_seed,
+        }
+        with open(os.path.join(path, PARTITIONS_METADATA_FILE), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
@@ -108,6 +108,19 @@ class RawDataSchema(RawDataSchemaType):
     user_id : str, default "user_id"
     event_type : str, optional
     custom_cols : list, optional
+    timestamp_format : str, optional
+        ``strftime`` format of ``event_timestamp`` values, e.g. ``"%Y-%m-%d %H:%M:%S"``.
+        Parsing string timestamps with an explicit format is much faster than
+        inferring the format of each value.
+    timestamp_unit : {"D", "s", "ms", "us", "ns"}, optional
+        Unit of ``event_timestamp`` values if they are stored as epoch numbers.
+    timestamp_utc : bool, default False
+        If ``True`` - ``event_timestamp`` values are parsed as UTC timestamps,
+        so the values with different UTC offsets can be parsed at once.
+    timestamp_tz : str, optional
+        Timezone the timezone-aware timestamps are converted to.
+        The timezone information is dropped after the conversion,
+        so ``event_timestamp`` keeps the local time of this timezone.
 
     Notes
     -----
@@ -120,6 +133,10 @@ class RawDataSchema(RawDataSchemaType):
     user_id: str = "user_id"
     event_type: Optional[str] = None
     custom_cols: List[RawDataCustomColSchema] = field(default_factory=list)
+    timestamp_format: Optional[str] = None
+    timestamp_unit: Optional[str] = None
+    timestamp_utc: bool = False
+    timestamp_tz: Optional[str] = None
 
     def copy(self) -> RawDataSchema:
         return RawDataSchema(
@@ -128,4 +145,8 @@ class RawDataSchema(RawDataSchemaType):
             user_id=self.user_id,
             custom_cols=self.custom_cols,
             event_type=self.event_type,
+            timestamp_format=self.timestamp_format,
+            timestamp_unit=self.timestamp_unit,
+            timestamp_utc=self.timestamp_utc,
+            timestamp_tz=self.timestamp_tz,
         )
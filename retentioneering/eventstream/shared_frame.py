@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import uuid
+from dataclasses import dataclass
+from typing import Any, List, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+# files placed there are kept in memory and are never written to a disk
+SHARED_MEMORY_DIR = "/dev/shm"
+SHARED_FRAME_ALIGNMENT = 64
+SHARED_FRAME_SUFFIX = ".frame"
+SHARED_FRAME_MAGIC = b"RETEFRM1"
+# the file ends with the offset of the pickled column locations and the magic bytes
+SHARED_FRAME_TRAILER = struct.Struct("<Q8s")
+
+
+@dataclass
+class SharedColumn:
+    """
+    Location of a ``SharedFrame`` column in the file.
+
+    - ``values`` columns are stored as a raw numpy buffer.
+    - ``codes`` columns are categorical, their codes are stored as a raw numpy buffer
+      and their pickled ``CategoricalDtype`` is stored separately.
+    - ``pickled`` columns (e.g. strings) are stored as a pickled pandas array.
+    """
+
+    name: str
+    kind: Literal["values", "codes", "pickled"]
+    dtype: str = ""
+    offset: int = 0
+    pickled_offset: int = 0
+    pickled_nbytes: int = 0
+
+
+class SharedFrame:
+    """
+    ``pd.DataFrame`` placed in a memory-mapped file, so the other processes can read its columns without copying.
+
+    Numeric, boolean, datetime and categorical columns are read as read-only numpy views of the file.
+    The other columns are pickled and are copied while reading.
+    ``SharedFrame`` itself only keeps the file path and the column locations, so it is cheap to pickle
+    and to send to worker processes. The column locations are also saved to the file,
+    so it can be opened again with :py:meth:`open`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    length : int
+        Number of rows.
+    columns : list of SharedColumn
+        Locations of the columns in the file.
+    metadata : dict, optional
+        Any picklable data attached to the frame.
+
+    See Also
+    --------
+    SharedFrame.from_dataframe : Place a dataframe in a memory-mapped file.
+    SharedFrame.open : Open a file written by ``from_dataframe``.
+    .Eventstream.to_shared_memory : Place an eventstream in shared memory.
+    """
+
+    path: str
+    length: int
+    columns: List[SharedColumn]
+    metadata: dict[str, Any]
+
+    def __init__(
+        self, path: str, length: int, columns: List[SharedColumn], metadata: Optional[dict[str, Any]] = None
+    ) -> None:
+        self.path = path
+        self.length = length
+        self.columns = columns
+        self.metadata = metadata if metadata is not None else {}
+
+    @classmethod
+    def from_dataframe(
+        cls, df: pd.DataFrame, path: Optional[str] = None, metadata: Optional[dict[str, Any]] = None
+    ) -> SharedFrame:
+        """
+        Write ``df`` to a file that can be memory-mapped by the other processes.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A dataframe with unique column names.
+        path : str, optional
+            Path to the file. If ``None`` - a new file is created in shared memory (``/dev/shm``)
+            if it is available, and in the temporary directory otherwise.
+            An existing file is replaced only after the new one is written, so the processes that have
+            mapped the old file keep reading it.
+        metadata : dict, optional
+            Any picklable data attached to the frame.
+
+        Returns
+        -------
+        SharedFrame
+        """
+        if path is None:
+            directory = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else tempfile.gettempdir()
+            path = os.path.join(directory, f"retentioneering-{uuid.uuid4().hex}{SHARED_FRAME_SUFFIX}")
+
+        columns: List[SharedColumn] = []
+        # truncating a mapped file in place would crash the processes reading it with SIGBUS
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                for name in df.columns:
+                    columns.append(cls.__write_column(file, name, df[name]))
+                index = {"length": len(df), "columns": columns, "metadata": metadata}
+                index_offset = cls.__write_aligned(file, pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+                file.write(SHARED_FRAME_TRAILER.pack(index_offset, SHARED_FRAME_MAGIC))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return cls(path=path, length=len(df), columns=columns, metadata=metadata)
+
+    @classmethod
+    def open(cls, path: str) -> SharedFrame:
+        """
+        Open a file written by :py:meth:`from_dataframe`.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+
+        Returns
+        -------
+        SharedFrame
+
+        Raises
+        ------
+        ValueError
+            If the file is not written by :py:meth:`from_dataframe`.
+        """
+        with open(path, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() < SHARED_FRAME_TRAILER.size:
+                raise ValueError(f"invalid shared frame file. {path} is too short!")
+            file.seek(-SHARED_FRAME_TRAILER.size, os.SEEK_END)
+            index_offset, magic = SHARED_FRAME_TRAILER.unpack(file.read(SHARED_FRAME_TRAILER.size))
+            if magic != SHARED_FRAME_MAGIC:
+                raise ValueError(f"invalid shared frame file. {path} is not written by SharedFrame!")
+            file.seek(index_offset)
+            index = pickle.loads(file.read()[: -SHARED_FRAME_TRAILER.size])
+        return cls(path=path, length=index["length"], columns=index["columns"], metadata=index["metadata"])
+
+    @classmethod
+    def __write_column(cls, file: Any, name: str, values: pd.Series) -> SharedColumn:
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            column = SharedColumn(name=name, kind="codes")
+            buffer: Optional[np.ndarray] = values.cat.codes.to_numpy()
+            pickled: Optional[bytes] = pickle.dumps(values.dtype, protocol=pickle.HIGHEST_PROTOCOL)
+        elif isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufmM":
+            column = SharedColumn(name=name, kind="values")
+            buffer, pickled = values.to_numpy(), None
+        else:
+            column = SharedColumn(name=name, kind="pickled")
+            buffer, pickled = None, pickle.dumps(values.array, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if buffer is not None:
+            column.dtype = buffer.dtype.str
+            # datetime values are written as their int64 representation
+            column.offset = cls.__write_aligned(file, np.ascontiguousarray(buffer).view(np.uint8))
+        if pickled is not None:
+            column.pickled_offset = cls.__write_aligned(file, pickled)
+            column.pickled_nbytes = len(pickled)
+        return column
+
+    @staticmethod
+    def __write_aligned(file: Any, data: bytes | np.ndarray) -> int:
+        position = file.tell()
+        offset = position + -position % SHARED_FRAME_ALIGNMENT
+        file.seek(offset)
+        file.write(data)
+        return offset
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Map the file and read the columns. The columns stored as numpy buffers are read-only views of the file.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        buffer = self.__map()
+        series = []
+        for column in self.columns:
+            pickled = buffer[column.pickled_offset : column.pickled_offset + column.pickled_nbytes]
+            if column.kind == "pickled":
+                values = pickle.loads(pickled)
+            else:
+                values = np.frombuffer(buffer, dtype=np.dtype(column.dtype), count=self.length, offset=column.offset)
+                if column.kind == "codes":
+                    values = pd.Categorical.from_codes(values, dtype=pickle.loads(pickled))
+            # the dtype is passed, so the object values are not inferred to be timestamps
+            series.append(pd.Series(values, dtype=values.dtype, name=column.name, copy=False))
+
+        if not series:
+            return pd.DataFrame(index=pd.RangeIndex(self.length))
+        # concatenating the column series without copying keeps them unconsolidated views of the file
+        return pd.concat(series, axis=1, copy=False)
+
+    def __map(self) -> mmap.mmap:
+        with open(self.path, "rb") as file:
+            # the mapping is released as soon as the last view of it is garbage collected
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def unlink(self) -> None:
+        """
+        Remove the file. The views that have already been read remain valid until they are garbage collected.
+
+        Returns
+        -------
+        None
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> SharedFrame:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.unlink()
@@ -2,11 +2,26 @@ from __future__ import annotations
 
 from abc import abstractmethod
 from dataclasses import field
-from typing import Any, List, Optional, Protocol, TypedDict, runtime_checkable
+from typing import (
+    Any,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Protocol,
+    TypedDict,
+    Union,
+    runtime_checkable,
+)
 
 import pandas as pd
 
+from retentioneering.eventstream.event_id import EventIdAllocator
+from retentioneering.eventstream.shared_frame import SharedFrame
+from retentioneering.eventstream.user_layout import UserLayout
+
 IndexOrder = List[Optional[str]]
+RawColsPolicy = Union[Literal["all", "reference", "none"], List[str]]
 
 
 class Relation(TypedDict):
@@ -19,6 +34,10 @@ class EventstreamType(Protocol):
     schema: EventstreamSchemaType
     index_order: IndexOrder
     relations: List[Relation]
+    encode_cols: bool
+    raw_cols: RawColsPolicy
+    _event_id_allocator: EventIdAllocator
+    _version: int
     __raw_data_schema: RawDataSchemaType
     __events: pd.DataFrame | pd.Series[Any]
 
@@ -31,11 +50,22 @@ class EventstreamType(Protocol):
         ...
 
     @abstractmethod
-    def _join_eventstream(self, eventstream: EventstreamType) -> None:
+    def union(self, eventstreams: List[EventstreamType]) -> None:
+        ...
+
+    @abstractmethod
+    def _join_eventstream(self, eventstream: EventstreamType, index: bool = True) -> None:
         ...
 
     @abstractmethod
-    def to_dataframe(self, raw_cols: bool = False, show_deleted: bool = False, copy: bool = False) -> pd.DataFrame:
+    def to_dataframe(
+        self,
+        raw_cols: bool = False,
+        show_deleted: bool = False,
+        copy: bool = False,
+        decode: bool = True,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
         ...
 
     @abstractmethod
@@ -50,10 +80,75 @@ class EventstreamType(Protocol):
     def add_custom_col(self, name: str, data: pd.Series[Any] | None) -> None:
         ...
 
+    @abstractmethod
+    def index_events(self) -> None:
+        ...
+
     @abstractmethod
     def _soft_delete(self, events: pd.DataFrame) -> None:
         ...
 
+    @abstractmethod
+    def compact(self) -> None:
+        ...
+
+    @abstractmethod
+    def _split_by_users(self, n_partitions: int, user_sample_seed: Optional[int] = None) -> Iterator[EventstreamType]:
+        ...
+
+    @abstractmethod
+    def _get_user_partition(self, n_partitions: int, partition: int) -> EventstreamType:
+        ...
+
+    @abstractmethod
+    def _get_user_layout(self) -> UserLayout:
+        ...
+
+    @abstractmethod
+    def _merge_user_partitions(self, partitions: List[SharedFrame]) -> None:
+        ...
+
+    @abstractmethod
+    def to_shared_memory(self, path: Optional[str] = None) -> SharedFrame:
+        ...
+
+    @abstractmethod
+    def to_parquet(self, path: str) -> None:
+        ...
+
+    @abstractmethod
+    def to_mmap(self, path: str) -> None:
+        ...
+
+    @classmethod
+    @abstractmethod
+    def open_mmap(cls, path: str) -> EventstreamType:
+        ...
+
+    @abstractmethod
+    def _get_events_count(self) -> int:
+        ...
+
+    @abstractmethod
+    def _get_deleted_share(self) -> float:
+        ...
+
+    @abstractmethod
+    def _get_relation_depth(self) -> int:
+        ...
+
+    @abstractmethod
+    def _get_memory_usage(self) -> int:
+        ...
+
+    @abstractmethod
+    def _get_content_hash(self) -> str:
+        ...
+
+    @abstractmethod
+    def _rebase_event_ids(self, eventstream: EventstreamType) -> None:
+        ...
+
 
 class EventstreamSchemaType(Protocol):
     custom_cols: List[str] = field(default_factory=list)
@@ -92,6 +187,10 @@ class RawDataSchemaType(Protocol):
     user_id: str = "user_id"
     event_type: Optional[str] = None
     custom_cols: List[RawDataCustomColSchema] = field(default_factory=list)
+    timestamp_format: Optional[str] = None
+    timestamp_unit: Optional[str] = None
+    timestamp_utc: bool = False
+    timestamp_tz: Optional[str] = None
 
     @abstractmethod
     def copy(self) -> RawDataSchemaType:
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class UserLayout:
+    """
+    User-major order of the events sorted by timestamp.
+
+    The events of ``eventstream`` are sorted by timestamp and event type order, so the events
+    of a user are scattered over the whole dataframe. ``UserLayout`` keeps a permutation
+    that places the events of each user together, keeping their order, and CSR-style offsets
+    of the users in the permuted events. It allows to calculate per-user values with
+    numpy slicing instead of ``groupby`` by ``user_id``.
+
+    The kernels take and return arrays aligned with the events in the original order.
+    ``Eventstream`` builds the layout of its events on the first request and keeps it
+    until the events are changed, so data processors and tools share it.
+
+    Parameters
+    ----------
+    user_ids : pd.Series or np.ndarray
+        User ids of the events sorted by timestamp.
+    """
+
+    users: pd.Index
+    positions: np.ndarray
+    offsets: np.ndarray
+
+    def __init__(self, user_ids: pd.Series | np.ndarray) -> None:
+        codes, users = pd.factorize(user_ids)
+        # numpy sorts integers with a stable radix sort, so the events of a user keep their order
+        self.positions = np.argsort(codes, kind="stable")
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(users)))])
+        self.users = pd.Index(users)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """
+        Number of events of each user.
+        """
+        return np.diff(self.offsets)
+
+    def to_user_major(self, values: pd.Series | np.ndarray) -> np.ndarray:
+        """
+        Reorder ``values`` aligned with the events so the values of each user are placed together.
+        The values of the user ``users[i]`` are ``result[offsets[i]:offsets[i + 1]]``.
+        """
+        return np.asarray(values)[self.positions]
+
+    def from_user_major(self, values: np.ndarray) -> np.ndarray:
+        """
+        Reorder user-major ``values`` back to the order of the events.
+        """
+        result = np.empty_like(values)
+        result[self.positions] = values
+        return result
+
+    def cumcount(self) -> np.ndarray:
+        """
+        Number each event of a user from 0 to the number of the user events minus 1.
+        The same as ``groupby(user_col).cumcount()``.
+        """
+        return self.from_user_major(self.__get_user_major_steps())
+
+    def cumsum(self, values: pd.Series | np.ndarray) -> np.ndarray:
+        """
+        Cumulative sum of ``values`` for each user. The values must not contain missing values.
+        The same as ``groupby(user_col)[col].cumsum()``.
+        """
+        values = np.cumsum(self.to_user_major(values))
+        totals = np.concatenate([np.zeros(1, dtype=values.dtype), values])[self.offsets[:-1]]
+        return self.from_user_major(values - np.repeat(totals, self.sizes))
+
+    def shift(self, values: pd.Series | np.ndarray, periods: int = 1) -> pd.Series | np.ndarray:
+        """
+        Shift ``values`` by ``periods`` events of each user. The same as ``groupby(user_col)[col].shift(periods)``:
+        the values missing for the first (or the last if ``periods`` is negative) events of a user are filled with
+        ``NaT`` for datetime values and with ``NaN`` otherwise, so integer values are converted to float.
+        Timezone-aware timestamps are returned as ``pd.Series`` with the same dtype and index.
+        """
+        steps = self.__get_user_major_steps()
+        if periods >= 0:
+            has_value = steps >= periods
+        else:
+            has_value = steps < np.repeat(self.sizes, self.sizes) + periods
+        shifted_steps = np.flatnonzero(has_value)
+
+        if isinstance(values, pd.Series) and isinstance(values.dtype, pd.DatetimeTZDtype):
+            # numpy has no timezone-aware dtype, so the positions of the shifted values are taken by pandas
+            source_positions = np.full(len(values), -1, dtype=np.int64)
+            source_positions[self.positions[shifted_steps]] = self.positions[shifted_steps - periods]
+            shifted_values = pd.api.extensions.take(values.array, source_positions, allow_fill=True)
+            return pd.Series(shifted_values, index=values.index, name=values.name)
+
+        user_major_values = self.to_user_major(values)
+        dtype, missing_value = self.__get_missing_value(user_major_values.dtype)
+        shifted = np.full(len(user_major_values), missing_value, dtype=dtype)
+        shifted[has_value] = user_major_values[shifted_steps - periods]
+        return self.from_user_major(shifted)
+
+    def first(self, values: pd.Series | np.ndarray) -> np.ndarray:
+        """
+        The first value of each user, aligned with ``users``.
+        """
+        return np.asarray(values)[self.positions[self.offsets[:-1]]]
+
+    def last(self, values: pd.Series | np.ndarray) -> np.ndarray:
+        """
+        The last value of each user, aligned with ``users``.
+        """
+        return np.asarray(values)[self.positions[self.offsets[1:] - 1]]
+
+    def __get_user_major_steps(self) -> np.ndarray:
+        return np.arange(len(self.positions)) - np.repeat(self.offsets[:-1], self.sizes)
+
+    @staticmethod
+    def __get_missing_value(dtype: np.dtype) -> Tuple[np.dtype, Any]:
+        if dtype.kind in "mM":
+            return dtype, np.datetime64("NaT") if dtype.kind == "M" else np.timedelta64("NaT")
+        if dtype.kind in "biuf":
+            return np.dtype("float64"), np.nan
+        return np.dtype("object"), np.nan
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# users are sampled by the high bits of their hash, so a share selects the same users
+# regardless of how many other users are loaded
+USER_SAMPLE_HASH_BITS = 32
+
+
+def hash_user_ids(user_ids: pd.Series, user_sample_seed: Optional[int] = None) -> np.ndarray:
+    """
+    Calculate a stable hash of user identifiers.
+    The same identifier always gets the same hash for the same seed, across sessions as well.
+
+    Parameters
+    ----------
+    user_ids : pd.Series
+        A column with user identifiers.
+    user_sample_seed : int, optional
+        A seed that is mixed into the hashes.
+
+    Returns
+    -------
+    np.ndarray
+        ``uint64`` hashes.
+    """
+    hashes = pd.util.hash_pandas_object(user_ids, index=False).to_numpy()
+    if user_sample_seed is None:
+        return hashes
+    # hash_key is ignored for numeric columns, so the seed is mixed into the hashes instead
+    seed_hash = pd.util.hash_array(np.array([user_sample_seed], dtype=np.int64))[0]
+    return pd.util.hash_array(hashes ^ seed_hash)
+
+
+def get_user_sample_mask(
+    user_ids: pd.Series, user_sample_share: float, user_sample_seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Select the users whose hash falls into the first ``user_sample_share`` of the hash range.
+    A user is selected or not independently of the other users, so the data can be sampled chunk by chunk.
+
+    Parameters
+    ----------
+    user_ids : pd.Series
+        A column with user identifiers.
+    user_sample_share : float
+        A share of users to select.
+    user_sample_seed : int, optional
+        A seed that is mixed into the hashes.
+
+    Returns
+    -------
+    np.ndarray
+        A boolean mask of the rows of the selected users.
+    """
+    validate_user_sample_share(user_sample_share)
+    threshold = int(user_sample_share * (1 << USER_SAMPLE_HASH_BITS))
+    buckets = hash_user_ids(user_ids, user_sample_seed) >> np.uint64(64 - USER_SAMPLE_HASH_BITS)
+    return buckets < threshold
+
+
+def get_user_sample(user_ids: pd.Series, user_sample_size: int, user_sample_seed: Optional[int] = None) -> np.ndarray:
+    """
+    Select ``user_sample_size`` users with the lowest hashes.
+
+    Parameters
+    ----------
+    user_ids : pd.Series
+        A column with user identifiers.
+    user_sample_size : int
+        A number of users to select.
+    user_sample_seed : int, optional
+        A seed that is mixed into the hashes.
+
+    Returns
+    -------
+    np.ndarray
+        The selected user identifiers.
+    """
+    unique_users = pd.Series(user_ids.unique())
+    if user_sample_size >= len(unique_users):
+        return unique_users.to_numpy()
+    hashes = hash_user_ids(unique_users, user_sample_seed)
+    return unique_users.to_numpy()[np.argpartition(hashes, user_sample_size)[:user_sample_size]]
+
+
+def validate_user_sample_share(user_sample_share: float) -> None:
+    if user_sample_share < 0:
+        raise ValueError("User sample size/share cannot be negative!")
+    if user_sample_share > 1:
+        raise ValueError("User sample share cannot exceed 1!")
+
+
+def get_user_partitions(user_ids: pd.Series, n_partitions: int, user_sample_seed: Optional[int] = None) -> np.ndarray:
+    """
+    Assign users to ``n_partitions`` partitions by the hash of their identifiers.
+    The low bits of the hash are used, so the partitions don't depend on the user sampling with the same seed.
+
+    Parameters
+    ----------
+    user_ids : pd.Series
+        A column with user identifiers.
+    n_partitions : int
+        A number of partitions.
+    user_sample_seed : int, optional
+        A seed that is mixed into the hashes.
+
+    Returns
+    -------
+    np.ndarray
+        Partition numbers of the rows.
+    """
+    if n_partitions < 1:
+        raise ValueError("Number of partitions must be positive!")
+    return (hash_user_ids(user_ids, user_sample_seed) % np.uint64(n_partitions)).astype(np.int64)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 
@@ -12,13 +13,18 @@ class Nodelist:
         self.weight_cols = weight_cols
 
     def calculate_nodelist(self, data: pd.DataFrame) -> pd.DataFrame:
-        res: pd.DataFrame = data.groupby([self.event_col])[self.time_col].count().reset_index()
+        # the events are grouped by their codes, so the names of an encoded column are not decoded for every event
+        codes, events = pd.factorize(data[self.event_col])
+        grouped = data.groupby(codes)
+        res: pd.DataFrame = pd.DataFrame(
+            {self.event_col: np.asarray(events), self.time_col: grouped[self.time_col].count().to_numpy()}
+        )
         if self.weight_cols is not None:
             for weight_col in self.weight_cols:
                 if weight_col == self.event_col:
                     continue
-                by_col = data.groupby([self.event_col])[weight_col].nunique().reset_index()
-                res = res.join(by_col[weight_col])
+                res[weight_col] = grouped[weight_col].nunique().to_numpy()
+        res = res.sort_values(by=self.event_col, ignore_index=True)
 
         res = res.sort_values(by=self.time_col, ascending=False)
         res = res.drop(columns=[self.time_col], axis=1)
@@ -1,2 +1,9 @@
 from .nodes import EventsNode, MergeNode, SourceNode
-from .preprocessing_graph import PreprocessingGraph
+from .preprocessing_graph import (
+    CachePolicy,
+    CompactionPolicy,
+    FusionPolicy,
+    ParallelPolicy,
+    PreprocessingGraph,
+)
+from .profile import CombineProfile, NodeProfile
@@ -1,14 +1,31 @@
 from __future__ import annotations
 
+import hashlib
+import inspect
 import json
-from typing import Any, List, Literal, Optional, TypedDict, cast
+import os
+import threading
+import time
+import tracemalloc
+import types
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator, List, Literal, Optional, Tuple, TypedDict, cast
 
 import networkx
+import numpy as np
+import pandas as pd
 from IPython.core.display import HTML, DisplayHandle, display
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
 from retentioneering.backend import JupyterServer, ServerManager
 from retentioneering.backend.callback import list_dataprocessor, list_dataprocessor_mock
+from retentioneering.backend.tracker import tracker
+from retentioneering.data_processor import DataProcessor
+from retentioneering.eventstream.shared_frame import SHARED_FRAME_SUFFIX, SharedFrame
 from retentioneering.eventstream.types import EventstreamType
 from retentioneering.exceptions.server import ServerErrorWithResponse
 from retentioneering.exceptions.widget import WidgetParseError
@@ -19,6 +36,7 @@ from retentioneering.preprocessing_graph.nodes import (
     SourceNode,
     build_node,
 )
+from retentioneering.preprocessing_graph.profile import CombineProfile, NodeProfile
 from retentioneering.templates import PreprocessingGraphRenderer
 
 
@@ -40,10 +58,14 @@ class Payload(TypedDict):
     links: list[NodeLink]
 
 
-class CombineHandlerPayload(TypedDict):
+class _CombineHandlerPayload(TypedDict):
     node_pk: str
 
 
+class CombineHandlerPayload(_CombineHandlerPayload, total=False):
+    profile: bool
+
+
 class FieldErrorDesc(TypedDict):
     field: str
     msg: str
@@ -56,6 +78,201 @@ class CreateNodeErrorDesc(TypedDict):
     fields_errors: List[FieldErrorDesc]
 
 
+@dataclass
+class CompactionPolicy:
+    """
+    Define when ``PreprocessingGraph.combine`` calls ``Eventstream.compact`` for the intermediate results.
+
+    Parameters
+    ----------
+    deleted_share : float, default 0.5
+        Compact an eventstream if the share of its soft-deleted events exceeds this value.
+    relation_depth : int, default 8
+        Compact an eventstream if the chain of its related eventstreams is longer than this value.
+    enabled : bool, default True
+        If ``False`` - eventstreams are never compacted automatically.
+
+    """
+
+    deleted_share: float = 0.5
+    relation_depth: int = 8
+    enabled: bool = True
+
+    def is_triggered(self, eventstream: EventstreamType) -> bool:
+        if not self.enabled:
+            return False
+        return (
+            eventstream._get_deleted_share() > self.deleted_share
+            or eventstream._get_relation_depth() > self.relation_depth
+        )
+
+
+@dataclass
+class ParallelPolicy:
+    """
+    Define how ``PreprocessingGraph.combine`` calculates the graph in parallel.
+
+    Only the data processors with :py:attr:`.DataProcessor.is_user_local` trait are applied on a pool
+    of worker processes. The eventstream is split into user-disjoint parts by the hash of ``user_id``,
+    each part is processed by a worker, and the results are merged back.
+
+    The parents of a ``MergeNode`` are independent branches of the graph, so they can be calculated
+    on a pool of threads. The common ancestors of the branches are still calculated once.
+
+    Parameters
+    ----------
+    n_jobs : int, default 1
+        Number of worker processes. If ``-1`` - all the CPUs are used.
+        If ``1`` - data processors are always applied in the current process.
+    min_events : int, default 1000000
+        Smaller eventstreams are processed in the current process,
+        since splitting and merging would take longer than the processing itself.
+    branch_jobs : int, default 1
+        Number of threads calculating the parents of a ``MergeNode``. If ``-1`` - all the CPUs are used.
+        If ``1`` - the parents are calculated one after another.
+
+    """
+
+    n_jobs: int = 1
+    min_events: int = 1_000_000
+    branch_jobs: int = 1
+
+    def get_n_jobs(self) -> int:
+        return self.__get_workers_count(self.n_jobs, "n_jobs")
+
+    def get_branch_jobs(self) -> int:
+        return self.__get_workers_count(self.branch_jobs, "branch_jobs")
+
+    @staticmethod
+    def __get_workers_count(jobs: int, name: str) -> int:
+        if jobs == -1:
+            return os.cpu_count() or 1
+        if jobs < 1:
+            raise ValueError(f"{name} must be positive or -1!")
+        return jobs
+
+    def is_triggered(self, processor: DataProcessor, eventstream: EventstreamType) -> bool:
+        return self.get_n_jobs() > 1 and processor.is_user_local and eventstream._get_events_count() >= self.min_events
+
+
+@dataclass
+class CachePolicy:
+    """
+    Define how ``PreprocessingGraph.combine`` keeps the calculated node results.
+
+    A node result is reused while the node, its data processor parameters and all its ancestors stay the same,
+    so the common part of the paths to several nodes is calculated once. The least recently used results
+    are evicted when the memory budget is exceeded.
+
+    Parameters
+    ----------
+    max_bytes : int, default 1073741824
+        Memory budget for the kept results. Results larger than the budget are never kept.
+    enabled : bool, default True
+        If ``False`` - the nodes are calculated from the ``SourceNode`` on each ``combine`` call.
+    directory : str, optional
+        If defined - the node results are also saved to this directory and are reused by the graphs
+        created later, e.g. after a kernel restart. A saved result is found by a hash of the source events
+        and the parameters of the data processors on the path to the node.
+        The nodes with parameters that can't be compared across sessions, e.g. functions without
+        available source code, are not saved.
+    directory_max_bytes : int, default 8589934592
+        Disk budget for the results saved to ``directory``. The least recently used results
+        are removed when it is exceeded. Results larger than the budget are never saved.
+
+    """
+
+    max_bytes: int = 2**30
+    enabled: bool = True
+    directory: Optional[str] = None
+    directory_max_bytes: int = 2**33
+
+
+@dataclass
+class FusionPolicy:
+    """
+    Define when ``PreprocessingGraph.combine`` fuses a chain of ``EventsNode`` into a single calculation step.
+
+    The data processors with :py:attr:`.DataProcessor.is_fusable` trait, e.g. ``FilterEvents``, ``GroupEvents``
+    and ``RenameProcessor``, only change or delete the existing events. A chain of them is applied to the same
+    dataframe, and the result is joined to the eventstream and sorted once, instead of creating, joining
+    and sorting an eventstream for each node. A chain is interrupted by a node with several children or
+    with a kept result, since its own result is needed, and by the second data processor changing event types.
+    The results of the inner nodes of a chain are not kept. See :py:meth:`PreprocessingGraph.explain`.
+
+    Parameters
+    ----------
+    enabled : bool, default True
+        If ``False`` - each node is calculated separately.
+
+    """
+
+    enabled: bool = True
+
+
+@dataclass
+class _CachedResult:
+    fingerprint: str
+    eventstream: EventstreamType
+    nbytes: int
+    # the objects identified by their ids in the fingerprint are kept alive, so their ids are not reused
+    referenced: List[Any] = field(default_factory=list)
+
+
+def _get_raw_params(processor: DataProcessor) -> dict:
+    # unlike DataProcessor.to_dict, the parameters are not serialized for the widget, e.g. functions stay as they are
+    return {"name": processor.__class__.__name__, "values": BaseModel.dict(processor.params)}
+
+
+def _get_persisted_param(obj: Any) -> Any:
+    # functions are identified by their code and the values they use, modules and classes by their names,
+    # the other objects can't be compared across sessions
+    if isinstance(obj, types.ModuleType):
+        return f"module:{obj.__name__}"
+    if isinstance(obj, type):
+        return f"class:{obj.__module__}.{obj.__qualname__}"
+    if not isinstance(obj, types.FunctionType):
+        raise TypeError(f"{type(obj).__name__} parameters can't be saved!")
+
+    code = obj.__code__
+    global_names = set(code.co_names)
+    nested_codes = [const for const in code.co_consts if isinstance(const, types.CodeType)]
+    while nested_codes:
+        nested_code = nested_codes.pop()
+        global_names.update(nested_code.co_names)
+        nested_codes += [const for const in nested_code.co_consts if isinstance(const, types.CodeType)]
+
+    # the values are encoded by json.dumps calling this function again
+    return {
+        "source": inspect.getsource(obj),
+        "code": code.co_code.hex(),
+        "names": code.co_names,
+        "closure": [cell.cell_contents for cell in obj.__closure__ or ()],
+        "defaults": obj.__defaults__,
+        "kwdefaults": obj.__kwdefaults__,
+        "globals": {name: obj.__globals__[name] for name in sorted(global_names) if name in obj.__globals__},
+    }
+
+
+def _init_worker() -> None:
+    # the combine call is already tracked by the main process
+    tracker.enabled = False
+
+
+def _combine_user_partition(
+    processor: DataProcessor, shared: SharedFrame, n_partitions: int, partition: int
+) -> Optional[SharedFrame]:
+    # the eventstream module imports the preprocessing graph, so it is imported in the worker only
+    from retentioneering.eventstream import Eventstream
+
+    eventstream = Eventstream._attach_shared_memory(shared)._get_user_partition(n_partitions, partition)
+    if eventstream._get_events_count() == 0:
+        return None
+    # the events deleted by the data processor are sent back, the merged eventstream is compacted by the policy
+    eventstream._join_eventstream(processor.apply(eventstream))
+    return eventstream.to_shared_memory()
+
+
 class PreprocessingGraph:
     """
     Collection of methods for preprocessing graph construction and calculation.
@@ -64,6 +281,18 @@ class PreprocessingGraph:
     ----------
     source_stream : EventstreamType
         Source eventstream.
+    compaction_policy : CompactionPolicy, optional
+        Thresholds for automatic compaction of the calculated eventstreams.
+        See default policy :py:class:`.CompactionPolicy`.
+    parallel_policy : ParallelPolicy, optional
+        Parallel application of user-local data processors.
+        See default policy :py:class:`.ParallelPolicy`.
+    cache_policy : CachePolicy, optional
+        Memory budget for the calculated node results reused by ``combine``.
+        See default policy :py:class:`.CachePolicy`.
+    fusion_policy : FusionPolicy, optional
+        Fusion of the chains of nodes into single calculation steps.
+        See default policy :py:class:`.FusionPolicy`.
 
     Notes
     -----
@@ -73,13 +302,52 @@ class PreprocessingGraph:
 
     root: SourceNode
     combine_result: EventstreamType | None
+    combine_profile: CombineProfile | None
+    compaction_policy: CompactionPolicy
+    parallel_policy: ParallelPolicy
+    cache_policy: CachePolicy
+    fusion_policy: FusionPolicy
     _ngraph: networkx.DiGraph
+    __cache: OrderedDict[str, _CachedResult]
+    # the results of the shared ancestors calculated by the running combine
+    __combine_results: Optional[dict[str, EventstreamType]]
+    __source_hash: Optional[Tuple[Tuple[int, int], str]]
+    # the branches of the graph may be calculated in several threads
+    __cache_lock: threading.Lock
+    __node_locks: dict[str, threading.Lock]
+    __profile: Optional[CombineProfile]
+    __profile_start: float
+    __trace_memory: bool
+    __profile_widget: bool = False
+    # the profile of the step calculated by each thread
+    __profiled_steps: threading.local
     __server_manager: ServerManager | None = None
     __server: JupyterServer | None = None
 
-    def __init__(self, source_stream: EventstreamType) -> None:
+    def __init__(
+        self,
+        source_stream: EventstreamType,
+        compaction_policy: Optional[CompactionPolicy] = None,
+        parallel_policy: Optional[ParallelPolicy] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        fusion_policy: Optional[FusionPolicy] = None,
+    ) -> None:
         self.root = SourceNode(source=source_stream)
         self.combine_result = None
+        self.combine_profile = None
+        self.compaction_policy = compaction_policy if compaction_policy else CompactionPolicy()
+        self.parallel_policy = parallel_policy if parallel_policy else ParallelPolicy()
+        self.cache_policy = cache_policy if cache_policy else CachePolicy()
+        self.fusion_policy = fusion_policy if fusion_policy else FusionPolicy()
+        self.__cache = OrderedDict()
+        self.__combine_results = None
+        self.__source_hash = None
+        self.__cache_lock = threading.Lock()
+        self.__node_locks = {}
+        self.__profile = None
+        self.__profile_start = 0.0
+        self.__trace_memory = False
+        self.__profiled_steps = threading.local()
         self._ngraph = networkx.DiGraph()
         self._ngraph.add_node(self.root)
 
@@ -121,14 +389,23 @@ class PreprocessingGraph:
         for parent in parents:
             self._ngraph.add_edge(parent, node)
 
-    def combine(self, node: Node) -> EventstreamType:
+    def combine(self, node: Node, profile: bool = False) -> EventstreamType:
         """
         Run calculations from the ``SourceNode`` up to the specified ``node``.
+        The results of ``node`` and its ancestors are kept according to ``cache_policy``,
+        so the next calls reuse them. An ancestor shared by several branches is calculated once
+        per call even if its result isn't kept, so the result doesn't depend on ``cache_policy``.
 
         Parameters
         ----------
         node : Node
             Instance of either ``SourceNode``, ``EventsNode`` or ``MergeNode``.
+        profile : bool, default False
+            If ``True`` - the time, memory and number of events of each calculation step are recorded
+            to ``combine_profile`` attribute. See :py:class:`.CombineProfile`.
+            Memory is traced with ``tracemalloc``, so the calculation is slower.
+            The memory peaks are process-wide, so they aren't recorded if the branches of merge nodes
+            are calculated in several threads, see :py:class:`.ParallelPolicy`, and on Python 3.8.
 
         Returns
         -------
@@ -136,36 +413,516 @@ class PreprocessingGraph:
             ``Eventstream`` with all changes applied by data processors.
         """
         self.__validate_not_found([node])
-
+        # the branches calculated in other threads and the nested calls share the results of the outer call
+        started_call = self.__combine_results is None
+        if started_call:
+            self.__combine_results = {}
+        try:
+            return self.__combine_profiled(node) if profile else self.__combine(node)
+        finally:
+            if started_call:
+                self.__combine_results = None
+
+    def __combine_profiled(self, node: Node) -> EventstreamType:
+        combine_profile = CombineProfile()
+        # python 3.8 has no reset_peak, and the peaks of the steps calculated in parallel can't be separated
+        self.__trace_memory = hasattr(tracemalloc, "reset_peak") and self.parallel_policy.get_branch_jobs() == 1
+        started_tracing = self.__trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        self.__profile, self.__profile_start = combine_profile, time.perf_counter()
+        try:
+            return self.__combine(node)
+        finally:
+            self.__profile = None
+            if started_tracing:
+                tracemalloc.stop()
+            self.combine_profile = combine_profile
+
+    def __combine(self, node: Node) -> EventstreamType:
         if isinstance(node, SourceNode):
             return node.events.copy()
 
+        # a common ancestor of the branches calculated in several threads is calculated by the first of them
+        with self.__get_node_lock(node):
+            return self.__combine_node(node)
+
+    def __get_node_lock(self, node: Node) -> threading.Lock:
+        with self.__cache_lock:
+            return self.__node_locks.setdefault(node.pk, threading.Lock())
+
+    def __combine_node(self, node: Node) -> EventstreamType:
+        referenced: List[Any] = []
+        fingerprint = self._get_fingerprint(node, referenced) if self.cache_policy.enabled else ""
+        combine_results = self.__combine_results if self.__combine_results is not None else {}
+        with self.__cache_lock:
+            if (cached := self.__cache.get(node.pk)) is not None and cached.fingerprint == fingerprint:
+                self.__cache.move_to_end(node.pk)
+                kept: Optional[EventstreamType] = cached.eventstream
+            else:
+                kept = combine_results.get(node.pk)
+        if kept is not None:
+            with self.__profile_step(node, self.__get_step_name([node]), [], status="kept") as profiled:
+                result = kept.copy()
+                profiled.append(result)
+            return result
+
+        persisted_key = self._get_persisted_key(node) if self.cache_policy.enabled else None
+        with self.__profile_step(node, self.__get_step_name([node]), [], status="loaded") as profiled:
+            loaded = self.__load_result(persisted_key) if persisted_key is not None else None
+            if loaded is not None:
+                profiled.append(loaded)
+        if loaded is not None:
+            result = loaded
+        else:
+            if isinstance(node, EventsNode):
+                result = self._combine_events_node(node)
+            else:
+                # the source node is returned by combine itself
+                result = self._combine_merge_node(cast(MergeNode, node))
+            if persisted_key is not None:
+                self.__save_result(persisted_key, result)
+
+        if self.cache_policy.enabled:
+            self.__cache_result(node, fingerprint, referenced, result)
+        # the created events of a shared ancestor calculated again would get other identifiers,
+        # so the merged branches would not share them. The kept copy may be evicted by another branch.
+        if self._ngraph.out_degree(node) > 1:
+            with self.__cache_lock:
+                cached = self.__cache.get(node.pk) if self.cache_policy.enabled else None
+                combine_results[node.pk] = cached.eventstream if cached is not None else result.copy()
+        return result
+
+    def clear_cache(self) -> None:
+        """
+        Remove all the node results kept by ``combine``, including the ones saved to ``cache_policy.directory``
+        for the source eventstream of the graph. Call it if a data processor depends on
+        any external data that has been changed, e.g. a function of ``FilterEvents`` uses a global variable.
+
+        Returns
+        -------
+        None
+        """
+        with self.__cache_lock:
+            self.__cache.clear()
+        directory = self.cache_policy.directory
+        if directory is None or not os.path.isdir(directory):
+            return
+        prefix = f"{self.__get_source_hash()[:16]}-"
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith(SHARED_FRAME_SUFFIX):
+                os.remove(os.path.join(directory, name))
+
+    def explain(self, node: Node) -> str:
+        """
+        Show the plan of ``combine`` for the specified ``node``. Each line is a calculation step
+        followed by the steps calculating its parents with a deeper indent:
+
+        - a single data processor or a chain of them fused into one step, see :py:class:`.FusionPolicy`;
+        - a ``MergeNode`` uniting its parents;
+        - a node whose kept result is reused instead of calculating its parents, see :py:class:`.CachePolicy`.
+
+        Parameters
+        ----------
+        node : Node
+            Instance of either ``SourceNode``, ``EventsNode`` or ``MergeNode``.
+
+        Returns
+        -------
+        str
+
+        """
+        self.__validate_not_found([node])
+        lines: List[str] = []
+        self.__explain_node(node, lines, depth=0)
+        return "\n".join(lines)
+
+    def __explain_node(self, node: Node, lines: List[str], depth: int) -> None:
+        indent = "    " * depth
+        if isinstance(node, SourceNode):
+            lines.append(f"{indent}SourceNode")
+            return
+        if self.__is_cached(node):
+            lines.append(f"{indent}{self.__get_step_name([node])} (kept result)")
+            return
+
+        parents: List[Node]
         if isinstance(node, EventsNode):
-            return self._combine_events_node(node)
+            chain = self._get_fused_chain(node)
+            step = self.__get_step_name(cast(List[Node], chain))
+            parents = [self._get_events_node_parent(chain[0])]
+        else:
+            step = self.__get_step_name([node])
+            parents = self._get_merge_node_parents(node)
+
+        lines.append(f"{indent}{step}")
+        for parent in parents:
+            self.__explain_node(parent, lines, depth=depth + 1)
+
+    @staticmethod
+    def __get_step_name(chain: List[Node]) -> str:
+        if not isinstance(chain[0], EventsNode):
+            return "MergeNode"
+        step = " -> ".join(type(cast(EventsNode, chain_node).processor).__name__ for chain_node in chain)
+        return f"Fused: {step}" if len(chain) > 1 else step
+
+    @contextmanager
+    def __profile_step(
+        self, node: Node, step: str, parents: List[EventstreamType], status: str = "calculated"
+    ) -> Iterator[List[EventstreamType]]:
+        """
+        Record the step calculating ``node`` from the ``parents`` eventstreams to the profile of the running
+        ``combine``. The step appends its result to the yielded list, it isn't recorded if the list stays empty.
+        """
+        results: List[EventstreamType] = []
+        combine_profile = self.__profile
+        if combine_profile is None:
+            yield results
+            return
+
+        node_profile = NodeProfile(node_pk=node.pk, step=step, status=status, thread_id=threading.get_ident())
+        parent_event_ids = [self.__get_event_ids(parent) for parent in parents]
+        node_profile.rows_in = sum(len(event_ids) for event_ids in parent_event_ids)
+        memory_before = 0
+        if self.__trace_memory:
+            tracemalloc.reset_peak()  # type: ignore
+            memory_before = tracemalloc.get_traced_memory()[0]
+        self.__profiled_steps.current = node_profile
+        start = time.perf_counter()
+        try:
+            yield results
+        finally:
+            self.__profiled_steps.current = None
+        node_profile.total_time = time.perf_counter() - start
+        node_profile.start = start - self.__profile_start
+        if self.__trace_memory:
+            node_profile.memory_delta = max(tracemalloc.get_traced_memory()[1] - memory_before, 0)
+        if not results:
+            return
+
+        result_event_ids = self.__get_event_ids(results[0])
+        node_profile.rows_out = len(result_event_ids)
+        if parent_event_ids:
+            parent_event_ids_set = np.unique(np.concatenate(parent_event_ids))
+            node_profile.rows_deleted = int((~np.isin(parent_event_ids_set, result_event_ids)).sum())
+        combine_profile._add(node_profile)
+
+    @contextmanager
+    def __measure(self, phase: Literal["apply_time", "join_time", "index_time"]) -> Iterator[None]:
+        node_profile: Optional[NodeProfile] = getattr(self.__profiled_steps, "current", None)
+        if node_profile is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(node_profile, phase, getattr(node_profile, phase) + time.perf_counter() - start)
+
+    @staticmethod
+    def __get_event_ids(eventstream: EventstreamType) -> np.ndarray:
+        event_id_col = eventstream.schema.event_id
+        # the eventstream is changed by the step, so the identifiers are copied
+        return eventstream.to_dataframe(columns=[event_id_col], decode=False)[event_id_col].to_numpy(copy=True)
+
+    def _get_fingerprint(self, node: Node, referenced: List[Any]) -> str:
+        """
+        Return a hash of the node, its data processor parameters and its ancestors.
+        Parameters that can't be serialized, e.g. functions, are identified by their ids
+        and are added to ``referenced``. The source events are identified by their id and their version,
+        so any change of the events in place gives another fingerprint.
+        """
 
-        return self._combine_merge_node(node)
+        def get_reference(obj: Any) -> str:
+            referenced.append(obj)
+            return f"{type(obj).__name__}:{id(obj)}"
+
+        data: List[Any] = [node.pk]
+        if isinstance(node, SourceNode):
+            data += [get_reference(node.events), node.events._version]
+        elif isinstance(node, EventsNode):
+            # functions with the same source code, e.g. closures made by the same factory, differ by their ids
+            raw_params = _get_raw_params(node.processor)
+            data += [raw_params, self._get_fingerprint(self._get_events_node_parent(node), referenced)]
+        else:
+            data += [self._get_fingerprint(parent, referenced) for parent in self._get_merge_node_parents(node)]
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=get_reference).encode()).hexdigest()
+
+    def _get_persisted_key(self, node: Node) -> Optional[str]:
+        """
+        Return a hash of the source events and the data processor parameters on the path to the node
+        that is the same in any session, so the node result saved to ``cache_policy.directory`` is found
+        after a kernel restart. Return ``None`` if the results are not saved or a parameter
+        can't be compared across sessions.
+        """
+        if self.cache_policy.directory is None:
+            return None
+
+        parent_keys: List[Optional[str]] = []
+        if isinstance(node, SourceNode):
+            data: List[Any] = [self.__get_source_hash()]
+        elif isinstance(node, EventsNode):
+            parent_keys = [self._get_persisted_key(self._get_events_node_parent(node))]
+            data = [_get_raw_params(node.processor), parent_keys]
+        else:
+            parent_keys = [self._get_persisted_key(parent) for parent in self._get_merge_node_parents(node)]
+            data = ["merge", parent_keys]
+        if None in parent_keys:
+            return None
+        try:
+            dumped = json.dumps(data, sort_keys=True, default=_get_persisted_param)
+        # a function may reference itself or an empty closure cell
+        except (TypeError, ValueError, OSError, RecursionError):
+            return None
+        return hashlib.sha256(dumped.encode()).hexdigest()
+
+    def __get_source_hash(self) -> str:
+        events = self.root.events
+        events_version = (id(events), events._version)
+        if self.__source_hash is None or self.__source_hash[0] != events_version:
+            self.__source_hash = (events_version, events._get_content_hash())
+            # the events created in this session must not get the identifiers of the saved events
+            if os.path.exists(state_path := self.__get_state_path()):
+                with open(state_path) as file:
+                    events._event_id_allocator.advance(json.load(file)["next_offset"])
+        return self.__source_hash[1]
+
+    def __get_state_path(self) -> str:
+        return os.path.join(cast(str, self.cache_policy.directory), f"{self.__get_source_hash()[:16]}.json")
+
+    def __get_result_path(self, key: str) -> str:
+        name = f"{self.__get_source_hash()[:16]}-{key[:32]}{SHARED_FRAME_SUFFIX}"
+        return os.path.join(cast(str, self.cache_policy.directory), name)
+
+    def __load_result(self, key: str) -> Optional[EventstreamType]:
+        path = self.__get_result_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            eventstream = self.root.events.open_mmap(path)
+        # the result may be removed by another graph keeping its directory budget
+        except (ValueError, FileNotFoundError):
+            return None
+        with suppress(FileNotFoundError):
+            os.utime(path)
+        # the source events of another session had another lineage
+        eventstream._rebase_event_ids(self.root.events)
+        return eventstream
+
+    def __save_result(self, key: str, result: EventstreamType) -> None:
+        os.makedirs(cast(str, self.cache_policy.directory), exist_ok=True)
+        # the files are written under temporary names, so an interrupted write never leaves a broken file
+        path = self.__get_result_path(key)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        result.to_mmap(temp_path)
+        if os.path.getsize(temp_path) > self.cache_policy.directory_max_bytes:
+            os.remove(temp_path)
+            return
+        os.replace(temp_path, path)
+        self.__evict_saved_results()
+
+        state_path = self.__get_state_path()
+        temp_path = f"{state_path}.{uuid.uuid4().hex}.tmp"
+        # the saved offset must not go back if several branches are saved at once
+        with self.__cache_lock:
+            with open(temp_path, "w") as file:
+                json.dump({"next_offset": self.root.events._event_id_allocator.next_offset}, file)
+            os.replace(temp_path, state_path)
+
+    def __evict_saved_results(self) -> None:
+        # the modification time of a loaded result is updated, so the least recently used results are removed first
+        directory = cast(str, self.cache_policy.directory)
+        saved_results = []
+        for name in os.listdir(directory):
+            if not name.endswith(SHARED_FRAME_SUFFIX):
+                continue
+            try:
+                stat = os.stat(path := os.path.join(directory, name))
+            # another graph may remove the result at the same time
+            except FileNotFoundError:
+                continue
+            saved_results.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in saved_results)
+        for _, size, path in sorted(saved_results):
+            if total_size <= self.cache_policy.directory_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def __cache_result(self, node: Node, fingerprint: str, referenced: List[Any], result: EventstreamType) -> None:
+        nbytes = result._get_memory_usage()
+        if nbytes > self.cache_policy.max_bytes:
+            with self.__cache_lock:
+                self.__cache.pop(node.pk, None)
+            return
+
+        # the result is changed in place by the children, so a copy is kept
+        cached_result = _CachedResult(
+            fingerprint=fingerprint, eventstream=result.copy(), nbytes=nbytes, referenced=referenced
+        )
+        with self.__cache_lock:
+            self.__cache.pop(node.pk, None)
+            self.__cache[node.pk] = cached_result
+            while sum(cached.nbytes for cached in self.__cache.values()) > self.cache_policy.max_bytes:
+                self.__cache.popitem(last=False)
+
+    def __invalidate_cache(self) -> None:
+        with self.__cache_lock:
+            self.__invalidate_cached_nodes()
+
+    def __invalidate_cached_nodes(self) -> None:
+        for pk in list(self.__cache):
+            node = self._find_node(pk)
+            try:
+                is_valid = node is not None and self._get_fingerprint(node, []) == self.__cache[pk].fingerprint
+            except ValueError:
+                is_valid = False
+            if not is_valid:
+                del self.__cache[pk]
 
     def _combine_events_node(self, node: EventsNode) -> EventstreamType:
-        parent = self._get_events_node_parent(node)
+        chain = self._get_fused_chain(node)
+        parent = self._get_events_node_parent(chain[0])
         parent_events = self.combine(parent)
-        events = node.processor.apply(parent_events)
-        parent_events._join_eventstream(events)
+        with self.__profile_step(node, self.__get_step_name(cast(List[Node], chain)), [parent_events]) as profiled:
+            if len(chain) > 1:
+                self._apply_fused([chain_node.processor for chain_node in chain], parent_events)
+                self._compact(parent_events)
+            elif self.parallel_policy.is_triggered(node.processor, parent_events):
+                self._apply_parallel(node.processor, parent_events)
+                self._compact(parent_events)
+            else:
+                with self.__measure("apply_time"):
+                    events = node.processor.apply(parent_events)
+                with self.__measure("join_time"):
+                    parent_events._join_eventstream(events, index=False)
+                with self.__measure("index_time"):
+                    parent_events.index_events()
+                self._compact(parent_events)
+            profiled.append(parent_events)
         return parent_events
 
+    def _get_fused_chain(self, node: EventsNode) -> List[EventsNode]:
+        """
+        Return the chain of nodes ending with ``node`` that is calculated as a single step.
+        See :py:class:`.FusionPolicy`.
+        """
+        chain = [node]
+        if not self.fusion_policy.enabled or not node.processor.is_fusable:
+            return chain
+
+        changes_event_types = node.processor.changes_event_types
+        while isinstance(parent := self._get_events_node_parent(chain[0]), EventsNode):
+            processor = parent.processor
+            if not processor.is_fusable or (processor.changes_event_types and changes_event_types):
+                break
+            if self._ngraph.out_degree(parent) > 1 or self.__is_cached(parent):
+                break
+            changes_event_types |= processor.changes_event_types
+            chain.insert(0, parent)
+        return chain
+
+    def __is_cached(self, node: Node) -> bool:
+        if not self.cache_policy.enabled:
+            return False
+        with self.__cache_lock:
+            cached = self.__cache.get(node.pk)
+        if cached is not None and cached.fingerprint == self._get_fingerprint(node, []):
+            return True
+        persisted_key = self._get_persisted_key(node)
+        return persisted_key is not None and os.path.exists(self.__get_result_path(persisted_key))
+
+    def _apply_fused(self, processors: List[DataProcessor], eventstream: EventstreamType) -> None:
+        # the eventstream module imports the preprocessing graph, so it is imported here
+        from retentioneering.eventstream import Eventstream
+
+        schema = eventstream.schema
+        with self.__measure("apply_time"):
+            parent_events = eventstream.to_dataframe()
+            events = parent_events
+            for processor in processors:
+                events = processor._apply_to_events(events, schema)
+                if processor.changes_event_types:
+                    # the next data processors get the events in the order they would have in the eventstream
+                    events = events.take(self.__get_events_order(events, eventstream))
+
+            # the fused eventstream replaces the changed events and deletes the missing ones with a single join
+            deleted_events = parent_events[~parent_events[schema.event_id].isin(events[schema.event_id])]
+            events = pd.concat([events, deleted_events])
+            events["ref"] = events[schema.event_id]
+            fused = Eventstream(
+                raw_data_schema=schema.to_raw_data_schema(),
+                raw_data=events,
+                relations=[{"raw_col": "ref", "eventstream": eventstream}],
+            )
+            if not deleted_events.empty:
+                fused._soft_delete(events=deleted_events)
+        with self.__measure("join_time"):
+            eventstream._join_eventstream(fused, index=False)
+        with self.__measure("index_time"):
+            eventstream.index_events()
+
+    @staticmethod
+    def __get_events_order(events: pd.DataFrame, eventstream: EventstreamType) -> np.ndarray:
+        schema = eventstream.schema
+        priorities: dict[Optional[str], int] = {}
+        for priority, event_type in enumerate(eventstream.index_order):
+            priorities.setdefault(event_type, priority)
+        event_priorities = events[schema.event_type].map(priorities).fillna(len(eventstream.index_order)).to_numpy()
+        # lexsort is stable, so the events with the same timestamp and priority keep their order
+        return np.lexsort((event_priorities, events[schema.event_timestamp].to_numpy()))
+
+    def _apply_parallel(self, processor: DataProcessor, eventstream: EventstreamType) -> None:
+        n_jobs = self.parallel_policy.get_n_jobs()
+        # the workers apply the data processor and join its result, the partitions are merged and indexed at once
+        with self.__measure("apply_time"), eventstream.to_shared_memory() as shared:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as executor:
+                futures = [
+                    executor.submit(_combine_user_partition, processor, shared, n_jobs, partition)
+                    for partition in range(n_jobs)
+                ]
+
+        # the pool has waited for all the workers, so the results are released even if some of them have failed
+        results = [future.result() for future in futures if future.exception() is None]
+        partitions = [result for result in results if result is not None]
+        try:
+            for future in futures:
+                future.result()
+            with self.__measure("join_time"):
+                eventstream._merge_user_partitions(partitions)
+        finally:
+            for partition in partitions:
+                partition.unlink()
+
     def _combine_merge_node(self, node: MergeNode) -> EventstreamType:
         parents = self._get_merge_node_parents(node)
-        curr_eventstream: Optional[EventstreamType] = None
-
-        for parent_node in parents:
-            if curr_eventstream is None:
-                curr_eventstream = self.combine(parent_node)
-            else:
-                new_eventstream = self.combine(parent_node)
-                curr_eventstream.append_eventstream(new_eventstream)
-
+        branch_jobs = min(self.parallel_policy.get_branch_jobs(), len(parents))
+        if branch_jobs > 1:
+            # the pool waits for all the branches, so they are united only after all of them are calculated
+            with ThreadPoolExecutor(max_workers=branch_jobs) as executor:
+                eventstreams = list(executor.map(self.combine, parents))
+        else:
+            eventstreams = [self.combine(parent_node) for parent_node in parents]
+
+        curr_eventstream, new_eventstreams = eventstreams[0], eventstreams[1:]
+        with self.__profile_step(node, self.__get_step_name([node]), eventstreams) as profiled:
+            if new_eventstreams:
+                # union indexes the united events itself
+                with self.__measure("join_time"):
+                    curr_eventstream.union(new_eventstreams)
+            self._compact(curr_eventstream)
+            profiled.append(curr_eventstream)
         node.events = curr_eventstream
 
-        return cast(EventstreamType, curr_eventstream)
+        return curr_eventstream
+
+    def _compact(self, eventstream: EventstreamType) -> None:
+        if self.compaction_policy.is_triggered(eventstream):
+            eventstream.compact()
 
     def get_parents(self, node: Node) -> List[Node]:
         """
@@ -214,7 +971,7 @@ class PreprocessingGraph:
             if node not in self._ngraph.nodes:
                 raise ValueError("node not found!")
 
-    def display(self, width: int = 960, height: int = 600) -> DisplayHandle:
+    def display(self, width: int = 960, height: int = 600, profile: bool = False) -> DisplayHandle:
         """
         Show constructed ``PreprocessingGraph``.
 
@@ -224,11 +981,15 @@ class PreprocessingGraph:
             Width of plot in pixels.
         height : int, default 600
             Height of plot in pixels.
+        profile : bool, default False
+            If ``True`` - the calculations started in the widget are profiled,
+            and the recorded numbers are shown on the nodes. See ``profile`` parameter of :py:meth:`combine`.
 
         Returns
         -------
             Rendered preprocessing graph.
         """
+        self.__profile_widget = profile
         if not self.__server_manager:
             self.__server_manager = ServerManager()
 
@@ -266,11 +1027,18 @@ class PreprocessingGraph:
         graph = self._ngraph
         data = {
             "directed": graph.is_directed(),
-            "nodes": [n.export() for n in graph],
+            "nodes": [self.__export_node(n) for n in graph],
             link: [{source: u.pk, target: v.pk} for u, v, d in graph.edges(data=True)],
         }
         return data
 
+    def __export_node(self, node: Node) -> dict:
+        data = node.export()
+        # the numbers of the last profiled combine are shown on the nodes of the widget
+        if self.combine_profile is not None and (node_profile := self.combine_profile.get(node.pk)) is not None:
+            data["profile"] = asdict(node_profile)
+        return data
+
     def _export_to_json(self) -> str:
         data = self.export(payload=dict())
         return json.dumps(data)
@@ -279,7 +1047,7 @@ class PreprocessingGraph:
         node = self._find_node(payload["node_pk"])
         if not node:
             raise ServerErrorWithResponse(message="node not found!", type="unexpected_error")
-        self.combine_result = self.combine(node)
+        self.combine_result = self.combine(node, profile=payload.get("profile", self.__profile_widget))
 
     def _set_graph_handler(self, payload: Payload) -> dict:
         current_graph = self._ngraph
@@ -291,6 +1059,7 @@ class PreprocessingGraph:
 
         try:
             self._set_graph(payload=payload)
+            self.__invalidate_cache()
             return self.export({})
         except ServerErrorWithResponse as err:
             restore_graph()
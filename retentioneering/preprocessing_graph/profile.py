@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, fields
+from typing import Any, List, Optional
+
+import pandas as pd
+
+_MICROSECONDS = 10**6
+
+
+@dataclass
+class NodeProfile:
+    """
+    Calculation of a ``PreprocessingGraph`` node recorded by ``combine(node, profile=True)``.
+
+    Parameters
+    ----------
+    node_pk : str
+        ``pk`` of the node.
+    step : str
+        The calculation step of the node as shown by :py:meth:`.PreprocessingGraph.explain`.
+    status : {"calculated", "kept", "loaded"}
+
+        - ``calculated`` - the step has been calculated;
+        - ``kept`` - the result kept in memory has been reused;
+        - ``loaded`` - the result has been loaded from ``cache_policy.directory``.
+
+    start : float
+        Start of the step in seconds since the start of ``combine``.
+    apply_time : float
+        Seconds spent by the data processors.
+    join_time : float
+        Seconds spent joining the result to the parent eventstream or uniting the parents of a ``MergeNode``.
+    index_time : float
+        Seconds spent sorting and indexing the joined events.
+    total_time : float
+        Seconds spent by the whole step, including the phases above, compaction and reusing a kept result.
+        The calculation of the parents is not included.
+    memory_delta : int, optional
+        Peak of the memory allocated by the step, in bytes. ``None`` if the memory peaks of the steps
+        can't be separated: the branches of merge nodes are calculated in several threads or on Python 3.8.
+    rows_in : int
+        Number of the not deleted events of the parent eventstreams.
+    rows_out : int
+        Number of the not deleted events of the result.
+    rows_deleted : int
+        Number of the parent events missing in the result.
+    thread_id : int
+        Identifier of the thread calculating the step.
+
+    """
+
+    node_pk: str
+    step: str
+    status: str
+    start: float = 0.0
+    apply_time: float = 0.0
+    join_time: float = 0.0
+    index_time: float = 0.0
+    total_time: float = 0.0
+    memory_delta: Optional[int] = None
+    rows_in: int = 0
+    rows_out: int = 0
+    rows_deleted: int = 0
+    thread_id: int = 0
+
+
+class CombineProfile:
+    """
+    Per-node report of a ``PreprocessingGraph.combine`` call made with ``profile=True``.
+    The steps are listed in the order they have been finished.
+
+    See Also
+    --------
+    .PreprocessingGraph.combine : Start PreprocessingGraph recalculation.
+    """
+
+    nodes: List[NodeProfile]
+    __lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.nodes = []
+        # the branches of a merge node may be calculated in several threads
+        self.__lock = threading.Lock()
+
+    def _add(self, node_profile: NodeProfile) -> None:
+        with self.__lock:
+            self.nodes.append(node_profile)
+
+    def get(self, node_pk: str) -> Optional[NodeProfile]:
+        """
+        Return the profile of a node.
+
+        Parameters
+        ----------
+        node_pk : str
+            ``pk`` of the node.
+
+        Returns
+        -------
+        NodeProfile, optional
+            ``None`` if the node hasn't been calculated by ``combine``.
+        """
+        for node_profile in self.nodes:
+            if node_profile.node_pk == node_pk:
+                return node_profile
+        return None
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Show the profile as a dataframe with a row per node.
+        The columns are the fields of :py:class:`NodeProfile`.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        columns = [field.name for field in fields(NodeProfile)]
+        return pd.DataFrame([asdict(node_profile) for node_profile in self.nodes], columns=columns)
+
+    def to_chrome_trace(self, path: str) -> None:
+        """
+        Save the profile as a JSON file of the Chrome trace event format.
+        It can be opened with ``chrome://tracing`` or Perfetto UI. Each node is shown as a slice
+        of its thread containing the ``apply``, ``join`` and ``index`` phases.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+
+        Returns
+        -------
+        None
+        """
+        pid = os.getpid()
+        trace_events: List[dict[str, Any]] = []
+        for node_profile in self.nodes:
+            args = {
+                "node_pk": node_profile.node_pk,
+                "status": node_profile.status,
+                "memory_delta": node_profile.memory_delta,
+                "rows_in": node_profile.rows_in,
+                "rows_out": node_profile.rows_out,
+                "rows_deleted": node_profile.rows_deleted,
+            }
+            trace_events.append(
+                self.__get_trace_event(
+                    node_profile.step, "node", node_profile.start, node_profile.total_time, pid, node_profile, args
+                )
+            )
+            # the phases follow each other from the start of the step
+            phase_start = node_profile.start
+            for phase, duration in [
+                ("apply", node_profile.apply_time),
+                ("join", node_profile.join_time),
+                ("index", node_profile.index_time),
+            ]:
+                if duration > 0:
+                    trace_events.append(
+                        self.__get_trace_event(phase, "phase", phase_start, duration, pid, node_profile)
+                    )
+                phase_start += duration
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
+
+    @staticmethod
+    def __get_trace_event(
+        name: str,
+        category: str,
+        start: float,
+        duration: float,
+        pid: int,
+        node_profile: NodeProfile,
+        args: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        trace_event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start * _MICROSECONDS,
+            "dur": duration * _MICROSECONDS,
+            "pid": pid,
+            "tid": node_profile.thread_id,
+        }
+        if args is not None:
+            trace_event["args"] = args
+        return trace_event
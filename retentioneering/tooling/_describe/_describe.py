@@ -28,10 +28,12 @@ class _Describe:
         ]
         self.time_events_stats = [["path_length_time", "path_length_steps"], ["mean", "std", "median", "min", "max"]]
 
-        self.df = self.__eventstream.to_dataframe(copy=True)
+        columns = [self.user_col, self.event_col, self.time_col, self.type_col]
         self.has_session_col: bool = False
-        if self.session_col in self.df.columns:
+        if self.session_col in self.__eventstream.schema.get_cols():
             self.has_session_col = True
+            columns.append(self.session_col)
+        self.df = self.__eventstream.to_dataframe(columns=columns)
 
         if raw_events_only:
             self.df = self.df[self.df[self.type_col].isin(["raw"])]
@@ -26,7 +26,10 @@ class _DescribeEvents:
         self.type_col = self.__eventstream.schema.event_type
         self.event_list = event_list
         self.raw_events_only = raw_events_only
-        self.df = self.__eventstream.to_dataframe(copy=True)
+        columns = [self.__eventstream.schema.event_id, self.user_col, self.event_col, self.time_col, self.type_col]
+        if self.session_col in self.__eventstream.schema.get_cols():
+            columns.append(self.session_col)
+        self.df = self.__eventstream.to_dataframe(columns=columns)
         self.has_session_col: bool = False
         if self.raw_events_only:
             self.df = self.df[self.df[self.type_col].isin(["raw"])]
@@ -17,7 +17,16 @@ class _TransitionMatrix:
             time_col=eventstream.schema.event_timestamp,
             event_col=eventstream.schema.event_name,
         )
-        self.__nodelist.calculate_nodelist(self.__eventstream.to_dataframe())
+        self.__nodelist.calculate_nodelist(
+            self.__eventstream.to_dataframe(
+                columns=[
+                    eventstream.schema.event_name,
+                    eventstream.schema.event_timestamp,
+                    *eventstream.schema.custom_cols,
+                ],
+                decode=False,
+            )
+        )
         self.__edgelist = Edgelist(eventstream=eventstream)
 
     def _values(self, weight_col: str | None = None, norm_type: NormType = None) -> pd.DataFrame:
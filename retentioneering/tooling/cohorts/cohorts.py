@@ -200,7 +200,7 @@ class Cohorts:
         See :doc:`Cohorts user guide</user_guides/cohorts>` for the details.
 
         """
-        data = self.__eventstream.to_dataframe()
+        data = self.__eventstream.to_dataframe(columns=[self.user_col, self.time_col])
         self.average = average
         self.cohort_start_unit = cohort_start_unit
         self.cohort_period, self.cohort_period_unit = cohort_period
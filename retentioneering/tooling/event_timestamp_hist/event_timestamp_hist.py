@@ -137,10 +137,11 @@ class EventTimestampHist:
         self.raw_events_only = raw_events_only
         self.bins = bins
 
-        data = self.__eventstream.to_dataframe(copy=True)
+        type_col = self.__eventstream.schema.event_type
+        data = self.__eventstream.to_dataframe(columns=[self.event_col, self.time_col, type_col])
 
         if self.raw_events_only:
-            data = data[data["event_type"].isin(["raw"])]
+            data = data[data[type_col].isin(["raw"])]
         if self.event_list:
             data = data[data[self.event_col].isin(self.event_list)]
 
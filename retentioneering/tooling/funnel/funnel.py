@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Collection
+from collections.abc import Collection, Iterable
 from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from pandas.core.common import flatten
@@ -60,14 +61,19 @@ class Funnel:
 
     def __validate_input(
         self,
+        eventstream: EventstreamType,
         stages: list[str],
         stage_names: list[str] | None = None,
         funnel_type: FunnelTypes = "closed",
         segments: Collection[Collection[int]] | None = None,
         segment_names: list[str] | None = None,
     ) -> tuple[pd.DataFrame, list[str], list[str], FunnelTypes, Collection[Collection[int]], list[str]]:
-        data = self.__eventstream.to_dataframe(copy=True)
+        data = eventstream.to_dataframe(columns=[self.user_col, self.event_col, self.time_col], decode=False)
         data = data[data[self.event_col].isin([i for i in flatten(stages)])]  # type: ignore
+        # the stages are matched by the category codes, so only the events of the stages are decoded
+        data = data.assign(
+            **{col: np.asarray(data[col]) for col in data.columns if isinstance(data[col].dtype, pd.CategoricalDtype)}
+        )
 
         if stages and stage_names and len(stages) != len(stage_names):
             raise ValueError("stages and stage_names must be the same length!")
@@ -256,6 +262,43 @@ class Funnel:
             If ``None`` and ``segment_col`` is given - all values from ``segment_col`` will be used.
         """
 
+        self.__res_dict = self.__fit_eventstream(
+            self.__eventstream, stages, stage_names, funnel_type, segments, segment_names
+        )
+
+    def _fit_partitions(
+        self,
+        eventstreams: Iterable[EventstreamType],
+        stages: list[str],
+        stage_names: list[str] | None = None,
+        funnel_type: FunnelTypes = "closed",
+        segments: Collection[Collection[int]] | None = None,
+        segment_names: list[str] | None = None,
+    ) -> None:
+        """
+        Fit the funnel on user-disjoint eventstreams, e.g. the partitions of a ``PartitionedEventstream``.
+        Each eventstream is loaded once. Since no user is shared by two eventstreams,
+        the numbers of users at each stage are summed.
+        """
+        res_dict: dict[str, dict] = {}
+        for eventstream in eventstreams:
+            partial = self.__fit_eventstream(eventstream, stages, stage_names, funnel_type, segments, segment_names)
+            for name, stage_values in partial.items():
+                if name in res_dict:
+                    values = [prev + curr for prev, curr in zip(res_dict[name]["values"], stage_values["values"])]
+                    stage_values = {**stage_values, "values": values}
+                res_dict[name] = stage_values
+        self.__res_dict = res_dict
+
+    def __fit_eventstream(
+        self,
+        eventstream: EventstreamType,
+        stages: list[str],
+        stage_names: list[str] | None,
+        funnel_type: FunnelTypes,
+        segments: Collection[Collection[int]] | None,
+        segment_names: list[str] | None,
+    ) -> dict[str, dict]:
         (
             data,
             self.stages,
@@ -263,10 +306,10 @@ class Funnel:
             self.funnel_type,
             self.segments,
             self.segment_names,
-        ) = self.__validate_input(stages, stage_names, funnel_type, segments, segment_names)
+        ) = self.__validate_input(eventstream, stages, stage_names, funnel_type, segments, segment_names)
 
         if self.funnel_type in ["closed", "hybrid"]:
-            self.__res_dict = self._prepare_data_for_closed_and_hybrid_funnel(
+            return self._prepare_data_for_closed_and_hybrid_funnel(
                 data=data,
                 stages=self.stages,
                 stage_names=self.stage_names,
@@ -274,14 +317,13 @@ class Funnel:
                 segment_names=self.segment_names,
             )
 
-        elif self.funnel_type == "open":
-            self.__res_dict = self._prepare_data_for_open_funnel(
-                data=data,
-                stages=self.stages,
-                segments=self.segments,
-                segment_names=self.segment_names,
-                stage_names=self.stage_names,
-            )
+        return self._prepare_data_for_open_funnel(
+            data=data,
+            stages=self.stages,
+            segments=self.segments,
+            segment_names=self.segment_names,
+            stage_names=self.stage_names,
+        )
 
     @track(  # type: ignore
         tracking_info={"event_name": "plot"},
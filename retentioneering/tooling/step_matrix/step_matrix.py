@@ -3,7 +3,7 @@ from __future__ import annotations
 import itertools
 from copy import deepcopy
 from dataclasses import dataclass
-from typing import Literal, Tuple
+from typing import Iterable, Literal, Tuple
 
 import matplotlib
 import pandas as pd
@@ -185,7 +185,7 @@ class StepMatrix(EndedEventsMixin):
         if isinstance(self.targets, list):
             for t in self.targets:
                 if isinstance(t, list):
-                    targets.append(t)
+                    targets.append(list(t))
                 else:
                     targets.append([t])
         else:
@@ -446,20 +446,9 @@ class StepMatrix(EndedEventsMixin):
         (0 for a differential step matrix).
 
         """
-        self.max_steps = max_steps
-        self.precision = precision
-        self.targets = targets
-        self.accumulated = accumulated
-        self.sorting = sorting
-        self.threshold = threshold
-        self.centered = CenteredParams(**centered) if centered else None
-        self.groups = groups
-        self.weight_col = weight_col or self.__eventstream.schema.user_id
-        weight_col = self.weight_col or self.user_col
-        data = self.__eventstream.to_dataframe()
-
-        data = self._add_ended_events(data=data, schema=self.__eventstream.schema, weight_col=self.weight_col)
-        data["event_rank"] = data.groupby(weight_col).cumcount() + 1
+        self.__set_params(max_steps, weight_col, precision, targets, accumulated, sorting, threshold, centered, groups)
+        weight_col = self.weight_col
+        data = self.__get_data(self.__eventstream)
 
         # BY HERE WE NEED TO OBTAIN FINAL DIFF piv and piv_targets before sorting, thresholding and plotting:
 
@@ -477,7 +466,7 @@ class StepMatrix(EndedEventsMixin):
             piv_pos, piv_neg = self._align_index(piv_pos, piv_neg)
             piv = piv_pos - piv_neg
 
-            if self.targets and piv_targets_pos and piv_targets_neg:
+            if self.targets and piv_targets_pos is not None and piv_targets_neg is not None:
                 piv_targets_pos, piv_targets_neg = self._align_index(piv_targets_pos, piv_targets_neg)
                 piv_targets = piv_targets_pos - piv_targets_neg
             else:
@@ -486,6 +475,120 @@ class StepMatrix(EndedEventsMixin):
         else:
             piv, piv_targets, fraction_title, targets_plot = self._step_matrix_values(data=data)
 
+        self.__set_result(piv, piv_targets, fraction_title, targets_plot)
+
+    def _fit_partitions(
+        self,
+        eventstreams: Iterable[EventstreamType],
+        max_steps: int = 20,
+        weight_col: str | None = None,
+        precision: int = 2,
+        targets: list[str] | str | None = None,
+        accumulated: Literal["both", "only"] | None = None,
+        sorting: list | None = None,
+        threshold: float = 0,
+        centered: dict | None = None,
+        groups: Tuple[list, list] | None = None,
+    ) -> None:
+        """
+        Fit the step matrix on user-disjoint eventstreams, e.g. the partitions of a ``PartitionedEventstream``.
+        Each eventstream is loaded once. Since no path is shared by two eventstreams, the step matrix
+        is the average of their step matrices weighted by the number of paths.
+        ``centered`` step matrix is not supported.
+        """
+        if centered:
+            raise ValueError("centered step matrix cannot be calculated by partitions!")
+        self.__set_params(max_steps, weight_col, precision, targets, accumulated, sorting, threshold, centered, groups)
+
+        n_segments = 2 if self.groups else 1
+        pivs: list[pd.DataFrame | None] = [None] * n_segments
+        pivs_targets: list[pd.DataFrame | None] = [None] * n_segments
+        paths_counts = [0] * n_segments
+        targets_plot = None
+        for eventstream in eventstreams:
+            data = self.__get_data(eventstream)
+            segments = [data[data[self.weight_col].isin(group)] for group in self.groups] if self.groups else [data]
+            for i, segment in enumerate(segments):
+                if len(segment) == 0:
+                    continue
+                paths_count = segment[self.weight_col].nunique()
+                piv, piv_targets, _, targets_plot = self._step_matrix_values(data=segment)
+                # weighted sums of the partial matrices are summed, and the sum is divided by the paths count
+                pivs[i] = self.__add_weighted(pivs[i], piv, paths_count)
+                pivs_targets[i] = self.__add_weighted(pivs_targets[i], piv_targets, paths_count)
+                paths_counts[i] += paths_count
+            del data, segments
+
+        if paths_counts[0] == 0:
+            error = "Users from positive group are not present in dataset" if self.groups else "Eventstream is empty"
+            raise IndexError(error)
+        if self.groups and paths_counts[1] == 0:
+            raise IndexError("Users from negative group are not present in dataset")
+
+        pivs = [piv / paths_count for piv, paths_count in zip(pivs, paths_counts)]  # type: ignore
+        pivs_targets = [
+            piv_targets / paths_count if piv_targets is not None else None
+            for piv_targets, paths_count in zip(pivs_targets, paths_counts)
+        ]
+        piv, piv_targets = pivs[0], pivs_targets[0]
+        if self.groups:
+            piv_pos, piv_neg = self._align_index(pivs[0], pivs[1])  # type: ignore
+            piv = piv_pos - piv_neg
+            if pivs_targets[0] is not None and pivs_targets[1] is not None:
+                piv_targets_pos, piv_targets_neg = self._align_index(pivs_targets[0], pivs_targets[1])
+                piv_targets = piv_targets_pos - piv_targets_neg
+
+        self.__set_result(piv, piv_targets, "", targets_plot)  # type: ignore
+
+    @staticmethod
+    def __add_weighted(total: pd.DataFrame | None, piv: pd.DataFrame | None, weight: int) -> pd.DataFrame | None:
+        if piv is None:
+            return total
+        if total is None:
+            return piv * weight
+        # keep the rows order of the first matrix, so the targets are not reordered
+        index = total.index.append(piv.index.difference(total.index))
+        return total.add(piv * weight, fill_value=0).loc[index]
+
+    def __set_params(
+        self,
+        max_steps: int,
+        weight_col: str | None,
+        precision: int,
+        targets: list[str] | str | None,
+        accumulated: Literal["both", "only"] | None,
+        sorting: list | None,
+        threshold: float,
+        centered: dict | None,
+        groups: Tuple[list, list] | None,
+    ) -> None:
+        self.max_steps = max_steps
+        self.precision = precision
+        self.targets = targets
+        self.accumulated = accumulated
+        self.sorting = sorting
+        self.threshold = threshold
+        self.centered = CenteredParams(**centered) if centered else None
+        self.groups = groups
+        self.weight_col = weight_col or self.__eventstream.schema.user_id
+
+    def __get_data(self, eventstream: EventstreamType) -> pd.DataFrame:
+        columns = [self.user_col, self.event_col, self.time_col, self.event_index_col]
+        if self.weight_col not in columns:
+            columns.append(self.weight_col)
+        data = eventstream.to_dataframe(columns=columns)
+
+        data = self._add_ended_events(data=data, schema=eventstream.schema, weight_col=self.weight_col)
+        data["event_rank"] = data.groupby(self.weight_col).cumcount() + 1
+        return data
+
+    def __set_result(
+        self,
+        piv: pd.DataFrame,
+        piv_targets: pd.DataFrame | None,
+        fraction_title: str | None,
+        targets_plot: list[list[str]] | None,
+    ) -> None:
         threshold_index = "THRESHOLDED_"
 
         if self.threshold != 0:
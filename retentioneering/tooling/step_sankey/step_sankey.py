@@ -559,9 +559,9 @@ class StepSankey(EndedEventsMixin):
         ValueError
             If ``max_steps`` parameter is <= 1.
         """
-        data = self.__eventstream.to_dataframe(copy=True)[
-            [self.user_col, self.event_col, self.time_col, self.event_index_col]
-        ]
+        data = self.__eventstream.to_dataframe(
+            columns=[self.user_col, self.event_col, self.time_col, self.event_index_col]
+        )
         if max_steps <= 1:
             raise ValueError("max_steps parameter must be > 1!")
 
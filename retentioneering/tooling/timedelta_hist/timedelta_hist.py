@@ -257,7 +257,10 @@ class TimedeltaHist:
         self.timedelta_unit = timedelta_unit
         self.bins = bins
 
-        data = self.__eventstream.to_dataframe(copy=True)
+        columns = [self.user_col, self.event_col, self.time_col, self.type_col]
+        if self.weight_col not in columns:
+            columns.append(self.weight_col)
+        data = self.__eventstream.to_dataframe(columns=columns)
 
         if self.raw_events_only:
             data = data[data[self.type_col].isin(["raw"])]
@@ -140,6 +140,10 @@ class TransitionGraph:
                         weight_cols.append(col)
         return weight_cols
 
+    def _get_nodelist_data_cols(self) -> list[str]:
+        cols = [self.event_col, self.event_time_col]
+        return cols + [col for col in self.weight_cols if col not in cols]
+
     @property
     def weights(self) -> MutableMapping[str, str] | None:
         return self._weights
@@ -205,7 +209,7 @@ class TransitionGraph:
         # frontend can ask recalculate without grouping or renaming
         if len(rename_rules) > 0:
             eventstream = eventstream.rename(rules=rename_rules)  # type: ignore
-        renamed_df = eventstream.to_dataframe()
+        renamed_df = eventstream.to_dataframe(columns=self._get_nodelist_data_cols(), decode=False)
 
         # save norm type
         recalculated_nodelist = self.nodelist.calculate_nodelist(data=renamed_df)
@@ -873,7 +877,9 @@ class TransitionGraph:
             time_col=self.event_time_col,
             event_col=self.event_col,
         )
-        self.nodelist.calculate_nodelist(data=self.eventstream.to_dataframe())
+        self.nodelist.calculate_nodelist(
+            data=self.eventstream.to_dataframe(columns=self._get_nodelist_data_cols(), decode=False)
+        )
         self.edges_norm_type: NormType | None = edges_norm_type
         self.edgelist: Edgelist = Edgelist(eventstream=self.eventstream)
         self.edgelist.calculate_edgelist(
@@ -151,7 +151,12 @@ class UserLifetimeHist:
         self.timedelta_unit = timedelta_unit
         self.bins = bins
 
-        data = self.__eventstream.to_dataframe(copy=True).groupby(self.user_col)[self.time_col].agg(["min", "max"])
+        data = (
+            self.__eventstream.to_dataframe(columns=[self.user_col, self.time_col], decode=False)
+            .groupby(self.user_col, observed=True)[self.time_col]
+            .agg(["min", "max"])
+            .sort_index()
+        )
         data["time_passed"] = data["max"] - data["min"]
         values_to_plot = (data["time_passed"] / np.timedelta64(1, self.timedelta_unit)).reset_index(  # type: ignore
             drop=True
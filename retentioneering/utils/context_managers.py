@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import threading
 from types import TracebackType
 from typing import Optional, Type
 
 from .singleton import Singleton
 
 
-class SimpleLockContextManager(Singleton):
+# the state is kept per thread, so the calls tracked in concurrent threads don't lock each other
+class SimpleLockContextManager(Singleton, threading.local):
     is_locked: bool
     _event_name: str = ""
     _last_checked_event_name: str = ""
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from retentioneering.data_processors_lib import SampleUsers, SampleUsersParams
+from retentioneering.eventstream.schema import RawDataSchema
+from tests.data_processors_lib.common import ApplyTestBase, GraphTestBase
+
+
+class TestSampleUsers(ApplyTestBase):
+    _Processor = SampleUsers
+    _source_df = pd.DataFrame(
+        [
+            [user_id, event, "raw", f"2022-01-01 00:0{user_id % 10}:0{i}"]
+            for user_id in range(20)
+            for i, event in enumerate(["event1", "event2"])
+        ],
+        columns=["user_id", "event", "event_type", "timestamp"],
+    )
+    _raw_data_schema = RawDataSchema(
+        user_id="user_id",
+        event_name="event",
+        event_type="event_type",
+        event_timestamp="timestamp",
+    )
+
+    def test_sample_users_apply__deletes_whole_paths(self):
+        actual = self._apply(SampleUsersParams(user_sample_share=0.5, user_sample_seed=1))
+
+        assert actual["_deleted"].all()
+        assert (actual.groupby("user_id").size() == 2).all()
+        assert 0 < actual["user_id"].nunique() < 20
+
+    def test_sample_users_apply__edge_shares(self):
+        assert self._apply(SampleUsersParams(user_sample_share=1.0)).empty
+        assert self._apply(SampleUsersParams(user_sample_share=0.0))["user_id"].nunique() == 20
+
+    def test_sample_users_apply__invalid_share(self):
+        with pytest.raises(ValueError):
+            self._apply(SampleUsersParams(user_sample_share=1.5))
+
+
+class TestSampleUsersGraph(GraphTestBase):
+    _Processor = SampleUsers
+    _source_df = TestSampleUsers._source_df
+    _raw_data_schema = TestSampleUsers._raw_data_schema
+
+    def test_sample_users_graph__stable_across_subsets(self):
+        params = SampleUsersParams(user_sample_share=0.5, user_sample_seed=1)
+        actual = self._apply(params)
+        actual_subset = self._apply(params, source_df=self._source_df[self._source_df["user_id"] < 10])
+
+        assert set(actual_subset["user_id"]) == {user_id for user_id in actual["user_id"] if user_id < 10}
+        assert (actual.groupby("user_id").size() == 2).all()
+
+    def test_sample_users_graph__seed(self):
+        actual_1 = self._apply(SampleUsersParams(user_sample_share=0.5, user_sample_seed=1))
+        actual_2 = self._apply(SampleUsersParams(user_sample_share=0.5, user_sample_seed=2))
+
+        assert set(actual_1["user_id"]) != set(actual_2["user_id"])
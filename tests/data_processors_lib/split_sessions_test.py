@@ -295,6 +295,51 @@ class TestSplitSessionsHelper:
 
         assert res.compare(correct_result).shape == (0, 0)
 
+    def test_split_sesssion__tz_aware_timestamp(self):
+        source_df = pd.DataFrame(
+            [
+                [111, "event1", "2022-01-01 00:00:00"],
+                [111, "event2", "2022-01-01 00:01:00"],
+                [111, "event3", "2022-01-01 00:33:00"],
+                [222, "event1", "2022-01-01 00:30:00"],
+                [222, "event2", "2022-01-01 01:01:00"],
+            ],
+            columns=["user_id", "event", "timestamp"],
+        )
+        source_df["timestamp"] = pd.to_datetime(source_df["timestamp"]).dt.tz_localize("Europe/Berlin")
+
+        correct_result_columns = ["user_id", "event", "event_type", "timestamp", "session_id"]
+        correct_result = pd.DataFrame(
+            [
+                [111, "session_start", "session_start", "2022-01-01 00:00:00", "111_1"],
+                [111, "event1", "raw", "2022-01-01 00:00:00", "111_1"],
+                [111, "event2", "raw", "2022-01-01 00:01:00", "111_1"],
+                [111, "session_end", "session_end", "2022-01-01 00:01:00", "111_1"],
+                [111, "session_start", "session_start", "2022-01-01 00:33:00", "111_2"],
+                [111, "event3", "raw", "2022-01-01 00:33:00", "111_2"],
+                [111, "session_end", "session_end", "2022-01-01 00:33:00", "111_2"],
+                [222, "session_start", "session_start", "2022-01-01 00:30:00", "222_1"],
+                [222, "event1", "raw", "2022-01-01 00:30:00", "222_1"],
+                [222, "session_end", "session_end", "2022-01-01 00:30:00", "222_1"],
+                [222, "session_start", "session_start", "2022-01-01 01:01:00", "222_2"],
+                [222, "event2", "raw", "2022-01-01 01:01:00", "222_2"],
+                [222, "session_end", "session_end", "2022-01-01 01:01:00", "222_2"],
+            ],
+            columns=correct_result_columns,
+        )
+        correct_result["timestamp"] = pd.to_datetime(correct_result["timestamp"]).dt.tz_localize("Europe/Berlin")
+
+        stream = Eventstream(source_df)
+
+        res = (
+            stream.split_sessions(timeout=(30, "m"), session_col="session_id")
+            .to_dataframe()[correct_result_columns]
+            .sort_values("user_id", kind="stable")
+            .reset_index(drop=True)
+        )
+
+        assert res.compare(correct_result).shape == (0, 0)
+
     def test_params_model__incorrect_datetime_unit(self):
         with pytest.raises(ValidationError):
             source_df = pd.DataFrame(
@@ -134,3 +134,10 @@ class TestVerifyEdgelist:
         el = Edgelist(eventstream=stream)
         result = el.calculate_edgelist(weight_cols=["session_id"], norm_type="full")
         assert pd.testing.assert_frame_equal(result, correct, atol=0.001) is None
+
+    def test_edgelist__not_encoded(self, test_df: pd.DataFrame, el_user_node_corr: pd.DataFrame) -> None:
+        for encode_cols in [True, False]:
+            stream = Eventstream(test_df, encode_cols=encode_cols)
+            el = Edgelist(eventstream=stream)
+            result = el.calculate_edgelist(weight_cols=["user_id"], norm_type="node")
+            assert pd.testing.assert_frame_equal(result, el_user_node_corr, atol=0.001) is None
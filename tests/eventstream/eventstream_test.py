@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import gc
 import math
+import os
+import pickle
 import uuid
 
+import numpy as np
 import pandas as pd
 import pytest
 
+from retentioneering.eventstream.event_id import LINEAGE_ID_BITS, event_ids_to_uuid
 from retentioneering.eventstream.eventstream import DELETE_COL_NAME, Eventstream
 from retentioneering.eventstream.schema import EventstreamSchema, RawDataSchema
 from retentioneering.utils import shuffle_df
@@ -21,6 +26,27 @@ from tests.eventstream.fixtures.eventstream import (
 )
 
 
+def assert_same_events_in_new_lineage(
+    actual: pd.DataFrame, expected: pd.DataFrame, restored: Eventstream, saved: Eventstream
+) -> None:
+    # the restored events keep the offsets of their event_id in a new lineage
+    restored_allocator, saved_allocator = restored._event_id_allocator, saved._event_id_allocator
+    assert restored_allocator.lineage != saved_allocator.lineage
+    assert restored_allocator.next_offset == saved_allocator.next_offset
+    shift = (restored_allocator.lineage - saved_allocator.lineage) << LINEAGE_ID_BITS
+    pd.testing.assert_series_equal(actual["event_id"] - shift, expected["event_id"])
+    pd.testing.assert_frame_equal(actual.drop(columns="event_id"), expected.drop(columns="event_id"))
+
+
+def create_child_eventstream(source: Eventstream, child_df: pd.DataFrame) -> Eventstream:
+    # the ref column of child_df holds event_id of the replaced source events
+    return Eventstream(
+        raw_data_schema=RawDataSchema(event_type="event_type"),
+        raw_data=child_df,
+        relations=[{"eventstream": source, "raw_col": "ref"}],
+    )
+
+
 class TestEventstream:
     def test_create_eventstream(self, test_stream_1):
         df = test_stream_1.to_dataframe()
@@ -33,9 +59,129 @@ class TestEventstream:
         assert schema.event_timestamp in columns
         assert schema.user_id in columns
 
+        assert df[schema.event_id].dtype == "int64"
+        assert df[schema.event_id].is_unique
+
         for [_, event] in df.iterrows():
             assert event[schema.event_type] == "raw"
-            assert isinstance(event[schema.event_id], uuid.UUID)
+
+    def test_create_eventstream__encoded_cols(self, test_stream_1):
+        schema = test_stream_1.schema
+        encoded_cols = [schema.event_name, schema.event_type, schema.user_id]
+        df = test_stream_1.to_dataframe()
+        encoded_df = test_stream_1.to_dataframe(decode=False)
+
+        for col in encoded_cols:
+            assert isinstance(encoded_df[col].dtype, pd.CategoricalDtype)
+            assert not isinstance(df[col].dtype, pd.CategoricalDtype)
+            assert df[col].to_list() == encoded_df[col].to_list()
+
+    def test_create_eventstream__not_encoded_cols(self, test_data_1, test_schema_1):
+        es = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, encode_cols=False)
+        df = es.to_dataframe(decode=False)
+
+        assert es.copy().encode_cols is False
+        for col in [es.schema.event_name, es.schema.event_type, es.schema.user_id]:
+            assert not isinstance(df[col].dtype, pd.CategoricalDtype)
+
+    def test_create_eventstream__raw_cols(self, test_data_1, test_schema_1):
+        all_cols = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        listed_cols = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, raw_cols=["name"])
+        no_cols = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, raw_cols="none")
+
+        assert all_cols.raw_cols == "all"
+        assert all_cols._get_raw_cols() == ["raw_" + col for col in test_data_1.columns]
+        assert listed_cols._get_raw_cols() == ["raw_name"]
+        assert no_cols._get_raw_cols() == []
+        assert no_cols.copy().raw_cols == "none"
+        pd.testing.assert_frame_equal(
+            no_cols.to_dataframe().drop(columns="event_id"), all_cols.to_dataframe().drop(columns="event_id")
+        )
+
+        with pytest.raises(ValueError):
+            Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, raw_cols=["unknown"])
+
+    def test_create_eventstream__raw_cols_none_inherited(self, test_data_1, test_schema_1):
+        source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, raw_cols="none")
+        child = source.add_start_end_events()
+
+        assert child.raw_cols == "none"
+        assert child._get_raw_cols() == []
+        assert child.to_dataframe()[child.schema.event_name].to_list()[0] == "path_start"
+
+    def test_create_eventstream__raw_cols_reference(self):
+        df = pd.DataFrame(
+            [["1", "a", "2021-10-26 12:00", 1.0], ["1", "b", "2021-10-26 12:01", 2.0]],
+            columns=["user_id", "event", "timestamp", "price"],
+        )
+        referenced = Eventstream(raw_data=df, raw_cols="reference")
+        copied = Eventstream(raw_data=df)
+
+        # the sorted events keep the values of raw_data
+        prices = referenced.to_dataframe(columns=["raw_price"])["raw_price"].to_numpy()
+        assert np.shares_memory(prices, df["price"].to_numpy())
+        assert df.columns.to_list() == ["user_id", "event", "timestamp", "price"]
+        pd.testing.assert_frame_equal(
+            referenced.to_dataframe(raw_cols=True).drop(columns="event_id"),
+            copied.to_dataframe(raw_cols=True).drop(columns="event_id"),
+        )
+
+    def test_create_eventstream__timestamp_format(self):
+        df = pd.DataFrame(
+            [
+                ["A", "2023-01-01 10:00:00+03:00", 1],
+                ["B", "2023-01-01 09:00:00+00:00", 1],
+            ],
+            columns=["event", "timestamp", "user_id"],
+        )
+        raw_data_schema = RawDataSchema(
+            timestamp_format="%Y-%m-%d %H:%M:%S%z", timestamp_utc=True, timestamp_tz="Europe/Moscow"
+        )
+        es = Eventstream(raw_data=df, raw_data_schema=raw_data_schema)
+
+        assert es.to_dataframe()["timestamp"].to_list() == [
+            pd.Timestamp("2023-01-01 10:00:00"),
+            pd.Timestamp("2023-01-01 12:00:00"),
+        ]
+        assert es.copy().to_dataframe()["timestamp"].equals(es.to_dataframe()["timestamp"])
+
+    def test_create_eventstream__timestamp_unit(self):
+        df = pd.DataFrame([["A", 1672531200, 1], ["B", 1672531260, 1]], columns=["event", "timestamp", "user_id"])
+        es = Eventstream(raw_data=df, raw_data_schema=RawDataSchema(timestamp_unit="s"))
+
+        assert es.to_dataframe()["timestamp"].to_list() == [
+            pd.Timestamp("2023-01-01 00:00:00"),
+            pd.Timestamp("2023-01-01 00:01:00"),
+        ]
+
+    def test_create_eventstream__timestamp_inference_warning(self, test_data_1, test_schema_1, monkeypatch):
+        monkeypatch.setattr("retentioneering.eventstream.eventstream.TIMESTAMP_INFERENCE_WARNING_ROWS", 1)
+
+        with pytest.warns(UserWarning, match="timestamp_format"):
+            Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+
+    def test_create_eventstream__event_ids(self, test_data_1, test_schema_1):
+        source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        other = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        source_ids = source.to_dataframe()[source.schema.event_id]
+        other_ids = other.to_dataframe()[other.schema.event_id]
+
+        assert source_ids.is_monotonic_increasing
+        assert not source_ids.isin(other_ids).any()
+        assert source.copy()._event_id_allocator is source._event_id_allocator
+
+        child = source.add_start_end_events()
+        child_ids = child.to_dataframe()[child.schema.event_id]
+        assert child_ids.is_unique
+        assert child._event_id_allocator is source._event_id_allocator
+
+    def test_event_ids_to_uuid(self, test_stream_1):
+        event_ids = test_stream_1.to_dataframe()[test_stream_1.schema.event_id]
+        uuids = event_ids_to_uuid(event_ids)
+
+        assert all(isinstance(event_uuid, uuid.UUID) for event_uuid in uuids)
+        assert uuids.is_unique
+        assert uuids.equals(event_ids_to_uuid(event_ids))
 
     def test_create_eventstream__dict_raw_data_schema(self, test_source_dataframe_with_custom_col):
         stream = Eventstream(
@@ -98,6 +244,33 @@ class TestEventstream:
         names: list[str] = [event[test_stream_2.schema.event_name] for [_, event] in df.iterrows()]
         assert names == ["pageview", "click_1", "path_start", "click_2", "absent_user", "path_end"]
 
+    def test_index_events__appended_rows(self):
+        raw_data = pd.DataFrame(
+            [
+                ["1", "event_1", "raw", "2022-01-01 00:00:00"],
+                ["1", "event_2", "raw", "2022-01-01 00:00:01"],
+                ["1", "event_3", "raw", "2022-01-01 00:00:02"],
+                ["1", "path_end", "path_end", "2022-01-01 00:00:02"],
+                ["1", "session_start", "session_start", "2022-01-01 00:00:01"],
+                ["1", "path_start", "path_start", "2022-01-01 00:00:00"],
+                ["1", "no_type", None, "2022-01-01 00:00:02"],
+            ],
+            columns=["user_id", "event", "event_type", "timestamp"],
+        )
+        stream = Eventstream(raw_data)
+        df = stream.to_dataframe()
+
+        assert df[stream.schema.event_name].to_list() == [
+            "path_start",
+            "event_1",
+            "session_start",
+            "event_2",
+            "event_3",
+            "no_type",
+            "path_end",
+        ]
+        assert df[stream.schema.event_index].to_list() == list(range(7))
+
     def test_create_relation(self, test_stream_1):
         # shuffle data
         df = test_stream_1.to_dataframe()
@@ -148,7 +321,7 @@ class TestEventstream:
         source_events_df = source.to_dataframe()
 
         join_df = test_data_join_2
-        join_df["ref_id"] = [source_events_df.iloc[1]["id"], source_events_df.iloc[3]["id"], uuid.uuid4(), None]
+        join_df["ref_id"] = [source_events_df.iloc[1]["id"], source_events_df.iloc[3]["id"], -1, None]
 
         child = Eventstream(
             raw_data_schema=child_schema,
@@ -215,6 +388,20 @@ class TestEventstream:
 
         assert with_deleted_event_names == ["pageview", "click_1", "click_2"]
 
+    def test_soft_delete__by_event_ids(self, test_stream_1):
+        df = test_stream_1.to_dataframe()
+        to_delete = df[df[test_stream_1.schema.event_name] == "click_1"].drop(columns=test_stream_1.schema.event_index)
+
+        assert test_stream_1.to_dataframe()[test_stream_1.schema.event_name].to_list() == [
+            "pageview",
+            "click_1",
+            "click_2",
+        ]
+
+        test_stream_1._soft_delete(events=to_delete)
+
+        assert test_stream_1.to_dataframe()[test_stream_1.schema.event_name].to_list() == ["pageview", "click_2"]
+
     def test_delete_events_by_join(self, test_data_1, test_schema_1):
         source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, schema=EventstreamSchema())
         df = source.to_dataframe()
@@ -253,6 +440,427 @@ class TestEventstream:
 
         assert deleted_events_names == ["click_1"]
 
+    def test_join_eventstream__replaced_deleted_and_new(self):
+        source = Eventstream(
+            pd.DataFrame(
+                [
+                    ["1", "a", "2021-10-26 12:00"],
+                    ["1", "b", "2021-10-26 12:01"],
+                    ["1", "c", "2021-10-26 12:02"],
+                    ["1", "d", "2021-10-26 12:03"],
+                ],
+                columns=["user_id", "event", "timestamp"],
+            )
+        )
+        source_ids = source.to_dataframe().set_index("event")["event_id"]
+        child = create_child_eventstream(
+            source,
+            pd.DataFrame(
+                [
+                    ["1", "b_renamed", "raw", "2021-10-26 12:01", source_ids["b"]],
+                    ["1", "c", "raw", "2021-10-26 12:02", source_ids["c"]],
+                    ["1", "e", "synthetic", "2021-10-26 12:04", None],
+                ],
+                columns=["user_id", "event", "event_type", "timestamp", "ref"],
+            ),
+        )
+        child_df = child.to_dataframe()
+        child._soft_delete(child_df[child_df["event"] == "c"])
+
+        source._join_eventstream(child)
+        result = source.to_dataframe(raw_cols=True)
+        result_with_deleted = source.to_dataframe(show_deleted=True)
+
+        assert result["event"].to_list() == ["a", "b_renamed", "d", "e"]
+        assert result_with_deleted["event"].to_list() == ["a", "b_renamed", "c", "d", "e"]
+        assert result_with_deleted[DELETE_COL_NAME].to_list() == [False, False, True, False, False]
+        assert result_with_deleted["event_index"].to_list() == list(range(5))
+        # the replacing events keep the event_id and the raw columns of the replaced ones
+        assert result["event_id"].to_list()[:3] == [source_ids["a"], source_ids["b"], source_ids["d"]]
+        assert result["event_id"].iloc[3] not in source_ids.to_list()
+        assert result["raw_timestamp"].to_list()[:3] == ["2021-10-26 12:00", "2021-10-26 12:01", "2021-10-26 12:03"]
+
+    def test_join_eventstream__raw_cols(self):
+        source = Eventstream(
+            pd.DataFrame(
+                [["1", "a", "2021-10-26 12:00"], ["1", "b", "2021-10-26 12:01"]],
+                columns=["user_id", "event", "timestamp"],
+            )
+        ).add_start_end_events()
+        source_df = source.to_dataframe(raw_cols=True)
+        child_df = source_df[["user_id", "event", "event_type", "timestamp"]].assign(
+            event=source_df["event"].str.upper(), ref=source_df["event_id"]
+        )
+
+        source._join_eventstream(create_child_eventstream(source, child_df))
+        result = source.to_dataframe(raw_cols=True)
+
+        # the raw values of the created events are timestamps, the other ones stay strings
+        assert result["event"].to_list() == ["PATH_START", "A", "B", "PATH_END"]
+        assert result["raw_timestamp"].map(type).to_list() == source_df["raw_timestamp"].map(type).to_list()
+        assert result["raw_timestamp"].to_list() == source_df["raw_timestamp"].to_list()
+
+    def test_join_eventstream__same_timestamp_order(self):
+        source = Eventstream(
+            pd.DataFrame(
+                [["1", "b", "2021-10-26 12:00"], ["1", "a", "2021-10-26 12:00"], ["1", "c", "2021-10-26 12:00"]],
+                columns=["user_id", "event", "timestamp"],
+            )
+        )
+        source_ids = source.to_dataframe().set_index("event")["event_id"]
+        child = create_child_eventstream(
+            source,
+            pd.DataFrame(
+                [
+                    ["1", "new", "raw", "2021-10-26 12:00", None],
+                    ["1", "x", "raw", "2021-10-26 12:00", source_ids["a"]],
+                ],
+                columns=["user_id", "event", "event_type", "timestamp", "ref"],
+            ),
+        )
+
+        source._join_eventstream(child)
+
+        # the parent events keep their order, the new events go after them
+        assert source.to_dataframe()["event"].to_list() == ["b", "x", "c", "new"]
+
+    def test_join_eventstream__different_categories(self):
+        source = Eventstream(
+            pd.DataFrame(
+                [["1", "a", "2021-10-26 12:00"], ["1", "b", "2021-10-26 12:01"]],
+                columns=["user_id", "event", "timestamp"],
+            )
+        )
+        source_ids = source.to_dataframe().set_index("event")["event_id"]
+        child = create_child_eventstream(
+            source,
+            pd.DataFrame(
+                [
+                    ["1", "x", "group_alias", "2021-10-26 12:00", source_ids["a"]],
+                    ["2", "y", "synthetic", "2021-10-26 12:02", None],
+                ],
+                columns=["user_id", "event", "event_type", "timestamp", "ref"],
+            ),
+        )
+
+        source._join_eventstream(child)
+        result = source.to_dataframe()
+        encoded_result = source.to_dataframe(decode=False)
+
+        assert result["event"].to_list() == ["x", "b", "y"]
+        assert result["event_type"].to_list() == ["group_alias", "raw", "synthetic"]
+        assert result["user_id"].to_list() == ["1", "1", "2"]
+        for col in ["event", "event_type", "user_id"]:
+            assert isinstance(encoded_result[col].dtype, pd.CategoricalDtype)
+            assert encoded_result[col].to_list() == result[col].to_list()
+
+    def test_union(self, test_stream_1):
+        branches = [
+            test_stream_1.add_start_end_events(),
+            test_stream_1.filter_events(func=lambda df, schema: df[schema.event_name] != "click_1"),
+            test_stream_1.filter_events(func=lambda df, schema: df[schema.event_name] == "pageview"),
+            test_stream_1.copy(),
+        ]
+        appended = branches[0].copy()
+        for branch in branches[1:]:
+            appended.append_eventstream(branch)
+
+        union = branches[0]
+        with pytest.raises(ValueError):
+            union.union([Eventstream(test_stream_1.to_dataframe(), schema=EventstreamSchema(event_name="name"))])
+        union.union(branches[1:])
+        expected_df = appended.to_dataframe(raw_cols=True, show_deleted=True)
+        df = union.to_dataframe(raw_cols=True, show_deleted=True)
+
+        pd.testing.assert_frame_equal(df, expected_df[df.columns], check_dtype=False)
+        assert df[union.schema.event_id].is_unique
+        assert df[union.schema.event_name].to_list() == ["path_start", "pageview", "click_1", "click_2", "path_end"]
+        assert not df[DELETE_COL_NAME].any()
+
+    def test_user_layout(self, test_data_sampling):
+        es = Eventstream(test_data_sampling)
+        df = es.to_dataframe()
+        grouped = df.groupby(es.schema.user_id)
+        layout = es._get_user_layout()
+
+        assert es._get_user_layout() is layout
+        assert layout.cumcount().tolist() == grouped.cumcount().tolist()
+        pd.testing.assert_series_equal(
+            pd.Series(layout.shift(df[es.schema.event_name], -1)),
+            grouped[es.schema.event_name].shift(-1).reset_index(drop=True),
+            check_names=False,
+        )
+        pd.testing.assert_series_equal(
+            pd.Series(layout.shift(df[es.schema.event_timestamp], 1)),
+            grouped[es.schema.event_timestamp].shift(1).reset_index(drop=True),
+            check_names=False,
+        )
+        is_pageview = df[es.schema.event_name] == "pageview"
+        assert layout.cumsum(is_pageview).tolist() == is_pageview.groupby(df[es.schema.user_id]).cumsum().tolist()
+        first_events, last_events = grouped[es.schema.event_name].first(), grouped[es.schema.event_name].last()
+        assert layout.first(df[es.schema.event_name]).tolist() == first_events[layout.users].tolist()
+        assert layout.last(df[es.schema.event_name]).tolist() == last_events[layout.users].tolist()
+
+        es._soft_delete(df.head(1))
+        assert es._get_user_layout() is not layout
+        assert es._get_user_layout().sizes.sum() == len(df) - 1
+
+    def test_compact(self, test_stream_1):
+        df = test_stream_1.to_dataframe()
+        filtered = test_stream_1.filter_events(func=lambda df, schema: df[schema.event_name] != "click_1")
+        child = filtered.add_start_end_events()
+        child._soft_delete(events=child.to_dataframe().head(1))
+
+        assert child._get_relation_depth() == 0
+        assert child.to_dataframe(show_deleted=True)[child.schema.event_name].to_list() == [
+            "path_start",
+            "pageview",
+            "click_1",
+            "click_2",
+            "path_end",
+        ]
+
+        child.compact()
+        compacted = child.to_dataframe(show_deleted=True)
+
+        assert compacted[child.schema.event_name].to_list() == ["pageview", "click_2", "path_end"]
+        assert compacted[child.schema.event_index].to_list() == [0, 1, 2]
+        assert child._get_deleted_share() == 0
+        assert child.relations == []
+
+        related = Eventstream(
+            raw_data=df.assign(ref=df[test_stream_1.schema.event_id]),
+            raw_data_schema=test_stream_1.schema.to_raw_data_schema(),
+            relations=[{"raw_col": "ref", "eventstream": test_stream_1}],
+        )
+        assert related._get_relation_depth() == 1
+        assert related._get_relation_cols() == ["ref_0"]
+
+        related.compact()
+        assert related._get_relation_depth() == 0
+        assert related._get_relation_cols() == []
+
+    def test_relations__weak(self, test_data_1, test_schema_1):
+        parent = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        df = parent.to_dataframe()
+        child = Eventstream(
+            raw_data=df.assign(ref=df[parent.schema.event_id]),
+            raw_data_schema=parent.schema.to_raw_data_schema(),
+            relations=[{"raw_col": "ref", "eventstream": parent}],
+        )
+
+        assert child.relations[0]["eventstream"] == parent
+        assert child._get_relation_depth() == 1
+
+        del parent
+        gc.collect()
+
+        assert child._get_relation_depth() == 0
+        assert len(child.to_dataframe()) == len(df)
+
+    def test_memory_report(self, test_stream_1):
+        child = test_stream_1.add_start_end_events()
+        report = Eventstream.memory_report()
+
+        assert list(report.columns) == [
+            "eventstream",
+            "events",
+            "deleted_events",
+            "bytes",
+            "related_eventstreams",
+            "related_bytes",
+        ]
+        child_report = report[report["eventstream"] == hex(id(child))].iloc[0]
+        assert child_report["events"] == 5
+        assert child_report["bytes"] > 0
+        assert child_report["related_eventstreams"] == 0
+
+    def test_to_dataframe__columns(self, test_stream_1):
+        schema = test_stream_1.schema
+        columns = [schema.user_id, schema.event_name, schema.event_timestamp]
+        full = test_stream_1.to_dataframe()
+        view = test_stream_1.to_dataframe(columns=columns)
+        copied = test_stream_1.to_dataframe(columns=columns, copy=True)
+        stored = test_stream_1.to_dataframe(columns=columns)[schema.event_timestamp]
+
+        assert list(view.columns) == columns
+        assert view.equals(full[columns])
+        assert np.shares_memory(view[schema.event_timestamp].to_numpy(), stored.to_numpy())
+        assert not np.shares_memory(copied[schema.event_timestamp].to_numpy(), stored.to_numpy())
+
+        with pytest.raises(ValueError):
+            test_stream_1.to_dataframe(columns=["unknown_col"])
+
+    def test_parquet(self, test_data_1, test_schema_1, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = str(tmp_path / "eventstream.parquet")
+        source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        df = source.to_dataframe()
+        child = Eventstream(
+            raw_data=df.assign(ref=df[source.schema.event_id]),
+            raw_data_schema=source.schema.to_raw_data_schema(),
+            relations=[{"raw_col": "ref", "eventstream": source}],
+        )
+        child._soft_delete(events=child.to_dataframe().head(1))
+        child.to_parquet(path)
+
+        loaded = Eventstream.read_parquet(path, relations=child.relations)
+        expected = child.to_dataframe(raw_cols=True, show_deleted=True, decode=False)
+        actual = loaded.to_dataframe(raw_cols=True, show_deleted=True, decode=False)
+
+        assert_same_events_in_new_lineage(actual, expected, loaded, child)
+        assert loaded.schema == child.schema
+        assert loaded.relations[0]["eventstream"] == source
+
+        # the loaded events are not mixed up with the events of the eventstreams created in this session
+        loaded = Eventstream.read_parquet(path)
+        loaded.union([child])
+        assert loaded._get_events_count() == 2 * child._get_events_count()
+
+    def test_parquet__columns_and_filters(self, test_data_1, test_schema_1, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = str(tmp_path / "eventstream.parquet")
+        source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        source.to_parquet(path)
+        time_col = source.schema.event_timestamp
+        first_timestamp = source.to_dataframe()[time_col].min()
+
+        loaded = Eventstream.read_parquet(path, columns=[], filters=[(time_col, "<=", first_timestamp)])
+        df = loaded.to_dataframe(raw_cols=True)
+
+        assert loaded._get_raw_cols() == []
+        assert 0 < len(df) < len(source.to_dataframe())
+        assert (df[time_col] == first_timestamp).all()
+        assert df[source.schema.event_index].to_list() == list(range(len(df)))
+
+        with pytest.raises(ValueError):
+            Eventstream.read_parquet(path, columns=["unknown_col"])
+
+    def test_parquet__several_files(self, test_data_1, test_schema_1, tmp_path):
+        pytest.importorskip("pyarrow")
+        paths = [str(tmp_path / f"eventstream-{i}.parquet") for i in range(3)]
+        # the events of independent eventstreams have the same offsets in their lineages
+        first = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1).add_start_end_events()
+        second = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1).add_start_end_events()
+        first.to_parquet(paths[0])
+        second.to_parquet(paths[1])
+
+        loaded = Eventstream.read_parquet(paths[:2])
+        df = loaded.to_dataframe()
+        started = loaded.add_start_end_events().to_dataframe()
+
+        assert len(df) == first._get_events_count() + second._get_events_count()
+        assert df["event_id"].is_unique
+        assert started["event_id"].is_unique
+
+        Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, encode_cols=False).to_parquet(paths[2])
+        with pytest.raises(ValueError):
+            Eventstream.read_parquet([paths[0], paths[2]])
+
+    def test_shared_memory(self, test_data_1, test_schema_1, tmp_path):
+        source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        source._soft_delete(events=source.to_dataframe().head(1))
+        path = str(tmp_path / "eventstream.frame")
+
+        with source.to_shared_memory(path=path) as shared:
+            attached = Eventstream.from_shared_memory(pickle.loads(pickle.dumps(shared)))
+            expected = source.to_dataframe(raw_cols=True, show_deleted=True, decode=False)
+            actual = attached.to_dataframe(raw_cols=True, show_deleted=True, decode=False)
+
+            assert_same_events_in_new_lineage(actual, expected, attached, source)
+            assert attached.schema == source.schema
+            columns = [source.schema.event_timestamp, source.schema.event_name]
+            view = attached.to_dataframe(columns=columns, show_deleted=True, decode=False)
+            assert not view[source.schema.event_timestamp].to_numpy().flags.writeable
+            assert not view[source.schema.event_name].cat.codes.to_numpy().flags.writeable
+
+        assert not (tmp_path / "eventstream.frame").exists()
+        assert attached.to_dataframe().drop(columns="event_id").equals(source.to_dataframe().drop(columns="event_id"))
+
+    def test_mmap(self, test_data_1, test_schema_1, tmp_path):
+        path = str(tmp_path / "eventstream.frame")
+        source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, raw_cols="none")
+        source.to_mmap(path)
+
+        opened = Eventstream.open_mmap(path)
+        stored = opened.to_dataframe(columns=[source.schema.event_timestamp], show_deleted=True)
+
+        assert_same_events_in_new_lineage(
+            opened.to_dataframe(decode=False), source.to_dataframe(decode=False), opened, source
+        )
+        assert not stored[source.schema.event_timestamp].to_numpy().flags.writeable
+        assert opened.describe().equals(source.describe())
+        assert opened.add_start_end_events().to_dataframe()[source.schema.event_name].to_list()[0] == "path_start"
+        opened.append_eventstream(source)
+        assert opened._get_events_count() == 2 * source._get_events_count()
+
+        (tmp_path / "events.csv").write_text("event,timestamp,user_id")
+        with pytest.raises(ValueError):
+            Eventstream.open_mmap(str(tmp_path / "events.csv"))
+
+    def test_mmap__rewrite_and_extend(self, test_data_1, test_schema_1, tmp_path):
+        path = str(tmp_path / "eventstream.frame")
+        source = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1, raw_cols="none")
+        source.to_mmap(path)
+        opened = Eventstream.open_mmap(path)
+        expected = opened.to_dataframe()
+
+        # the file is replaced, so the eventstream that has mapped it keeps reading the old events
+        Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1.head(2), raw_cols="none").to_mmap(path)
+        pd.testing.assert_frame_equal(opened.to_dataframe(), expected)
+        assert len(Eventstream.open_mmap(path).to_dataframe()) == 2
+        assert [name for name in os.listdir(tmp_path)] == ["eventstream.frame"]
+
+        # the raw data is prepared with the original raw_data_schema
+        opened.extend(test_data_1.head(1))
+        assert opened._get_events_count() == source._get_events_count() + 1
+
+    def test_from_csv(self, test_data_1, test_schema_1, tmp_path):
+        path = str(tmp_path / "events.csv")
+        test_data_1.sample(frac=1, random_state=0).to_csv(path, index=False)
+        expected = Eventstream(raw_data_schema=test_schema_1, raw_data=pd.read_csv(path)).to_dataframe(raw_cols=True)
+
+        for chunksize in [1, 2, 100]:
+            es = Eventstream.from_csv(path, raw_data_schema=test_schema_1, chunksize=chunksize)
+            df = es.to_dataframe(raw_cols=True)
+
+            assert df.drop(columns=es.schema.event_id).equals(expected.drop(columns=es.schema.event_id))
+            assert df[es.schema.event_id].is_unique
+
+    def test_from_csv__raw_cols(self, test_data_1, test_schema_1, tmp_path):
+        path = str(tmp_path / "events.csv")
+        test_data_1.to_csv(path, index=False)
+
+        es = Eventstream.from_csv(path, raw_data_schema=test_schema_1, chunksize=2, raw_cols="none")
+
+        assert es._get_raw_cols() == []
+        assert len(es.to_dataframe()) == len(test_data_1)
+
+    def test_extend(self, test_data_1, test_schema_1):
+        new_data = pd.DataFrame(
+            [
+                [3, "click_1", "2021-10-26 12:05", 2],
+                [4, "purchase", "2021-10-26 12:04", 1],
+            ],
+            columns=test_data_1.columns,
+        )
+        expected = Eventstream(raw_data_schema=test_schema_1, raw_data=pd.concat([test_data_1, new_data]))
+        es = Eventstream(raw_data_schema=test_schema_1, raw_data=test_data_1)
+        event_index = es.to_dataframe().set_index(es.schema.event_id)[es.schema.event_index]
+
+        with pytest.raises(ValueError):
+            es.extend(new_data.drop(columns=["Unnamed: 0"]))
+        assert len(es.to_dataframe()) == len(test_data_1)
+
+        es.extend(new_data)
+        df = es.to_dataframe(raw_cols=True)
+
+        assert df.drop(columns=es.schema.event_id).equals(
+            expected.to_dataframe(raw_cols=True).drop(columns=es.schema.event_id)
+        )
+        assert df[es.schema.event_id].is_unique
+        assert df.set_index(es.schema.event_id)[es.schema.event_index].loc[event_index.index].equals(event_index)
+
     def test_sampling__user_sample_size__float(self, test_data_sampling):
         user_sample_share = 0.8
         es = Eventstream(test_data_sampling)
@@ -273,6 +881,29 @@ class TestEventstream:
 
         assert math.isclose(user_sample_size, user_cnt_sampled_2, abs_tol=0.51)
 
+    def test_sampling__user_sample_seed(self, test_data_sampling):
+        state = np.random.get_state()
+        sampled_users = [
+            set(Eventstream(test_data_sampling, user_sample_size=2, user_sample_seed=seed).to_dataframe()["user_id"])
+            for seed in [1, 1, 2, 3, 4]
+        ]
+
+        assert sampled_users[0] == sampled_users[1]
+        assert len(set(map(frozenset, sampled_users))) > 1
+        assert np.array_equal(np.random.get_state()[1], state[1])
+
+    def test_from_csv__user_sample_share(self, test_data_sampling, tmp_path):
+        path = str(tmp_path / "events.csv")
+        test_data_sampling.to_csv(path, index=False)
+        expected = Eventstream(test_data_sampling).sample_users(user_sample_share=0.5, user_sample_seed=7)
+        expected_users = set(expected.to_dataframe()["user_id"])
+
+        for chunksize in [1, 3, 100]:
+            es = Eventstream.from_csv(path, chunksize=chunksize, user_sample_share=0.5, user_sample_seed=7)
+
+            assert set(es.to_dataframe()["user_id"]) == expected_users
+            assert len(es.to_dataframe()) == len(expected.to_dataframe())
+
     def test_describe_works(self, test_stream_1):
         try:
             test_stream_1.describe()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from retentioneering import datasets
+from retentioneering.data_processors_lib import (
+    LabelCroppedPaths,
+    LabelCroppedPathsParams,
+    SplitSessions,
+    SplitSessionsParams,
+)
+from retentioneering.edgelist import Edgelist
+from retentioneering.eventstream import PartitionedEventstream
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def simple_shop_stream():
+    return datasets.load_simple_shop()
+
+
+@pytest.fixture
+def partitioned_stream(simple_shop_stream, tmp_path):
+    return PartitionedEventstream.from_eventstream(simple_shop_stream, str(tmp_path / "partitions"), n_partitions=4)
+
+
+def sort_events(df: pd.DataFrame) -> pd.DataFrame:
+    columns = ["user_id", "timestamp", "event_type", "event"]
+    return df.sort_values(columns).reset_index(drop=True)[columns]
+
+
+class TestPartitionedEventstream:
+    def test_from_eventstream(self, simple_shop_stream, partitioned_stream):
+        partitions = [partition.to_dataframe() for partition in partitioned_stream.partitions()]
+        users = [set(partition["user_id"]) for partition in partitions]
+
+        assert len(partitions) == 4
+        assert sum(map(len, users)) == len(set.union(*users))
+        for partition in partitions:
+            assert partition["event_index"].tolist() == list(range(len(partition)))
+        assert sort_events(pd.concat(partitions)).equals(sort_events(simple_shop_stream.to_dataframe()))
+
+    def test_from_csv(self, simple_shop_stream, partitioned_stream, tmp_path):
+        csv_path = str(tmp_path / "events.csv")
+        datasets.load_simple_shop(as_dataframe=True).to_csv(csv_path, index=False)
+
+        actual = PartitionedEventstream.from_csv(
+            csv_path, str(tmp_path / "csv_partitions"), n_partitions=4, chunksize=5000
+        )
+
+        for actual_partition, expected_partition in zip(actual.partitions(), partitioned_stream.partitions()):
+            actual_df, expected_df = actual_partition.to_dataframe(), expected_partition.to_dataframe()
+            assert sort_events(actual_df).equals(sort_events(expected_df))
+        assert not [name for name in (tmp_path / "csv_partitions").iterdir() if name.suffix == ".csv"]
+
+    def test_apply(self, simple_shop_stream, partitioned_stream, tmp_path):
+        processor = SplitSessions(params=SplitSessionsParams(timeout=(30, "m")))
+        expected = simple_shop_stream.split_sessions(timeout=(30, "m")).to_dataframe()
+
+        actual = partitioned_stream.apply(processor, str(tmp_path / "sessions"))
+
+        assert actual.schema.custom_cols == ["session_id"]
+        actual_stream = actual.to_eventstream()
+        actual_df = actual_stream.to_dataframe()
+        assert sort_events(actual_df).equals(sort_events(expected))
+        # the events of different partitions never share event_id, so the loaded eventstream can be processed
+        assert actual_df["event_id"].is_unique
+        started = actual_stream.add_start_end_events().to_dataframe()
+        assert started["event_id"].is_unique
+        assert len(started) == len(actual_df) + 2 * actual_df["user_id"].nunique()
+
+    def test_apply__not_user_local(self, partitioned_stream, tmp_path):
+        processor = LabelCroppedPaths(params=LabelCroppedPathsParams(left_cutoff=(1, "h")))
+
+        with pytest.raises(ValueError):
+            partitioned_stream.apply(processor, str(tmp_path / "cropped"))
+
+    def test_funnel(self, simple_shop_stream, partitioned_stream):
+        params = dict(stages=["catalog", "cart", "payment_done"], show_plot=False)
+
+        for funnel_type in ["open", "closed", "hybrid"]:
+            expected = simple_shop_stream.funnel(funnel_type=funnel_type, **params).values
+            actual = partitioned_stream.funnel(funnel_type=funnel_type, **params).values
+
+            assert actual.equals(expected)
+
+    def test_step_matrix(self, simple_shop_stream, partitioned_stream):
+        users = simple_shop_stream.to_dataframe()["user_id"].unique()
+        params = dict(
+            max_steps=10,
+            targets=["payment_done", ["cart", "delivery_choice"]],
+            accumulated="both",
+            threshold=0.05,
+            show_plot=False,
+        )
+
+        for groups in [None, (users[::2], users[1::2])]:
+            expected, expected_targets = simple_shop_stream.step_matrix(groups=groups, **params).values
+            actual, actual_targets = partitioned_stream.step_matrix(groups=groups, **params).values
+
+            pd.testing.assert_frame_equal(actual.loc[expected.index], expected)
+            pd.testing.assert_frame_equal(actual_targets, expected_targets)
+
+    def test_edgelist(self, simple_shop_stream, partitioned_stream):
+        weight_cols = ["event_id", "user_id"]
+
+        for norm_type in [None, "full", "node"]:
+            expected = Edgelist(simple_shop_stream).calculate_edgelist(weight_cols=weight_cols, norm_type=norm_type)
+            actual = partitioned_stream.edgelist(weight_cols=weight_cols, norm_type=norm_type)
+
+            index = ["event", "next_event"]
+            expected = expected.set_index(index).sort_index()
+            actual = actual.set_index(index).sort_index()
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=norm_type is not None)
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from typing import List
+import threading
+import time
+from typing import Callable, List, cast
 
 import pandas as pd
 
 from retentioneering.data_processor import DataProcessor
+from retentioneering.data_processors_lib.add_start_end_events import (
+    AddStartEndEvents,
+    AddStartEndEventsParams,
+)
 from retentioneering.data_processors_lib.filter_events import (
     FilterEvents,
     FilterEventsParams,
@@ -13,10 +19,21 @@ from retentioneering.data_processors_lib.group_events import (
     GroupEvents,
     GroupEventsParams,
 )
+from retentioneering.data_processors_lib.rename import RenameParams, RenameProcessor
+from retentioneering.data_processors_lib.split_sessions import (
+    SplitSessions,
+    SplitSessionsParams,
+)
 from retentioneering.eventstream.eventstream import Eventstream, EventstreamSchema
 from retentioneering.eventstream.schema import RawDataSchema
 from retentioneering.params_model import ParamsModel
-from retentioneering.preprocessing_graph import PreprocessingGraph
+from retentioneering.preprocessing_graph import (
+    CachePolicy,
+    CompactionPolicy,
+    FusionPolicy,
+    ParallelPolicy,
+    PreprocessingGraph,
+)
 from retentioneering.preprocessing_graph.nodes import (
     EventsNode,
     MergeNode,
@@ -296,6 +313,543 @@ class TestPreprocessingGraph:
 
         assert event_names == ["pageview", "cart_btn_click", "pageview", "exit_btn_click", "plus_icon_click"]
 
+    def test_combine__compaction_policy(self) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event_name": "pageview", "event_timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event_name": "trash_event", "event_timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event_name": "trash_event", "event_timestamp": "2021-10-26 12:02", "user_id": "1"},
+                {"event_name": "pageview", "event_timestamp": "2021-10-26 12:03", "user_id": "1"},
+            ]
+        )
+
+        source = Eventstream(
+            raw_data_schema=RawDataSchema(
+                event_name="event_name", event_timestamp="event_timestamp", user_id="user_id"
+            ),
+            raw_data=source_df,
+        )
+
+        def delete_trash_events() -> EventsNode:
+            return EventsNode(
+                FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "trash_event"))
+            )
+
+        compacted_node = delete_trash_events()
+        compacted_graph = PreprocessingGraph(source, compaction_policy=CompactionPolicy(deleted_share=0.4))
+        compacted_graph.add_node(node=compacted_node, parents=[compacted_graph.root])
+        compacted = compacted_graph.combine(compacted_node).to_dataframe(show_deleted=True)
+
+        not_compacted_node = delete_trash_events()
+        not_compacted_graph = PreprocessingGraph(source, compaction_policy=CompactionPolicy(deleted_share=0.5))
+        not_compacted_graph.add_node(node=not_compacted_node, parents=[not_compacted_graph.root])
+        not_compacted = not_compacted_graph.combine(not_compacted_node).to_dataframe(show_deleted=True)
+
+        assert compacted[source.schema.event_name].to_list() == ["pageview", "pageview"]
+        assert compacted[source.schema.event_index].to_list() == [0, 1]
+        assert not_compacted[source.schema.event_name].to_list() == [
+            "pageview",
+            "trash_event",
+            "trash_event",
+            "pageview",
+        ]
+
+    def test_combine__parallel_policy(self) -> None:
+        source_df = pd.DataFrame(
+            [{"event": "pageview", "timestamp": "2021-10-26 12:00", "user_id": str(user)} for user in range(8)]
+            + [{"event": "trash_event", "timestamp": "2021-10-26 12:01", "user_id": str(user)} for user in range(8)]
+            + [{"event": "pageview", "timestamp": "2021-10-26 14:00", "user_id": str(user)} for user in range(0, 8, 2)]
+        )
+        source = Eventstream(raw_data=source_df)
+
+        def combine(processor: DataProcessor, parallel_policy: ParallelPolicy | None) -> pd.DataFrame:
+            graph = PreprocessingGraph(source, parallel_policy=parallel_policy)
+            node = EventsNode(processor)
+            graph.add_node(node=node, parents=[graph.root])
+            return graph.combine(node).to_dataframe()
+
+        def sort_events(df: pd.DataFrame) -> pd.DataFrame:
+            columns = ["user_id", "timestamp", "event_type", "event", "session_id"]
+            return df.sort_values(columns).reset_index(drop=True)[columns]
+
+        parallel_policy = ParallelPolicy(n_jobs=2, min_events=0)
+        split_sessions = SplitSessions(SplitSessionsParams(timeout=(1, "h")))
+        expected = combine(split_sessions, None)
+        actual = combine(split_sessions, parallel_policy)
+
+        assert sort_events(actual).equals(sort_events(expected))
+        assert actual["event_id"].is_unique
+        assert actual["event_index"].to_list() == list(range(len(actual)))
+
+        # FilterEvents is not user-local, so its lambda is never sent to the workers
+        filter_events = FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "trash_event"))
+        filtered = combine(filter_events, parallel_policy)
+
+        assert "trash_event" not in filtered["event"].to_list()
+
+        # the soft-deleted events are kept if the eventstream isn't compacted
+        def combine_not_compacted(parallel_policy: ParallelPolicy | None) -> pd.DataFrame:
+            graph = PreprocessingGraph(
+                source, compaction_policy=CompactionPolicy(enabled=False), parallel_policy=parallel_policy
+            )
+            filter_node = EventsNode(filter_events)
+            start_end = EventsNode(AddStartEndEvents(AddStartEndEventsParams()))
+            graph.add_node(node=filter_node, parents=[graph.root])
+            graph.add_node(node=start_end, parents=[filter_node])
+            return graph.combine(start_end).to_dataframe(show_deleted=True)
+
+        expected = combine_not_compacted(None)
+        actual = combine_not_compacted(parallel_policy)
+
+        assert len(actual) == len(expected) == len(source_df) + 16
+        assert sort_events(actual.assign(session_id=None)).equals(sort_events(expected.assign(session_id=None)))
+
+    def test_combine__fusion_policy(self) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "pageview", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "trash_event", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "cart", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:00", "user_id": "1"},
+                {"event": "cart", "timestamp": "2021-10-26 14:30", "user_id": "2"},
+            ]
+        )
+        source = Eventstream(raw_data=source_df)
+
+        def build_graph(fusion_policy: FusionPolicy | None) -> tuple[PreprocessingGraph, EventsNode]:
+            graph = PreprocessingGraph(source, fusion_policy=fusion_policy)
+            filtered = EventsNode(
+                FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "trash_event"))
+            )
+            pages = EventsNode(
+                GroupEvents(
+                    GroupEventsParams(event_name="page", func=lambda df, schema: df[schema.event_name] == "pageview")
+                )
+            )
+            renamed = EventsNode(
+                RenameProcessor(RenameParams(rules=[{"group_name": "basket", "child_events": ["cart"]}]))
+            )
+            # the second data processor changing event types starts a new step
+            baskets = EventsNode(
+                GroupEvents(
+                    GroupEventsParams(
+                        event_name="order", event_type="raw", func=lambda df, schema: df[schema.event_name] == "basket"
+                    )
+                )
+            )
+            graph.add_node(node=filtered, parents=[graph.root])
+            graph.add_node(node=pages, parents=[filtered])
+            graph.add_node(node=renamed, parents=[pages])
+            graph.add_node(node=baskets, parents=[renamed])
+            return graph, baskets
+
+        not_fused_graph, not_fused_leaf = build_graph(FusionPolicy(enabled=False))
+        graph, leaf = build_graph(None)
+
+        assert not_fused_graph.explain(not_fused_leaf).split("\n") == [
+            "GroupEvents",
+            "    RenameProcessor",
+            "        GroupEvents",
+            "            FilterEvents",
+            "                SourceNode",
+        ]
+        assert graph.explain(leaf).split("\n") == [
+            "Fused: RenameProcessor -> GroupEvents",
+            "    Fused: FilterEvents -> GroupEvents",
+            "        SourceNode",
+        ]
+        expected = not_fused_graph.combine(not_fused_leaf).to_dataframe()
+        pd.testing.assert_frame_equal(graph.combine(leaf).to_dataframe(), expected)
+        assert graph.explain(leaf) == "GroupEvents (kept result)"
+
+        # the kept result of an inner node interrupts the chain
+        graph.clear_cache()
+        graph.combine(graph.get_parents(leaf)[0])
+        assert graph.explain(leaf).split("\n") == ["GroupEvents", "    RenameProcessor (kept result)"]
+
+    def test_combine__profile(self, tmp_path) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "pageview", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "trash_event", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "cart", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:30", "user_id": "2"},
+            ]
+        )
+        graph = PreprocessingGraph(Eventstream(raw_data=source_df))
+        filtered = EventsNode(
+            FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "trash_event"))
+        )
+        started = EventsNode(AddStartEndEvents(AddStartEndEventsParams()))
+        pages = EventsNode(
+            GroupEvents(
+                GroupEventsParams(event_name="page", func=lambda df, schema: df[schema.event_name] == "pageview")
+            )
+        )
+        merged = MergeNode()
+        graph.add_node(node=filtered, parents=[graph.root])
+        graph.add_node(node=started, parents=[filtered])
+        graph.add_node(node=pages, parents=[filtered])
+        graph.add_node(node=merged, parents=[started, pages])
+
+        graph.combine(merged)
+        # the calculations started in the widget are profiled only if requested
+        graph._combine_handler({"node_pk": merged.pk})
+        assert graph.combine_profile is None
+
+        graph.clear_cache()
+        graph.combine(merged, profile=True)
+        profile = graph.combine_profile.to_dataframe()
+        # the second branch reuses the kept result of the common parent
+        assert profile[["node_pk", "step", "status"]].values.tolist() == [
+            [filtered.pk, "FilterEvents", "calculated"],
+            [started.pk, "AddStartEndEvents", "calculated"],
+            [filtered.pk, "FilterEvents", "kept"],
+            [pages.pk, "GroupEvents", "calculated"],
+            [merged.pk, "MergeNode", "calculated"],
+        ]
+        profile_steps = profile["step"].tolist()
+        profile = profile[profile["status"] == "calculated"].set_index("node_pk")
+        assert profile.loc[filtered.pk, ["rows_in", "rows_out", "rows_deleted"]].tolist() == [4, 3, 1]
+        assert profile.loc[started.pk, ["rows_in", "rows_out", "rows_deleted"]].tolist() == [3, 7, 0]
+        assert profile.loc[filtered.pk, ["apply_time", "join_time", "index_time"]].gt(0).all()
+        assert profile.loc[merged.pk, "join_time"] > 0
+        assert (profile["total_time"] >= profile[["apply_time", "join_time", "index_time"]].sum(axis=1)).all()
+        assert (profile["memory_delta"] > 0).all()
+
+        trace_path = tmp_path / "trace.json"
+        graph.combine_profile.to_chrome_trace(str(trace_path))
+        trace_events = pd.read_json(trace_path, typ="series")["traceEvents"]
+        node_events = [trace_event for trace_event in trace_events if trace_event["cat"] == "node"]
+        assert [trace_event["name"] for trace_event in node_events] == profile_steps
+        assert {trace_event["ph"] for trace_event in trace_events} == {"X"}
+        assert {"apply", "join", "index"} <= {trace_event["name"] for trace_event in trace_events}
+
+        # the widget shows the numbers of the last profiled combine
+        graph.combine(merged, profile=True)
+        assert graph.combine_profile.to_dataframe()[["node_pk", "status"]].values.tolist() == [[merged.pk, "kept"]]
+        exported = {node["pk"]: node for node in graph.export(payload={})["nodes"]}
+        assert exported[merged.pk]["profile"]["status"] == "kept"
+        assert "profile" not in exported[filtered.pk]
+
+        # the memory peaks of the branches calculated in several threads can't be separated
+        graph.parallel_policy = ParallelPolicy(branch_jobs=2)
+        graph.clear_cache()
+        graph.combine(merged, profile=True)
+        assert graph.combine_profile.to_dataframe()["memory_delta"].isna().all()
+
+    def test_combine__parallel_branches(self, monkeypatch) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "pageview", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "trash_event", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:00", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:30", "user_id": "2"},
+            ]
+        )
+        source = Eventstream(raw_data=source_df)
+        applied_threads: List[int] = []
+        apply = SplitSessions.apply
+
+        def counted_apply(processor: SplitSessions, eventstream: Eventstream) -> Eventstream:
+            applied_threads.append(threading.get_ident())
+            return apply(processor, eventstream)
+
+        monkeypatch.setattr(SplitSessions, "apply", counted_apply)
+
+        def combine(parallel_policy: ParallelPolicy | None) -> pd.DataFrame:
+            graph = PreprocessingGraph(source, parallel_policy=parallel_policy)
+            sessions = EventsNode(SplitSessions(SplitSessionsParams(timeout=(1, "h"))))
+            filtered = EventsNode(
+                FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "trash_event"))
+            )
+            grouped = EventsNode(
+                GroupEvents(
+                    GroupEventsParams(event_name="page", func=lambda df, schema: df[schema.event_name] == "pageview")
+                )
+            )
+            merged = MergeNode()
+            graph.add_node(node=sessions, parents=[graph.root])
+            graph.add_node(node=filtered, parents=[sessions])
+            graph.add_node(node=grouped, parents=[sessions])
+            graph.add_node(node=merged, parents=[filtered, grouped])
+            return graph.combine(merged).to_dataframe()
+
+        expected = combine(None)
+        applied_threads.clear()
+        actual = combine(ParallelPolicy(branch_jobs=2))
+
+        pd.testing.assert_frame_equal(actual.drop(columns="event_id"), expected.drop(columns="event_id"))
+        # the common ancestor of the branches is calculated once in a branch thread
+        assert len(applied_threads) == 1
+        assert applied_threads[0] != threading.get_ident()
+
+    def test_combine__cache_policy(self, monkeypatch) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "pageview", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "trash_event", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:00", "user_id": "1"},
+            ]
+        )
+        source = Eventstream(raw_data=source_df)
+        applied: List[SplitSessions] = []
+        apply = SplitSessions.apply
+
+        def counted_apply(processor: SplitSessions, eventstream: Eventstream) -> Eventstream:
+            applied.append(processor)
+            return apply(processor, eventstream)
+
+        monkeypatch.setattr(SplitSessions, "apply", counted_apply)
+
+        def combine_leaves(cache_policy: CachePolicy | None) -> tuple[PreprocessingGraph, List[pd.DataFrame]]:
+            graph = PreprocessingGraph(source, cache_policy=cache_policy)
+            sessions = EventsNode(SplitSessions(SplitSessionsParams(timeout=(1, "h"))))
+            filtered = EventsNode(
+                FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "trash_event"))
+            )
+            grouped = EventsNode(
+                GroupEvents(
+                    GroupEventsParams(event_name="page", func=lambda df, schema: df[schema.event_name] == "pageview")
+                )
+            )
+            graph.add_node(node=sessions, parents=[graph.root])
+            graph.add_node(node=filtered, parents=[sessions])
+            graph.add_node(node=grouped, parents=[sessions])
+            results = [graph.combine(node).to_dataframe().drop(columns="event_id") for node in [filtered, grouped]]
+            return graph, results
+
+        _, not_cached_results = combine_leaves(CachePolicy(enabled=False))
+        assert len(applied) == 2
+
+        applied.clear()
+        graph, cached_results = combine_leaves(None)
+        assert len(applied) == 1
+        for cached, not_cached in zip(cached_results, not_cached_results):
+            pd.testing.assert_frame_equal(cached, not_cached)
+
+        applied.clear()
+        combine_leaves(CachePolicy(max_bytes=0))
+        assert len(applied) == 2
+
+        # a node edited in the widget and its children are calculated again
+        applied.clear()
+        payload = graph.export({})
+        sessions_data = next(node for node in payload["nodes"] if "SplitSessions" in str(node.get("processor")))
+        sessions_data["processor"]["values"]["timeout"] = (3, "h")
+        graph._set_graph_handler(payload)
+        result = graph.combine(graph._find_node(sessions_data["pk"])).to_dataframe()
+
+        assert len(applied) == 1
+        assert result["event"].to_list().count("session_start") == 1
+
+    def test_combine__cache_policy_merge_results(self) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "pageview", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "cart", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:00", "user_id": "1"},
+                {"event": "cart", "timestamp": "2021-10-26 14:00", "user_id": "2"},
+            ]
+        )
+        source = Eventstream(raw_data=source_df)
+
+        def combine_merge(cache_policy: CachePolicy | None) -> pd.DataFrame:
+            graph = PreprocessingGraph(source, cache_policy=cache_policy)
+            start_end = EventsNode(AddStartEndEvents(AddStartEndEventsParams()))
+            sessions = EventsNode(SplitSessions(SplitSessionsParams(timeout=(1, "h"))))
+            no_pageview = EventsNode(
+                FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "pageview"))
+            )
+            no_cart = EventsNode(
+                FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "cart"))
+            )
+            merge = MergeNode()
+            graph.add_node(node=start_end, parents=[graph.root])
+            graph.add_node(node=sessions, parents=[start_end])
+            graph.add_node(node=no_pageview, parents=[sessions])
+            graph.add_node(node=no_cart, parents=[sessions])
+            graph.add_node(node=merge, parents=[no_pageview, no_cart])
+            return graph.combine(merge).to_dataframe().drop(columns="event_id")
+
+        # the session events created by the shared ancestor are the same in both branches
+        expected = combine_merge(None)
+        assert expected["event"].to_list().count("session_start") == 3
+        for cache_policy in [CachePolicy(max_bytes=1), CachePolicy(enabled=False)]:
+            pd.testing.assert_frame_equal(combine_merge(cache_policy), expected)
+
+    def test_combine__cache_policy_source_changes(self) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "a", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "b", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "a", "timestamp": "2021-10-26 14:00", "user_id": "2"},
+            ]
+        )
+        source = Eventstream(raw_data=source_df)
+        graph = PreprocessingGraph(source)
+        filtered = EventsNode(FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] == "a")))
+        graph.add_node(node=filtered, parents=[graph.root])
+
+        assert "price" not in graph.combine(filtered).to_dataframe().columns
+
+        # the events changed in place are not replaced by the result calculated before
+        source.add_custom_col("price", pd.Series([1, 2, 3]))
+        assert graph.combine(filtered).to_dataframe()["price"].tolist() == [1, 3]
+
+    def test_combine__cache_policy_closures(self) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "a", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "b", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "a", "timestamp": "2021-10-26 14:00", "user_id": "2"},
+            ]
+        )
+        graph = PreprocessingGraph(Eventstream(raw_data=source_df))
+
+        def drop(event: str) -> Callable[[pd.DataFrame, EventstreamSchema], pd.Series]:
+            # the functions made by the same factory have the same source code
+            return lambda df, schema: df[schema.event_name] != event
+
+        filtered = EventsNode(FilterEvents(FilterEventsParams(func=drop("a"))))
+        graph.add_node(node=filtered, parents=[graph.root])
+
+        assert graph.combine(filtered).to_dataframe()["event"].tolist() == ["b"]
+
+        filtered.processor.params.func = drop("b")
+        assert graph.combine(filtered).to_dataframe()["event"].tolist() == ["a", "a"]
+
+    def test_combine__cache_directory(self, monkeypatch, tmp_path) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "pageview", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "trash_event", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:00", "user_id": "1"},
+                {"event": "pageview", "timestamp": "2021-10-26 14:30", "user_id": "2"},
+            ]
+        )
+        applied: List[SplitSessions] = []
+        apply = SplitSessions.apply
+
+        def counted_apply(processor: SplitSessions, eventstream: Eventstream) -> Eventstream:
+            applied.append(processor)
+            return apply(processor, eventstream)
+
+        monkeypatch.setattr(SplitSessions, "apply", counted_apply)
+
+        def build_graph(source: Eventstream, directory: str | None) -> tuple[PreprocessingGraph, List[EventsNode]]:
+            # a new graph of the same data imitates a notebook reopened after a kernel restart
+            graph = PreprocessingGraph(source, cache_policy=CachePolicy(directory=directory))
+            sessions = EventsNode(SplitSessions(SplitSessionsParams(timeout=(1, "h"))))
+            filtered = EventsNode(
+                FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] != "trash_event"))
+            )
+            grouped = EventsNode(
+                GroupEvents(
+                    GroupEventsParams(event_name="page", func=lambda df, schema: df[schema.event_name] == "pageview")
+                )
+            )
+            merged = MergeNode()
+            paths = EventsNode(AddStartEndEvents(AddStartEndEventsParams()))
+            graph.add_node(node=sessions, parents=[graph.root])
+            graph.add_node(node=filtered, parents=[sessions])
+            graph.add_node(node=grouped, parents=[sessions])
+            graph.add_node(node=merged, parents=[filtered, grouped])
+            graph.add_node(node=paths, parents=[merged])
+            return graph, [filtered, paths]
+
+        graph, (filtered, paths) = build_graph(Eventstream(raw_data=source_df), str(tmp_path))
+        expected = graph.combine(filtered).to_dataframe()
+        assert len(applied) == 1
+
+        applied.clear()
+        source = Eventstream(raw_data=source_df)
+        graph, (filtered, paths) = build_graph(source, str(tmp_path))
+        result = graph.combine(filtered).to_dataframe()
+
+        assert len(applied) == 0
+        pd.testing.assert_frame_equal(result.drop(columns="event_id"), expected.drop(columns="event_id"))
+        # the saved events get the identifiers of the source events of the new session
+        raw_events = result[result["event_type"] == "raw"].set_index("event_id")["timestamp"]
+        source_ids = source.to_dataframe().set_index("event_id")["timestamp"]
+        assert raw_events.equals(source_ids.loc[raw_events.index])
+
+        # the saved and the calculated branches are merged as if they were calculated in the same session
+        merged_result = graph.combine(paths).to_dataframe()
+        not_saved_graph, (_, not_saved_paths) = build_graph(Eventstream(raw_data=source_df), None)
+        not_saved_result = not_saved_graph.combine(not_saved_paths).to_dataframe()
+        assert merged_result["event_id"].is_unique
+        pd.testing.assert_frame_equal(merged_result.drop(columns="event_id"), not_saved_result.drop(columns="event_id"))
+
+        applied.clear()
+        graph.clear_cache()
+        graph.combine(filtered)
+        assert len(applied) == 1
+
+    def test_combine__cache_directory_closures(self, tmp_path) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": "a", "timestamp": "2021-10-26 12:00", "user_id": "1"},
+                {"event": "b", "timestamp": "2021-10-26 12:01", "user_id": "1"},
+                {"event": "a", "timestamp": "2021-10-26 14:00", "user_id": "2"},
+            ]
+        )
+        graph = PreprocessingGraph(Eventstream(raw_data=source_df), cache_policy=CachePolicy(directory=str(tmp_path)))
+
+        def keep(event: str) -> FilterEvents:
+            # the functions made by the same factory differ only in the closure values
+            return FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] == event))
+
+        kept_a, kept_b = EventsNode(keep("a")), EventsNode(keep("b"))
+        graph.add_node(node=kept_a, parents=[graph.root])
+        graph.add_node(node=kept_b, parents=[graph.root])
+
+        assert graph.combine(kept_a).to_dataframe()["event"].tolist() == ["a", "a"]
+        assert graph.combine(kept_b).to_dataframe()["event"].tolist() == ["b"]
+        assert graph._get_persisted_key(kept_a) != graph._get_persisted_key(kept_b)
+
+    def test_combine__cache_directory_budget(self, tmp_path) -> None:
+        source_df = pd.DataFrame(
+            [
+                {"event": event, "timestamp": f"2021-10-26 12:0{i}", "user_id": user_id}
+                for user_id in ["1", "2"]
+                for i, event in enumerate(["a", "b", "c"])
+            ]
+        )
+        # the results are not kept in memory, so each combine call loads the saved result
+        cache_policy = CachePolicy(max_bytes=0, directory=str(tmp_path))
+        graph = PreprocessingGraph(Eventstream(raw_data=source_df), cache_policy=cache_policy)
+
+        def keep(event: str) -> FilterEvents:
+            return FilterEvents(FilterEventsParams(func=lambda df, schema: df[schema.event_name] == event))
+
+        kept_a, kept_b, kept_c = EventsNode(keep("a")), EventsNode(keep("b")), EventsNode(keep("c"))
+        for node in [kept_a, kept_b, kept_c]:
+            graph.add_node(node=node, parents=[graph.root])
+
+        def is_saved(node: EventsNode) -> bool:
+            key = cast(str, graph._get_persisted_key(node))
+            return any(key[:32] in path.name for path in tmp_path.iterdir())
+
+        graph.combine(kept_a)
+        time.sleep(0.05)
+        graph.combine(kept_b)
+        sizes = {path.stat().st_size for path in tmp_path.glob("*.frame")}
+        assert len(sizes) == 1
+        cache_policy.directory_max_bytes = 2 * sizes.pop()
+
+        # the loaded result becomes the most recently used one
+        time.sleep(0.05)
+        assert graph.combine(kept_a).to_dataframe()["event"].tolist() == ["a", "a"]
+        time.sleep(0.05)
+        graph.combine(kept_c)
+        assert [is_saved(node) for node in [kept_a, kept_b, kept_c]] == [True, False, True]
+
+        # a result larger than the budget is not saved
+        cache_policy.directory_max_bytes = 1
+        graph.combine(kept_b)
+        assert [is_saved(node) for node in [kept_a, kept_b, kept_c]] == [True, False, True]
+
     def test_get_values(self) -> None:
         source_df = pd.DataFrame(
             [
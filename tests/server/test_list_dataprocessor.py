@@ -343,6 +343,13 @@ class TestListDataprocessors:
                     },
                 ],
             },
+            {
+                "name": "SampleUsers",
+                "params": [
+                    {"name": "user_sample_share", "optional": False, "widget": "number", "default": None},
+                    {"name": "user_sample_seed", "optional": True, "widget": "integer", "default": None},
+                ],
+            },
         ]
         correct_data = sorted(correct_data, key=lambda x: x["name"])
         real_data = list_dataprocessor(payload={})